@@ -1,26 +1,34 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_experimental.agents import create_pandas_dataframe_agent
 import pandas as pd
 import os
-import uuid
-import io
-from contextlib import redirect_stdout
 import matplotlib
 matplotlib.use('Agg')
 import seaborn as sns
-import matplotlib.pyplot as plt
 
-def create_static_plot(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, plot_instruction: str, record_thoughts: bool = False) -> dict:
-    """
-    Usa um agente dedicado para gerar um gráfico estático de alta qualidade com Seaborn,
-    salva-o como um arquivo PNG e retorna um dicionário com o caminho e os pensamentos.
-    """
-    unique_filename = f"{uuid.uuid4()}.png"
-    png_path = f"temp_plots/{unique_filename}"
+from agents.pool import get_agent_pool
+from agents.events import run_agent, arun_agent
+from core.plotting import is_large, plotting_namespace
+from core.artifacts import get_artifact_store
+from core.sandbox import expect_image
 
-    sns.set_theme(style="whitegrid")
+def new_plot_path() -> str:
+    return get_artifact_store().new_staging_path("png")
 
-    prompt = f"""
+def _large_data_instructions(rows: int) -> str:
+    return f"""
+    ATENÇÃO: o DataFrame `df` tem {rows} linhas. Gráficos ponto a ponto sobre todas as linhas levariam minutos.
+    NÃO chame `sns.scatterplot`, `sns.kdeplot`, `sns.histplot`, `sns.boxplot`, `sns.violinplot` ou `sns.pairplot` diretamente sobre `df`.
+    Use as funções já disponíveis no ambiente (não as importe), que desenham a partir de dados agregados:
+    - `histogram(df, 'coluna', ax=ax)` para histogramas e curvas de densidade;
+    - `density_scatter(df, 'x', 'y', ax=ax)` para gráficos de dispersão (raster de densidade com amostra sobreposta);
+    - `boxplot(df, 'coluna', ax=ax)` para boxplots;
+    - `sample_rows(df)` para qualquer outro gráfico que precise de pontos individuais (ex: `sns.lineplot(data=sample_rows(df), ...)`).
+    Gráficos sobre dados já agregados (ex: `df.groupby(...).mean()` seguido de `sns.barplot`) podem ser feitos normalmente.
+    """
+
+def _build_artisan_prompt(plot_instruction: str, png_path: str, rows: int = 0) -> str:
+    large_data = _large_data_instructions(rows) if rows else ""
+    return f"""
     Você é um especialista em visualização de dados, criando gráficos de alta qualidade com Seaborn.
     Sua tarefa é criar uma única visualização com base na solicitação do usuário.
 
@@ -32,35 +40,49 @@ def create_static_plot(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, plot_instr
     Não use `plt.show()`.
 
     Sua resposta final DEVE ser o caminho para o arquivo PNG salvo: '{png_path}'
-    """
-    
-    static_agent = create_pandas_dataframe_agent(
-        llm, df, agent_type="zero-shot-react-description",
-        verbose=record_thoughts, allow_dangerous_code=True
-    )
+    {large_data}"""
+
+def _resolve_plot_path(png_path: str, result_path) -> str:
+    """O PNG gerado (o caminho pedido ou, na área de staging, o citado na resposta do agente); None se não houver."""
+    if os.path.exists(png_path):
+        return png_path
+    if isinstance(result_path, str) and get_artifact_store().is_staging_path(result_path.strip()) and os.path.exists(result_path.strip()):
+        return result_path.strip()
+    return None
 
-    try:
-        agent_log = ""
-        result_path = ""
-        if record_thoughts:
-            string_io = io.StringIO()
-            with redirect_stdout(string_io):
-                response = static_agent.invoke({"input": prompt})
-                result_path = response['output']
-            agent_log = string_io.getvalue()
-        else:
-            response = static_agent.invoke({"input": prompt})
-            result_path = response['output']
-        
-        final_path = ""
-        if os.path.exists(png_path):
-            final_path = png_path
-        elif isinstance(result_path, str) and os.path.exists(result_path.strip()):
-            final_path = result_path.strip()
-        else:
-            final_path = "Artesão Estático criou um gráfico, mas não consegui encontrar o caminho do arquivo."
-        
-        return {"result": final_path, "thoughts": agent_log}
+def _artisan_response(run, png_path: str) -> dict:
+    if run.error:
+        return {"result": f"A forja do Artesão Estático esfriou. A plotagem falhou: {run.error}", "thoughts": run.events, "error": run.error}
+    plot_path = _resolve_plot_path(png_path, run.output)
+    if plot_path is None:
+        # Sem `error`, esta resposta seria gravada no cache de respostas e repetida sem gráfico.
+        error = "Artesão Estático criou um gráfico, mas não consegui encontrar o caminho do arquivo."
+        return {"result": error, "thoughts": run.events, "error": error}
+    return {"result": plot_path, "thoughts": run.events}
 
-    except Exception as e:
-        return {"result": f"A forja do Artesão Estático esfriou. A plotagem falhou: {str(e)}", "thoughts": agent_log if 'agent_log' in locals() else str(e)}
\ No newline at end of file
+def create_static_plot(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, plot_instruction: str, record_thoughts: bool = False, on_event=None) -> dict:
+    """
+    Usa um agente dedicado para gerar um gráfico estático de alta qualidade com Seaborn,
+    salva-o como um arquivo PNG e retorna um dicionário com o caminho e os pensamentos.
+    `on_event(registro)`, se fornecido, recebe cada passo do agente assim que ele acontece.
+    """
+    png_path = new_plot_path()
+    sns.set_theme(style="whitegrid")
+    large = is_large(df)
+    prompt = _build_artisan_prompt(plot_instruction, png_path, len(df) if large else 0)
+    static_agent = get_agent_pool().get(llm, df, "artisan", plotting_namespace() if large else None)
+    # O código do agente só pode gravar este PNG (ver `core.sandbox.save_images`).
+    with expect_image(png_path):
+        return _artisan_response(run_agent(static_agent, prompt, record_thoughts, on_event), png_path)
+
+async def acreate_static_plot(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, plot_instruction: str, record_thoughts: bool = False, on_event=None) -> dict:
+    """
+    Versão assíncrona de `create_static_plot`, usada pelo pipeline assíncrono do Conselho.
+    """
+    png_path = new_plot_path()
+    sns.set_theme(style="whitegrid")
+    large = is_large(df)
+    prompt = _build_artisan_prompt(plot_instruction, png_path, len(df) if large else 0)
+    static_agent = get_agent_pool().get(llm, df, "artisan", plotting_namespace() if large else None)
+    with expect_image(png_path):
+        return _artisan_response(await arun_agent(static_agent, prompt, record_thoughts, on_event), png_path)
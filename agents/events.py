@@ -0,0 +1,120 @@
+import os
+from collections import namedtuple
+from contextvars import ContextVar
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Tamanho máximo (em caracteres) do conteúdo de cada passo guardado no Diário de Bordo.
+MAX_EVENT_CHARS = int(os.getenv("JEDI_AGENT_EVENT_CHARS", "2000"))
+
+# Resultado de uma execução de agente: a resposta final, a última observação do REPL (completa, sem
+# truncamento), o valor da última expressão dessa observação (DataFrame, Series, escalar... ou None), os
+# passos registrados e, se a execução falhou, a mensagem de erro (com `output` None).
+AgentRunResult = namedtuple("AgentRunResult", ["output", "last_observation", "last_value", "events", "error"])
+
+# Registrador da execução em andamento, para que o REPL entregue o objeto resultante de cada passo.
+_active_recorder = ContextVar("jedi_agent_recorder", default=None)
+
+def publish_tool_value(value):
+    """Chamado pela ferramenta de REPL: associa `value` à observação que ela está prestes a devolver."""
+    recorder = _active_recorder.get()
+    if recorder is not None:
+        recorder.pending_value = value
+
+def agent_event(kind: str, content, max_chars: int = MAX_EVENT_CHARS, **fields) -> dict:
+    """
+    Registro compacto de um passo do agente ("thought", "action", "observation", "final_answer" ou "error"),
+    serializável em JSON (vai para o cache de respostas). Conteúdos longos (ex: DataFrames impressos) são
+    cortados em `max_chars`, guardando o início e o fim.
+    """
+    content = str(content).strip()
+    truncated = len(content) > max_chars
+    if truncated:
+        head, tail = content[:max_chars * 3 // 4], content[-(max_chars // 4):]
+        content = f"{head}\n… [{len(content) - len(head) - len(tail)} caracteres omitidos] …\n{tail}"
+    return {"type": kind, "content": content, "truncated": truncated, **fields}
+
+def _thought_from_log(log: str) -> str:
+    """Trecho de raciocínio de um passo ReAct (o texto antes de 'Action:' ou 'Final Answer:')."""
+    for marker in ("Action:", "Final Answer:"):
+        if marker in log:
+            log = log.split(marker, 1)[0]
+    return log.replace("Thought:", "").strip()
+
+class AgentEventRecorder(BaseCallbackHandler):
+    """
+    Recebe os passos de um agente ReAct pelos callbacks do LangChain, em vez de capturar o stdout.
+
+    É criado por execução e passado só para ela (`config={"callbacks": [...]}`), então sessões simultâneas
+    nunca misturam os seus passos. Com `record=False`, apenas a última observação e a resposta final são
+    guardadas. `on_event(registro)`, se fornecido, recebe cada passo assim que ele acontece.
+    """
+    run_inline = True
+
+    def __init__(self, record: bool = True, on_event=None, max_chars: int = MAX_EVENT_CHARS):
+        self.record = record
+        self.on_event = on_event
+        self.max_chars = max_chars
+        self.events = []
+        self.last_observation = None
+        self.last_value = None
+        self.pending_value = None
+        self.final_answer = None
+
+    def _emit(self, kind: str, content, **fields):
+        if not self.record or not str(content).strip():
+            return
+        event = agent_event(kind, content, self.max_chars, **fields)
+        self.events.append(event)
+        if self.on_event:
+            self.on_event(event)
+
+    def on_agent_action(self, action, **kwargs):
+        self._emit("thought", _thought_from_log(action.log))
+        self._emit("action", action.tool_input, tool=action.tool)
+
+    def on_tool_end(self, output, **kwargs):
+        self.last_observation = str(getattr(output, "content", output))
+        self.last_value, self.pending_value = self.pending_value, None
+        self._emit("observation", self.last_observation)
+
+    def on_tool_error(self, error, **kwargs):
+        self._emit("error", f"{type(error).__name__}: {error}")
+
+    def on_agent_finish(self, finish, **kwargs):
+        self.final_answer = finish.return_values.get("output")
+        self._emit("thought", _thought_from_log(finish.log))
+        self._emit("final_answer", self.final_answer)
+
+    def result(self, output) -> AgentRunResult:
+        return AgentRunResult(output, self.last_observation, self.last_value, self.events, None)
+
+    def failure(self, error: Exception) -> AgentRunResult:
+        self._emit("error", str(error))
+        return AgentRunResult(None, self.last_observation, self.last_value, self.events, str(error))
+
+def run_agent(agent, prompt: str, record_thoughts: bool = False, on_event=None) -> AgentRunResult:
+    """
+    Executa um agente do pool registrando os passos (se `record_thoughts`) pelo `AgentEventRecorder`.
+    Erros do agente não são propagados: voltam em `error`, junto com os passos registrados até a falha.
+    """
+    recorder = AgentEventRecorder(record_thoughts, on_event)
+    token = _active_recorder.set(recorder)
+    try:
+        response = agent.invoke({"input": prompt}, config={"callbacks": [recorder]})
+    except Exception as e:
+        return recorder.failure(e)
+    finally:
+        _active_recorder.reset(token)
+    return recorder.result(response["output"])
+
+async def arun_agent(agent, prompt: str, record_thoughts: bool = False, on_event=None) -> AgentRunResult:
+    """Versão assíncrona de `run_agent`."""
+    recorder = AgentEventRecorder(record_thoughts, on_event)
+    token = _active_recorder.set(recorder)
+    try:
+        response = await agent.ainvoke({"input": prompt}, config={"callbacks": [recorder]})
+    except Exception as e:
+        return recorder.failure(e)
+    finally:
+        _active_recorder.reset(token)
+    return recorder.result(response["output"])
@@ -0,0 +1,171 @@
+import os
+import re
+from collections import namedtuple
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import seaborn as sns
+import matplotlib.pyplot as plt
+
+from agents.router import fold_text
+from utils import get_dataframe_fingerprint
+from agents.artisan import new_plot_path
+from core.plotting import is_large, plotting_namespace
+from core.sandbox import get_sandbox_pool, save_images, inprocess_render_lock, SANDBOX_ENABLED
+from core.sandbox_worker import execute
+
+FAST_PATH_ENABLED = os.getenv("JEDI_FAST_PATH", "1") == "1"
+VALUE_COUNTS_LIMIT = 20
+
+TemplateMatch = namedtuple("TemplateMatch", ["intent", "columns", "skip_sage"])
+
+# Padrões aplicados sobre a pergunta em minúsculas e sem acentos (ver `fold_text`).
+# A ordem importa: intenções mais específicas vêm antes das genéricas (ex: 'contagem de valores' antes de 'contagem').
+INTENT_PATTERNS = [
+    ("histogram", re.compile(r"\bhistogram\w*")),
+    ("boxplot", re.compile(r"\bbox ?plot\b|\bdiagrama de caixa\b")),
+    ("correlation", re.compile(r"\bcorrela\w*")),
+    ("value_counts", re.compile(r"\bvalue.?counts?\b|\bcontagem de (cada )?valor\w*|\bfrequencia\w*|\bvalores mais comuns\b|\bquantas vezes cada\b")),
+    ("median", re.compile(r"\bmedian[ao]?\b")),
+    ("mean", re.compile(r"\bmedia\b|\bmean\b|\baverage\b")),
+    ("count", re.compile(r"\bcontagem\b|\bcount\b|\bquant[oa]s (valores|registros|linhas)\b|\bnumero de (valores|registros)\b")),
+]
+NUMERIC_INTENTS = {"histogram", "boxplot", "correlation", "median", "mean"}
+PLOT_INTENTS = {"histogram", "boxplot"}
+
+# Uma pergunta só é um modelo simples se, depois de removidas a intenção, as colunas citadas e o pedido de
+# "sem interpretação", sobrarem apenas palavras desta lista. Qualquer outra palavra (um filtro como "em 2020",
+# "na classe 1", "sem outliers", "dos últimos dias") ou um operador de comparação leva a pergunta ao agente.
+TEMPLATE_WORDS = frozenset("""
+    qual quais quanto quanta e eh sao o a os as um uma de da do das dos na no em entre sobre
+    tem possui coluna colunas campo campos variavel variaveis valor valores dados cada total
+    calcule calcular calcula mostre mostrar mostra exiba exibir exibe gere gerar gera crie criar cria
+    faca fazer faz desenhe desenhar plote plotar informe informar diga me
+    grafico distribuicao aritmetica coeficiente pearson
+    what is are the of show plot compute calculate give tell me column columns value values and between chart
+""".split())
+TEMPLATE_FILLERS = re.compile(r"\bpor favor\b|\bplease\b")
+COMPARISON = re.compile(r"[=<>!%]")
+SKIP_SAGE = re.compile(r"\bsem (interpretacao|explicacao|o sabio)\b|\b(apenas|so|somente) o (valor|numero|resultado)\b|\bjust the (value|number|result)\b|\bno explanation\b")
+
+def _find_columns(query: str, folded_query: str, columns) -> list:
+    """Colunas citadas na pergunta, na ordem em que aparecem (nomes entre aspas têm prioridade)."""
+    quoted = re.findall(r"['\"`]([^'\"`]+)['\"`]", query)
+    by_name = {str(col): col for col in columns}
+    found = [by_name[name] for name in quoted if name in by_name]
+    if found:
+        return list(dict.fromkeys(found))
+    positions = []
+    for col in columns:
+        match = re.search(r"(?<!\w)" + re.escape(fold_text(str(col))) + r"(?!\w)", folded_query)
+        if match:
+            positions.append((match.start(), col))
+    return [col for _, col in sorted(positions, key=lambda item: item[0])]
+
+def _strip_column_mentions(folded_query: str, columns) -> str:
+    """Remove as menções às colunas (com ou sem aspas) da pergunta já normalizada por `fold_text`."""
+    for col in columns:
+        name = re.escape(fold_text(str(col)))
+        folded_query = re.sub(r"['\"`]?(?<!\w)" + name + r"(?!\w)['\"`]?", " ", folded_query)
+    return folded_query
+
+def _leftover_words(question: str) -> list:
+    """Palavras da pergunta (já sem as colunas) que não são a intenção, o pedido de "sem interpretação" nem cortesia."""
+    remainder = TEMPLATE_FILLERS.sub(" ", SKIP_SAGE.sub(" ", question))
+    for _, pattern in INTENT_PATTERNS:
+        remainder = pattern.sub(" ", remainder)
+    return re.findall(r"\w+", remainder)
+
+def match_template(query: str, df: pd.DataFrame):
+    """
+    Reconhece perguntas-modelo (média, mediana, contagem, contagem de valores, histograma, boxplot e
+    correlação) e extrai as colunas, validando-as contra `df.columns`. Retorna um `TemplateMatch` ou
+    None quando a pergunta não é um modelo inequívoco: qualquer palavra além da intenção, das colunas e
+    de `TEMPLATE_WORDS` (ex: um filtro) leva a pergunta ao agente.
+    """
+    folded = fold_text(query)
+    skip_sage = bool(SKIP_SAGE.search(folded))
+    columns = _find_columns(query, folded, df.columns)
+    # As colunas saem primeiro: o nome de uma coluna pode conter uma palavra de intenção (ex: "frequencia cardiaca").
+    question = _strip_column_mentions(folded, columns)
+    if COMPARISON.search(question) or any(word not in TEMPLATE_WORDS for word in _leftover_words(question)):
+        return None
+    intents = [intent for intent, pattern in INTENT_PATTERNS if pattern.search(question)]
+    # 'contagem de valores' também casa com o padrão genérico de contagem.
+    if "value_counts" in intents and "count" in intents:
+        intents.remove("count")
+    if len(intents) != 1:
+        return None
+    intent = intents[0]
+
+    expected = 2 if intent == "correlation" else 1
+    if len(columns) != expected:
+        return None
+    if intent in NUMERIC_INTENTS and not all(pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]) for col in columns):
+        return None
+    return TemplateMatch(intent, columns, skip_sage)
+
+def _plot_code(df: pd.DataFrame, intent: str, column, png_path: str) -> str:
+    """Código de plotagem do modelo, executado no sandbox (ou localmente, como reserva)."""
+    name = repr(str(column))
+    if intent == "histogram":
+        draw = f"histogram(df, {name}, ax=ax)" if is_large(df) else f"sns.histplot(x=df[{name}].dropna(), kde=True, ax=ax)"
+        title = f"Histograma de '{column}'"
+    else:
+        draw = f"boxplot(df, {name}, ax=ax)" if is_large(df) else f"sns.boxplot(x=df[{name}].dropna(), ax=ax)"
+        title = f"Boxplot de '{column}'"
+    return f"fig, ax = plt.subplots(figsize=(10, 6))\n{draw}\nax.set_title({title!r})\nfig.savefig({png_path!r}, bbox_inches='tight')"
+
+def _render_plot(df: pd.DataFrame, intent: str, column) -> str:
+    png_path = new_plot_path()
+    code = _plot_code(df, intent, column, png_path)
+    if SANDBOX_ENABLED:
+        result = get_sandbox_pool().run(code, df, get_dataframe_fingerprint(df), image_path=png_path)
+        if png_path not in result.images:
+            raise RuntimeError(result.output or "o sandbox não devolveu o gráfico.")
+        save_images(result.images, png_path)
+        return png_path
+    os.makedirs(os.path.dirname(png_path), exist_ok=True)
+    with inprocess_render_lock:
+        with plt.rc_context():
+            sns.set_theme(style="whitegrid")
+            try:
+                execute(code, {"df": df, "plt": plt, "sns": sns, **plotting_namespace()})
+            finally:
+                plt.close("all")
+    return png_path
+
+def run_template(match: TemplateMatch, df: pd.DataFrame) -> dict:
+    """
+    Executa diretamente com pandas/seaborn uma pergunta reconhecida por `match_template`.
+    Retorna o mesmo formato dos especialistas: `result` (texto para o Sábio), `thoughts` e, para
+    gráficos, `artifact_path`; a contagem de valores traz também a contagem completa em `table`.
+    """
+    intent, columns = match.intent, match.columns
+    column = columns[0]
+    table = None
+    try:
+        if intent == "mean":
+            result = f"Média da coluna '{column}': {df[column].mean()}"
+        elif intent == "median":
+            result = f"Mediana da coluna '{column}': {df[column].median()}"
+        elif intent == "count":
+            result = f"Contagem de valores não nulos da coluna '{column}': {int(df[column].count())} (de {len(df)} linhas)"
+        elif intent == "value_counts":
+            counts = df[column].value_counts()
+            table = counts.to_frame()
+            result = f"Contagem de valores da coluna '{column}':\n{counts.head(VALUE_COUNTS_LIMIT).to_string()}"
+            if len(counts) > VALUE_COUNTS_LIMIT:
+                result += f"\n... e mais {len(counts) - VALUE_COUNTS_LIMIT} valores distintos."
+        elif intent == "correlation":
+            correlation = df[columns[0]].corr(df[columns[1]])
+            result = f"Correlação de Pearson entre '{columns[0]}' e '{columns[1]}': {correlation}"
+        elif intent in PLOT_INTENTS:
+            png_path = _render_plot(df, intent, column)
+            stats = df[column].describe().to_string()
+            kind = "Histograma" if intent == "histogram" else "Boxplot"
+            return {"result": f"{kind} da coluna '{column}' gerado. Estatísticas da coluna:\n{stats}",
+                    "artifact_path": png_path, "thoughts": f"Modelo '{intent}' executado diretamente para a coluna '{column}'."}
+    except Exception as e:
+        return {"result": f"O caminho rápido falhou: {str(e)}", "thoughts": str(e), "error": str(e)}
+    return {"result": result, "table": table, "thoughts": f"Modelo '{intent}' executado diretamente para {columns}."}
@@ -1,15 +1,12 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_experimental.agents import create_pandas_dataframe_agent
 import pandas as pd
-import io
-from contextlib import redirect_stdout
-import re
 
-def run_guardian_query(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, query: str, record_thoughts: bool = False) -> dict:
-    """
-    Executa uma consulta em um DataFrame pandas e retorna um dicionário com o resultado e os pensamentos.
-    """
-    prompt_template = f"""
+from agents.pool import get_agent_pool
+from agents.events import run_agent, arun_agent
+from core.results import ToolResult
+
+def _build_guardian_prompt(query: str) -> str:
+    return f"""
     Você é um agente de análise de dados focado em execução. Seu único propósito é executar código Python em um DataFrame pandas para responder a uma pergunta.
     - Você não deve fornecer nenhum texto de conversação ou explicações.
     - Sua resposta final deve ser a saída bruta do código Python.
@@ -17,31 +14,27 @@ def run_guardian_query(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, query: str
     - Responda no mesmo idioma da pergunta do usuário.
     """
 
-    guardian_agent = create_pandas_dataframe_agent(
-        llm, df, agent_type="zero-shot-react-description",
-        verbose=record_thoughts, allow_dangerous_code=True
-    )
-
-    try:
-        agent_log = ""
-        result = ""
-        if record_thoughts:
-            string_io = io.StringIO()
-            with redirect_stdout(string_io):
-                response = guardian_agent.invoke({"input": prompt_template})
-                result = response['output']
-            agent_log = string_io.getvalue()
-        else:
-            response = guardian_agent.invoke({"input": prompt_template})
-            result = response['output']
-
-        final_result = result
-        if agent_log and '> Finished chain.' in agent_log:
-            observations = re.findall(r"Observation: (.*?)(?:Thought:|$)", agent_log, re.DOTALL)
-            if observations:
-                final_result = observations[-1].strip()
+def _guardian_response(run) -> dict:
+    # Prefere a última observação do REPL (saída bruta do código) à resposta final reformulada pelo agente,
+    # junto com o objeto que a produziu (o Sábio recebe só um resumo dentro do orçamento de tokens).
+    if run.error:
+        return {"result": ToolResult("text", None, f"Guardian agent failed: {run.error}"), "thoughts": run.events, "error": run.error}
+    if run.last_observation is None:
+        return {"result": ToolResult("text", None, run.output), "thoughts": run.events}
+    return {"result": ToolResult.from_value(run.last_value, run.last_observation), "thoughts": run.events}
 
-        return {"result": final_result, "thoughts": agent_log}
+def run_guardian_query(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, query: str, record_thoughts: bool = False, on_event=None) -> dict:
+    """
+    Executa uma consulta em um DataFrame pandas e retorna um dicionário com o resultado (`ToolResult`, ver
+    `core.results`) e os pensamentos (registros dos passos do agente, ver `agents.events`).
+    `on_event(registro)`, se fornecido, recebe cada passo do agente assim que ele acontece.
+    """
+    guardian_agent = get_agent_pool().get(llm, df, "guardian")
+    return _guardian_response(run_agent(guardian_agent, _build_guardian_prompt(query), record_thoughts, on_event))
 
-    except Exception as e:
-        return {"result": f"Guardian agent failed: {str(e)}", "thoughts": agent_log if 'agent_log' in locals() else str(e)}
+async def arun_guardian_query(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, query: str, record_thoughts: bool = False, on_event=None) -> dict:
+    """
+    Versão assíncrona de `run_guardian_query`, usada pelo pipeline assíncrono do Conselho.
+    """
+    guardian_agent = get_agent_pool().get(llm, df, "guardian")
+    return _guardian_response(await arun_agent(guardian_agent, _build_guardian_prompt(query), record_thoughts, on_event))
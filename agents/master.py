@@ -1,30 +1,120 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 import pandas as pd
+import os
 import json
+import asyncio
 import streamlit as st
 
-from utils import get_data_profile
-from agents.guardian import run_guardian_query
-from agents.sage import get_sage_interpretation
-from agents.artisan import create_static_plot
+from utils import get_compact_profile, get_dataframe_fingerprint
+from core.answer_cache import get_answer_cache
+from core.artifacts import get_artifact_store, get_session_id
+from core.tracing import start_trace, span
+from core.results import ToolResult
+from agents.pool import get_llm_model_name
+from agents.router import get_intent_router, record_routing
+from agents.guardian import arun_guardian_query
+from agents.sage import astream_sage_interpretation, sage_error_message
+from agents.artisan import acreate_static_plot
+from agents.fast_path import match_template, run_template, FAST_PATH_ENABLED
 
-def handle_general_conversation(llm: ChatGoogleGenerativeAI, user_query: str) -> str:
+GENERAL_CONVERSATION_ERROR_PREFIX = "A Força está perturbada."
+SPECULATIVE_EXECUTION = os.getenv("JEDI_SPECULATIVE_EXECUTION", "1") == "1"
+
+async def _arun_tool(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, tool_name: str, query: str, record_thoughts: bool,
+                    on_agent_event=None) -> dict:
+    """Aciona o especialista correspondente à ferramenta escolhida; `on_agent_event` recebe cada passo do agente ao vivo."""
+    with span("tool", tool=tool_name):
+        if tool_name == "DataGuardian":
+            return await arun_guardian_query(llm, df, query, record_thoughts, on_agent_event)
+        elif tool_name == "Visualizer":
+            return await acreate_static_plot(llm, df, query, record_thoughts, on_agent_event)
+        return {}
+
+def _discard_speculative_tool(task: asyncio.Task):
+    """Descarta uma execução especulativa: cancela a tarefa ou, se ela já terminou, apaga o gráfico gerado."""
+    if not task.done():
+        task.cancel()
+        return
+    if task.cancelled() or task.exception() is not None:
+        return
+    artifact = task.result().get("result")
+    if get_artifact_store().is_staging_path(artifact) and os.path.exists(artifact):
+        os.remove(artifact)
+
+def _result_table(tool_result):
+    """Resultado completo da ferramenta como DataFrame, para a tabela interativa da interface (None se não houver)."""
+    return tool_result.to_frame() if isinstance(tool_result, ToolResult) else None
+
+def _store_artifact(path) -> str:
     """
-    Lida com conversas gerais, saudações e perguntas não relacionadas a dados.
+    Move o gráfico recém-gerado para o armazém de artefatos e retorna o caminho definitivo (None se não houver gráfico).
+    Só arquivos da área de staging são movidos: qualquer outro caminho (ex: citado na resposta de um agente) é ignorado.
+    """
+    if get_artifact_store().is_staging_path(path) and os.path.exists(path):
+        return get_artifact_store().put_file(path, get_session_id())
+    return None
+
+async def _astream_sage(llm: ChatGoogleGenerativeAI, data_context, user_query: str, on_event=None):
+    """
+    Consome o streaming do Sábio, repassando cada trecho a `on_event("token", ...)`, e retorna `(texto, erro)`.
+    Se o streaming falhar, `erro` traz a mensagem do Sábio e o texto é o trecho já gerado seguido dela:
+    uma resposta truncada nunca deve ir para o cache de respostas.
+    Um `ToolResult` é enviado como resumo dentro do orçamento de tokens (`SAGE_RESULT_TOKENS`).
     """
-    prompt = f"""Você é JEDI, um assistente de análise de dados temático de Star Wars.
+    if isinstance(data_context, ToolResult):
+        data_context = data_context.summary()
+    chunks = []
+    error = None
+    with span("sage") as sage_span:
+        try:
+            async for chunk in astream_sage_interpretation(llm, data_context, user_query):
+                if not chunks and sage_span is not None:
+                    sage_span.attributes["first_token_ms"] = sage_span.elapsed_ms()
+                chunks.append(chunk)
+                if on_event:
+                    on_event("token", chunk)
+        except Exception as e:
+            error = sage_error_message(e)
+            chunks.append(("\n\n" if chunks else "") + error)
+            if on_event:
+                on_event("token", chunks[-1])
+    return "".join(chunks).strip(), error
+
+def _build_general_conversation_prompt(user_query: str) -> str:
+    return f"""Você é JEDI, um assistente de análise de dados temático de Star Wars.
 Responda à pergunta do usuário de forma breve, amigável e dentro do tema.
 
 Pergunta do usuário: "{user_query}"
 Sua resposta:
 """
+
+def handle_general_conversation(llm: ChatGoogleGenerativeAI, user_query: str) -> str:
+    """
+    Lida com conversas gerais, saudações e perguntas não relacionadas a dados.
+    """
     try:
-        response = llm.invoke(prompt)
+        response = llm.invoke(_build_general_conversation_prompt(user_query))
         return response.content.strip()
     except Exception as e:
-        return f"A Força está perturbada. Não consegui processar a conversa. Erro: {str(e)}"
+        return f"{GENERAL_CONVERSATION_ERROR_PREFIX} Não consegui processar a conversa. Erro: {str(e)}"
 
-def run_jedi_council(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, user_query: str, record_thoughts: bool = False):
+async def ahandle_general_conversation(llm: ChatGoogleGenerativeAI, user_query: str) -> str:
+    """Versão assíncrona de `handle_general_conversation`."""
+    try:
+        response = await llm.ainvoke(_build_general_conversation_prompt(user_query))
+        return response.content.strip()
+    except Exception as e:
+        return f"{GENERAL_CONVERSATION_ERROR_PREFIX} Não consegui processar a conversa. Erro: {str(e)}"
+
+def run_jedi_council(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, user_query: str, record_thoughts: bool = False, use_cache: bool = True,
+                     speculative: bool = SPECULATIVE_EXECUTION, on_event=None, fast_path: bool = FAST_PATH_ENABLED, clarify: bool = True):
+    """
+    Versão síncrona de `arun_jedi_council` (mesmos parâmetros e retorno), para chamadores fora de um loop asyncio.
+    """
+    return asyncio.run(arun_jedi_council(llm, df, user_query, record_thoughts, use_cache, speculative, on_event, fast_path, clarify))
+
+async def arun_jedi_council(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, user_query: str, record_thoughts: bool = False, use_cache: bool = True,
+                            speculative: bool = SPECULATIVE_EXECUTION, on_event=None, fast_path: bool = FAST_PATH_ENABLED, clarify: bool = True):
     """
     Executa a orquestração do Conselho Jedi com esclarecimento com estado.
 
@@ -35,14 +125,53 @@ def run_jedi_council(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, user_query:
     4. Se a pergunta for ambígua, retorna uma pergunta de esclarecimento e salva o estado.
     5. Se a pergunta for clara, executa a ferramenta apropriada.
     6. Envia o resultado da ferramenta para o Sábio para uma interpretação final em linguagem natural.
-    7. Retorna um dicionário contendo a resposta final, o caminho para qualquer artefato e o log de pensamentos (Diário de Bordo).
+    7. Retorna um dicionário contendo a resposta final, o caminho para qualquer artefato, o log de pensamentos (Diário de Bordo)
+       e, quando a ferramenta devolveu uma Series ou um DataFrame, o resultado completo em `table` (o Sábio recebe só um resumo).
+
+    Com `use_cache`, perguntas já respondidas sobre o mesmo conjunto de dados e modelo são servidas do
+    cache persistente de respostas; nesse caso o dicionário traz `cached=True` e `cached_at`.
+    Com `speculative`, o especialista começa a trabalhar enquanto o Consultor avalia a pergunta; se o
+    Consultor pedir esclarecimento, o resultado especulativo é descartado.
+    `on_event(tipo, conteúdo)`, se fornecido, recebe ao vivo cada entrada do Diário de Bordo ("log"), inclusive
+    cada passo dos agentes Guardião e Artesão, e cada trecho da resposta do Sábio à medida que é gerado ("token").
+    Com `fast_path`, perguntas-modelo (média, mediana, contagem, contagem de valores, histograma, boxplot,
+    correlação) sobre colunas existentes são executadas diretamente, sem roteamento, Consultor nem agente;
+    o Sábio só é chamado se o usuário não pedir apenas o valor.
+    Com `clarify=False` (sem um usuário para responder, ex: o modo em lote), o Consultor não é acionado e
+    nenhum esclarecimento pendente é lido ou gravado na sessão: a ferramenta escolhida é executada direto.
+    Se um erro crítico interromper o atendimento, o dicionário traz a mensagem em `error`.
+
+    Cada atendimento é registrado como um trace (ver `core.tracing`), com um span por etapa e por chamada
+    de LLM; o resumo por etapa vem em `trace` no dicionário retornado.
     """
+    with start_trace("council", model=get_llm_model_name(llm)) as trace:
+        response = await _arun_council(llm, df, user_query, record_thoughts, use_cache, speculative, on_event, fast_path, clarify)
+        if trace is not None:
+            trace.root.attributes["cached"] = bool(response.get("cached"))
+    response["trace"] = trace.summary() if trace is not None else []
+    return response
+
+async def _arun_council(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, user_query: str, record_thoughts: bool, use_cache: bool,
+                        speculative: bool, on_event, fast_path: bool, clarify: bool) -> dict:
+    # Entradas do Diário de Bordo: textos do Mestre e registros dos passos dos agentes (ver `agents.events`).
     log_entries = []
     def log(message):
         if record_thoughts:
             log_entries.append(message)
+            if on_event:
+                on_event("log", message)
+
+    # Os passos dos especialistas (ReAct) aparecem ao vivo assim que acontecem; no Diário de Bordo retornado,
+    # eles ficam agrupados no bloco do especialista (`log_specialist`), sem serem exibidos de novo.
+    def stream_agent_event(event):
+        on_event("log", event)
+    agent_events = stream_agent_event if record_thoughts and on_event else None
+
+    def log_specialist(tool_name, events):
+        if record_thoughts and events:
+            log_entries.extend([f"--- Início do Log Detalhado de {tool_name} ---", *events, f"--- Fim do Log Detalhado de {tool_name} ---"])
 
-    if "pending_clarification" in st.session_state and st.session_state.pending_clarification:
+    if clarify and "pending_clarification" in st.session_state and st.session_state.pending_clarification:
         pending_data = st.session_state.pending_clarification
         original_query = pending_data["original_query"]
         intended_tool = pending_data["intended_tool"]
@@ -53,23 +182,34 @@ def run_jedi_council(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, user_query:
         st.session_state.pending_clarification = None
         
         log(f"🎬 **Ação:** Acionando a ferramenta '{intended_tool}' com a consulta esclarecida.")
-        tool_response = {}
-        if intended_tool == "DataGuardian":
-            tool_response = run_guardian_query(llm, df, clarified_query, record_thoughts)
-        elif intended_tool == "Visualizer":
-            tool_response = create_static_plot(llm, df, clarified_query, record_thoughts)
+        tool_response = await _arun_tool(llm, df, intended_tool, clarified_query, record_thoughts, agent_events)
         
         tool_result = tool_response.get("result", "")
-        specialist_thoughts = tool_response.get("thoughts", "")
-        if record_thoughts and specialist_thoughts:
-            log(f"--- Início do Log Detalhado de {intended_tool} ---")
-            log(f"```\n{specialist_thoughts}\n```")
-            log(f"--- Fim do Log Detalhado de {intended_tool} ---")
+        specialist_thoughts = tool_response.get("thoughts", [])
+        artifact_path = _store_artifact(tool_result) if intended_tool == "Visualizer" else None
+        if artifact_path:
+            tool_result = artifact_path
+        log_specialist(intended_tool, specialist_thoughts)
 
         log("🤔 **Pensamento:** Enviando o resultado para o Sábio fazer a interpretação final.")
-        final_answer = get_sage_interpretation(llm, tool_result, clarified_query)
-        artifact_path = tool_result if intended_tool == "Visualizer" else None
-        return {"text_answer": final_answer, "artifact_path": artifact_path, "thoughts": log_entries}
+        final_answer, sage_error = await _astream_sage(llm, tool_result, clarified_query, on_event)
+        return {"text_answer": final_answer, "artifact_path": artifact_path, "thoughts": log_entries, "table": _result_table(tool_result),
+                "error": sage_error}
+
+    answer_cache = get_answer_cache() if use_cache else None
+    dataset_key = get_dataframe_fingerprint(df)
+    model_key = get_llm_model_name(llm)
+    if answer_cache:
+        with span("answer_cache"):
+            cached_answer = answer_cache.get(dataset_key, model_key, user_query)
+            # O gráfico da resposta em cache passa a ser referenciado também por esta sessão (se ainda existir).
+            if cached_answer and cached_answer["artifact_path"] and not get_artifact_store().add_ref(cached_answer["artifact_path"], get_session_id()):
+                cached_answer = None
+        if cached_answer:
+            log("💾 **Cache:** Esta pergunta já foi respondida para este conjunto de dados. Servindo a resposta do cache.")
+            thoughts = log_entries + cached_answer["thoughts"] if record_thoughts else []
+            return {"text_answer": cached_answer["text_answer"], "artifact_path": cached_answer["artifact_path"], "thoughts": thoughts,
+                    "cached": True, "cached_at": cached_answer["created_at"]}
 
     tools = [
         {"name": "DataGuardian", "description": "Útil para responder a perguntas que exigem análise de dados brutos, cálculos ou estatísticas."},
@@ -78,9 +218,56 @@ def run_jedi_council(llm: ChatGoogleGenerativeAI, df: pd.DataFrame, user_query:
     ]
 
     try:
-        df_profile = get_data_profile(df)
-        tools_json = json.dumps(tools, indent=2, ensure_ascii=False)
-        tool_selection_prompt = f'''Sua tarefa é selecionar a ferramenta mais apropriada para responder à pergunta do usuário. Você DEVE seguir estas regras:
+        template = match_template(user_query, df) if fast_path else None
+        if template:
+            log(f"⚡ **Caminho rápido:** Pergunta-modelo '{template.intent}' sobre {template.columns}. Executando diretamente, sem agente.")
+            with span("fast_path", intent=template.intent):
+                # Numa thread: a renderização do gráfico (ida e volta ao sandbox) não bloqueia o loop de eventos.
+                template_response = await asyncio.to_thread(run_template, template, df)
+                template_result = template_response["result"]
+                artifact_path = _store_artifact(template_response.get("artifact_path"))
+            if template_response.get("error"):
+                log(f"🔍 **Observação:** O caminho rápido falhou ({template_response['error']}). Seguindo pelo Conselho completo.")
+            else:
+                log(f"🔍 **Observação:** {template_response['thoughts']}")
+                sage_error = None
+                if template.skip_sage:
+                    log("🎬 **Ação:** O usuário pediu apenas o resultado. Dispensando o Sábio.")
+                    final_answer = template_result
+                    if on_event:
+                        on_event("token", final_answer)
+                else:
+                    log("🎬 **Ação:** Acionando a ferramenta `DataSage`.")
+                    final_answer, sage_error = await _astream_sage(llm, template_result, user_query, on_event)
+                if answer_cache and not sage_error:
+                    answer_cache.put(dataset_key, model_key, user_query, final_answer, artifact_path, log_entries)
+                return {"text_answer": final_answer, "artifact_path": artifact_path, "thoughts": log_entries, "table": template_response.get("table"),
+                        "error": sage_error}
+
+        log("🤔 **Pensamento:** Analisando a intenção do usuário para selecionar a ferramenta correta.")
+
+        with span("routing") as routing_span:
+            # Roteador local: padrão compilado (palavras-chave e colunas) e classificador treinado com roteamentos anteriores
+            routing = get_intent_router(df.columns).route(user_query)
+            tool_name = routing.tool_name
+            if routing_span is not None:
+                routing_span.attributes["source"] = routing.source if tool_name else "llm"
+            if routing.source == "keyword_viz":
+                log("💡 **Curto-circuito:** Pergunta de visualização detectada. Forçando o uso do Visualizer.")
+            elif routing.source == "keyword_data":
+                log("💡 **Curto-circuito:** Pergunta de análise de dados detectada. Forçando o uso do DataGuardian.")
+            elif routing.source == "classifier":
+                log(f"🧭 **Roteador local:** Classificador escolheu '{tool_name}' com {routing.confidence:.0%} de confiança.")
+            if routing.source.startswith("keyword"):
+                record_routing(user_query, tool_name, routing.source)
+
+            # Se nenhuma palavra-chave foi detectada, use o LLM para classificação
+            if not tool_name:
+                log("🤔 **Pensamento:** Nenhuma palavra-chave detectada e o roteador local não tem confiança suficiente. Usando LLM para classificação de intenção.")
+                tools_json = json.dumps(tools, indent=2, ensure_ascii=False)
+                # Apenas o esquema compacto (com orçamento de tokens) é necessário para uma escolha entre três ferramentas.
+                df_profile = get_compact_profile(df, schema_only=True)
+                tool_selection_prompt = f'''Sua tarefa é selecionar a ferramenta mais apropriada para responder à pergunta do usuário. Você DEVE seguir estas regras:
 1. Analise o Perfil do DataFrame abaixo. Se a pergunta do usuário mencionar qualquer nome de coluna ou se referir a características dos dados (como 'colunas', 'linhas', 'tipos de dados', 'distribuição', etc.), você DEVE escolher 'DataGuardian' ou 'Visualizer'.
 2. Apenas se a pergunta for uma saudação ou claramente não relacionada aos dados, escolha 'GeneralConversation'.
 
@@ -94,47 +281,33 @@ Pergunta do usuário: "{user_query}"
 
 Ferramenta selecionada (JSON):
 '''
-        
-        log("🤔 **Pensamento:** Analisando a intenção do usuário para selecionar a ferramenta correta.")
-
-        # Lógica de Curto-Circuito para forçar a seleção da ferramenta correta
-        query_lower = user_query.lower()
-        viz_keywords = ['gráfico', 'plot', 'visualize', 'visualização', 'histograma', 'barras', 'pizza', 'scatterplot', 'boxplot']
-        data_keywords = ['coluna', 'colunas', 'dado', 'dados', 'tipo', 'tipos', 'distribuição', 'correlação', 'média', 'mediana']
-
-        tool_name = ""
-        if any(keyword in query_lower for keyword in viz_keywords):
-            tool_name = "Visualizer"
-            log("💡 **Curto-circuito:** Pergunta de visualização detectada. Forçando o uso do Visualizer.")
-        elif any(keyword in query_lower for keyword in data_keywords) or any(col.lower() in query_lower for col in df.columns):
-            tool_name = "DataGuardian"
-            log("💡 **Curto-circuito:** Pergunta de análise de dados detectada. Forçando o uso do DataGuardian.")
-        
-        # Se nenhuma palavra-chave foi detectada, use o LLM para classificação
-        if not tool_name:
-            log("🤔 **Pensamento:** Nenhuma palavra-chave detectada. Usando LLM para classificação de intenção.")
-            response = llm.invoke(tool_selection_prompt)
-            tool_choice_str = response.content.strip()
-            try:
-                if tool_choice_str.startswith("```json"):
-                    tool_choice_str = tool_choice_str[7:-3].strip()
-                tool_choice = json.loads(tool_choice_str)
-                if isinstance(tool_choice, dict):
-                    tool_name = tool_choice.get('tool_name')
-            except (json.JSONDecodeError, AttributeError):
-                if "DataGuardian" in tool_choice_str:
-                    tool_name = "DataGuardian"
-                elif "Visualizer" in tool_choice_str:
-                    tool_name = "Visualizer"
-                elif "GeneralConversation" in tool_choice_str:
+                response = await llm.ainvoke(tool_selection_prompt)
+                tool_choice_str = response.content.strip()
+                try:
+                    if tool_choice_str.startswith("```json"):
+                        tool_choice_str = tool_choice_str[7:-3].strip()
+                    tool_choice = json.loads(tool_choice_str)
+                    if isinstance(tool_choice, dict):
+                        tool_name = tool_choice.get('tool_name')
+                except (json.JSONDecodeError, AttributeError):
+                    if "DataGuardian" in tool_choice_str:
+                        tool_name = "DataGuardian"
+                    elif "Visualizer" in tool_choice_str:
+                        tool_name = "Visualizer"
+                    elif "GeneralConversation" in tool_choice_str:
+                        tool_name = "GeneralConversation"
+                if tool_name in ("DataGuardian", "Visualizer", "GeneralConversation"):
+                    record_routing(user_query, tool_name, "llm")
+                else:
                     tool_name = "GeneralConversation"
-            if not tool_name:
-                tool_name = "GeneralConversation"
         log(f"🤔 **Pensamento:** A intenção parece ser '{tool_name}'.")
 
         if tool_name == "GeneralConversation":
             log("🎬 **Ação:** A pergunta é uma conversa geral. Acionando o modo de conversação.")
-            response_text = handle_general_conversation(llm, user_query)
+            with span("general_conversation"):
+                response_text = await ahandle_general_conversation(llm, user_query)
+            if answer_cache and not response_text.startswith(GENERAL_CONVERSATION_ERROR_PREFIX):
+                answer_cache.put(dataset_key, model_key, user_query, response_text, None, log_entries)
             return {"text_answer": response_text, "artifact_path": None, "thoughts": log_entries}
 
         guidance_prompt = f"""
@@ -151,38 +324,60 @@ Ferramenta selecionada (JSON):
 
         Sua avaliação para a pergunta "{user_query}":
         """
-        log("🤔 **Pensamento:** Verificando se a pergunta é clara ou se posso sugerir uma abordagem melhor.")
-        guidance_response = llm.invoke(guidance_prompt)
-        guidance_check = json.loads(guidance_response.content.strip().replace("```json", "").replace("```", ""))
+        speculative_tool = None
+        if speculative and clarify:
+            log(f"⚡ **Especulação:** Acionando a ferramenta `{tool_name}` em paralelo com a verificação de clareza.")
+            speculative_tool = asyncio.create_task(_arun_tool(llm, df, tool_name, user_query, record_thoughts, agent_events))
+
+        if clarify:
+            log("🤔 **Pensamento:** Verificando se a pergunta é clara ou se posso sugerir uma abordagem melhor.")
+            try:
+                with span("guidance"):
+                    guidance_response = await llm.ainvoke(guidance_prompt)
+                    guidance_check = json.loads(guidance_response.content.strip().replace("```json", "").replace("```", ""))
+            except Exception:
+                if speculative_tool is not None:
+                    _discard_speculative_tool(speculative_tool)
+                raise
+        else:
+            log("🤔 **Pensamento:** Modo sem esclarecimentos. Dispensando o Consultor.")
+            guidance_check = {"action": "proceed"}
 
         if guidance_check.get("action") == "clarify":
             log(f"🎬 **Ação:** A pergunta é ambígua/pode ser melhorada. Pedindo esclarecimento ao usuário.")
+            if speculative_tool is not None:
+                log("⚡ **Especulação:** Descartando o resultado especulativo da ferramenta.")
+                _discard_speculative_tool(speculative_tool)
             st.session_state.pending_clarification = {"original_query": user_query, "intended_tool": tool_name}
             return {"text_answer": guidance_check["response"], "artifact_path": None, "thoughts": log_entries}
         
         log(f"🤔 **Pensamento:** A pergunta é clara. Acionando a ferramenta '{tool_name}'.")
-        log(f"🎬 **Ação:** Acionando a ferramenta `{tool_name}`.")
-        tool_response = {}
-        if tool_name == "DataGuardian":
-            tool_response = run_guardian_query(llm, df, user_query, record_thoughts)
-        elif tool_name == "Visualizer":
-            tool_response = create_static_plot(llm, df, user_query, record_thoughts)
+        if speculative_tool is not None:
+            log(f"🎬 **Ação:** Aguardando o resultado especulativo da ferramenta `{tool_name}`.")
+            tool_response = await speculative_tool
+        else:
+            log(f"🎬 **Ação:** Acionando a ferramenta `{tool_name}`.")
+            tool_response = await _arun_tool(llm, df, tool_name, user_query, record_thoughts, agent_events)
         
         tool_result = tool_response.get("result", "")
-        specialist_thoughts = tool_response.get("thoughts", "")
+        specialist_thoughts = tool_response.get("thoughts", [])
+        artifact_path = _store_artifact(tool_result) if tool_name == "Visualizer" else None
+        if artifact_path:
+            tool_result = artifact_path
 
-        if record_thoughts and specialist_thoughts:
-            log(f"--- Início do Log Detalhado de {tool_name} ---")
-            log(f"```\n{specialist_thoughts}\n```")
-            log(f"--- Fim do Log Detalhado de {tool_name} ---")
+        log_specialist(tool_name, specialist_thoughts)
 
         log(f"🔍 **Observação:** A ferramenta '{tool_name}' retornou um resultado.")
 
         log("🤔 **Pensamento:** Enviando o resultado para o Sábio fazer a interpretação final.")
         log("🎬 **Ação:** Acionando a ferramenta `DataSage`.")
-        final_answer = get_sage_interpretation(llm, tool_result, user_query)
-        artifact_path = tool_result if tool_name == "Visualizer" else None
-        return {"text_answer": final_answer, "artifact_path": artifact_path, "thoughts": log_entries}
+        final_answer, sage_error = await _astream_sage(llm, tool_result, user_query, on_event)
+        plot_missing = tool_name == "Visualizer" and artifact_path is None
+        if answer_cache and not tool_response.get("error") and not plot_missing and not sage_error:
+            answer_cache.put(dataset_key, model_key, user_query, final_answer, artifact_path, log_entries)
+        return {"text_answer": final_answer, "artifact_path": artifact_path, "thoughts": log_entries, "table": _result_table(tool_result),
+                "error": sage_error}
 
     except Exception as e:
-        return {"text_answer": f"O Conselho Jedi encontrou uma perturbação na Força. Um erro crítico ocorreu: {str(e)}", "artifact_path": None, "thoughts": log_entries}
\ No newline at end of file
+        return {"text_answer": f"O Conselho Jedi encontrou uma perturbação na Força. Um erro crítico ocorreu: {str(e)}", "artifact_path": None, "thoughts": log_entries,
+                "error": str(e)}
\ No newline at end of file
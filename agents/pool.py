@@ -0,0 +1,141 @@
+from collections import OrderedDict
+import re
+import uuid
+import threading
+from contextvars import ContextVar
+import pandas as pd
+import streamlit as st
+from pydantic import Field
+from langchain_experimental.agents import create_pandas_dataframe_agent
+from langchain_experimental.tools.python.tool import PythonAstREPLTool, sanitize_input
+
+from utils import get_dataframe_fingerprint
+from core.sandbox import get_sandbox_pool, save_images, expected_image_path, inprocess_render_lock, SandboxTimeout, SandboxCrashed, SANDBOX_ENABLED
+from core.sandbox_worker import picklable_items, transportable
+from agents.events import publish_tool_value
+
+DEFAULT_POOL_SIZE = 4
+
+# Pool fixado pelo chamador fora de uma sessão Streamlit (ex: cada tarefa do modo em lote tem o seu).
+_active_pool = ContextVar("jedi_agent_pool", default=None)
+
+def get_llm_model_name(llm) -> str:
+    """Retorna um identificador estável do modelo (provedor + nome) de um objeto LLM."""
+    model = getattr(llm, "model", None) or getattr(llm, "model_name", None) or ""
+    return f"{type(llm).__name__}:{model}"
+
+# Código que desenha algo precisa de exclusão mútua quando roda no processo do servidor (sandbox desativado).
+PLOTTING_CODE = re.compile(r"\b(plt|sns|seaborn|matplotlib|savefig|histogram|density_scatter|boxplot)\b|\.(plot|hist)\(")
+
+class SandboxedREPLTool(PythonAstREPLTool):
+    """
+    REPL dos agentes pandas que executa cada passo de código em um processo do sandbox (ver `core.sandbox`),
+    com limites de CPU e memória e o DataFrame compartilhado sem cópia. O namespace do REPL fica no processo
+    entre os passos (`session_key`); os PNGs salvos pelo código voltam em bytes e são gravados no servidor.
+    `reset` devolve o REPL aos nomes iniciais (`base_locals`) antes de cada pergunta: variáveis e filtros
+    como `df = df[df.Class == 1]` de uma pergunta não alcançam a seguinte.
+    Com o sandbox desativado (`JEDI_SANDBOX=0`), o código roda no servidor como no REPL original.
+    O valor da última expressão de cada passo é entregue ao agente em execução (`publish_tool_value`),
+    que o repassa ao Conselho como resultado tipado (ver `core.results`).
+    """
+    session_key: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    base_locals: dict = Field(default_factory=dict)
+
+    def reset(self):
+        """Namespace novo (local e no sandbox), com uma cópia rasa do `df`: com Copy-on-Write, nada volta ao original."""
+        if SANDBOX_ENABLED:
+            get_sandbox_pool().drop_namespace(self.session_key)
+        self.session_key = uuid.uuid4().hex
+        self.globals = {}
+        self.locals = {**self.base_locals, "df": self.base_locals["df"].copy(deep=False)}
+
+    def _run_in_process(self, query: str, run_manager=None) -> str:
+        # O REPL original devolve o próprio objeto quando a última linha é uma expressão.
+        output = super()._run(query, run_manager)
+        if isinstance(output, str):
+            publish_tool_value(None)
+            return output
+        publish_tool_value(transportable(output))
+        return str(output)
+
+    def _run(self, query: str, run_manager=None) -> str:
+        if not SANDBOX_ENABLED:
+            if PLOTTING_CODE.search(query):
+                with inprocess_render_lock:
+                    return self._run_in_process(query, run_manager)
+            return self._run_in_process(query, run_manager)
+        code = sanitize_input(query) if self.sanitize_input else query
+        df = self.locals["df"]
+        image_path = expected_image_path()
+        try:
+            result = get_sandbox_pool().run(code, df, get_dataframe_fingerprint(df), self.session_key,
+                                            picklable_items(self.locals, exclude={"df"}), image_path=image_path)
+        except (SandboxTimeout, SandboxCrashed) as e:
+            publish_tool_value(None)
+            return f"{type(e).__name__}: {str(e)}"
+        save_images(result.images, image_path)
+        publish_tool_value(result.value)
+        return result.output
+
+class AgentPool:
+    """
+    Pool LRU de agentes pandas já construídos, indexado por (modelo, cliente de LLM, impressão digital do
+    DataFrame, papel).
+
+    A construção do agente (ferramentas, REPL Python e o prompt com `df.head()`) é paga uma única vez
+    por conjunto de dados; as perguntas seguintes reutilizam o executor já aquecido, mas não o estado do
+    REPL, que recomeça a cada `get`.
+    """
+    def __init__(self, max_size: int = DEFAULT_POOL_SIZE):
+        self.max_size = max_size
+        self._agents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, llm, df: pd.DataFrame, role: str, repl_locals: dict = None):
+        """
+        Retorna o agente do papel `role` para `df`. `repl_locals` são nomes extras (ex: funções auxiliares)
+        disponibilizados no REPL Python do agente quando ele é construído.
+        Os passos do agente são registrados por callbacks a cada execução (ver `agents.events`), não pelo modo verboso.
+        """
+        # A identidade do cliente entra na chave: com outras credenciais, a fábrica entrega outro cliente e o
+        # agente é reconstruído. O agente guardado mantém o cliente vivo, então o `id` não é reaproveitado.
+        key = (get_llm_model_name(llm), id(llm), get_dataframe_fingerprint(df), role)
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is not None:
+                self._agents.move_to_end(key)
+                agent.tools[0].reset()
+            else:
+                agent = create_pandas_dataframe_agent(
+                    llm, df, agent_type="zero-shot-react-description",
+                    verbose=False, allow_dangerous_code=True
+                )
+                if repl_locals:
+                    agent.tools[0].locals.update(repl_locals)
+                # Mesmo nome e descrição do REPL original, então o prompt do agente não muda.
+                base_locals = dict(agent.tools[0].locals)
+                agent.tools[0] = SandboxedREPLTool(locals={**base_locals, "df": df.copy(deep=False)}, base_locals=base_locals)
+                self._agents[key] = agent
+                while len(self._agents) > self.max_size:
+                    self._agents.popitem(last=False)
+        return agent
+
+    def clear(self):
+        with self._lock:
+            self._agents.clear()
+
+    def __len__(self):
+        return len(self._agents)
+
+def use_agent_pool(pool: AgentPool):
+    """Faz `get_agent_pool` retornar `pool` no contexto atual (e nas tarefas asyncio criadas a partir dele)."""
+    return _active_pool.set(pool)
+
+def get_agent_pool() -> AgentPool:
+    """Retorna o pool de agentes da sessão Streamlit atual (ou o fixado por `use_agent_pool`), criando-o se necessário."""
+    pool = _active_pool.get()
+    if pool is not None:
+        return pool
+    if "agent_pool" not in st.session_state:
+        st.session_state.agent_pool = AgentPool()
+    return st.session_state.agent_pool
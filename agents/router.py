@@ -0,0 +1,185 @@
+import os
+import re
+import json
+import math
+import threading
+import unicodedata
+from collections import Counter, OrderedDict, namedtuple
+
+ROUTING_LOG_PATH = os.getenv("JEDI_ROUTING_LOG", ".jedi_cache/routing_log.jsonl")
+ROUTING_LOG_MAX_MB = int(os.getenv("JEDI_ROUTING_LOG_MB", "16"))
+CLASSIFIER_CONFIDENCE = float(os.getenv("JEDI_ROUTER_CONFIDENCE", "0.85"))
+CLASSIFIER_MIN_EXAMPLES = 20
+ROUTER_CACHE_SIZE = 8
+
+VIZ_KEYWORDS = ['gráfico', 'plot', 'visualize', 'visualização', 'histograma', 'barras', 'pizza', 'scatterplot', 'boxplot']
+DATA_KEYWORDS = ['coluna', 'colunas', 'dado', 'dados', 'tipo', 'tipos', 'distribuição', 'correlação', 'média', 'mediana']
+
+RouteDecision = namedtuple("RouteDecision", ["tool_name", "source", "confidence"])
+
+def fold_text(text: str) -> str:
+    """Minúsculas e sem acentos, para que 'Média', 'media' e 'MÉDIA' casem com o mesmo padrão."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def _trie_pattern(words) -> str:
+    """
+    Monta uma expressão regular em forma de trie (prefixos comuns fatorados) para um conjunto de palavras.
+    Assim o motor de regex testa cada posição do texto contra a trie, e não contra cada palavra isoladamente.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        if list(node) == [""]:
+            return ""
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        optional = "" in node
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie) if trie else r"(?!x)x"
+
+def _tokens(text: str) -> list:
+    words = re.findall(r"\w+", fold_text(text))
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+class NaiveBayesIntentClassifier:
+    """Classificador Naive Bayes multinomial (palavras e bigramas) treinado com as perguntas já roteadas."""
+    def __init__(self):
+        self.class_counts = Counter()
+        self.token_counts = {}
+        self.token_totals = Counter()
+        self.vocabulary = set()
+        self._lock = threading.Lock()
+
+    @property
+    def examples(self) -> int:
+        return sum(self.class_counts.values())
+
+    def partial_fit(self, query: str, label: str):
+        tokens = _tokens(query)
+        with self._lock:
+            self.class_counts[label] += 1
+            self.token_counts.setdefault(label, Counter()).update(tokens)
+            self.token_totals[label] += len(tokens)
+            self.vocabulary.update(tokens)
+
+    def predict(self, query: str):
+        """Retorna (rótulo, probabilidade a posteriori) ou (None, 0.0) se não houver treino."""
+        tokens = _tokens(query)
+        with self._lock:
+            if not self.class_counts:
+                return None, 0.0
+            total = self.examples
+            vocabulary_size = len(self.vocabulary) + 1
+            scores = {}
+            for label, count in self.class_counts.items():
+                score = math.log(count / total)
+                label_tokens = self.token_counts[label]
+                denominator = self.token_totals[label] + vocabulary_size
+                for token in tokens:
+                    score += math.log((label_tokens[token] + 1) / denominator)
+                scores[label] = score
+        best = max(scores, key=scores.get)
+        normalizer = max(scores.values())
+        probabilities = {label: math.exp(score - normalizer) for label, score in scores.items()}
+        return best, probabilities[best] / sum(probabilities.values())
+
+class IntentRouter:
+    """
+    Roteador local de intenções do Mestre.
+
+    1. Um único padrão compilado (em forma de trie) com palavras-chave de visualização e de análise,
+       nas versões com e sem acento, e os nomes das colunas do conjunto de dados.
+    2. Um classificador local treinado com as perguntas já roteadas, usado apenas acima de `confidence`.
+    Se nenhum dos dois decidir, `route` devolve uma decisão vazia e o Mestre consulta o LLM.
+    """
+    def __init__(self, columns, classifier: NaiveBayesIntentClassifier = None, confidence: float = CLASSIFIER_CONFIDENCE):
+        self.classifier = classifier
+        self.confidence = confidence
+        self.viz_pattern = re.compile(_trie_pattern({fold_text(k) for k in VIZ_KEYWORDS}))
+        self.data_pattern = re.compile(_trie_pattern({fold_text(k) for k in DATA_KEYWORDS}))
+        column_names = {fold_text(str(col)) for col in columns if str(col).strip()}
+        # Nomes de colunas exigem fronteira de palavra: colunas curtas como 'a' ou 'id' não devem casar com qualquer texto.
+        self.column_pattern = re.compile(r"(?<!\w)" + _trie_pattern(column_names) + r"(?!\w)") if column_names else None
+
+    def route(self, query: str) -> RouteDecision:
+        folded = fold_text(query)
+        if self.viz_pattern.search(folded):
+            return RouteDecision("Visualizer", "keyword_viz", 1.0)
+        if self.data_pattern.search(folded) or (self.column_pattern and self.column_pattern.search(folded)):
+            return RouteDecision("DataGuardian", "keyword_data", 1.0)
+        if self.classifier and self.classifier.examples >= CLASSIFIER_MIN_EXAMPLES:
+            label, probability = self.classifier.predict(query)
+            if label and probability >= self.confidence:
+                return RouteDecision(label, "classifier", probability)
+        return RouteDecision("", "none", 0.0)
+
+# --- Registro de Roteamentos e Classificador Compartilhado ---
+_log_lock = threading.Lock()
+_classifier = None
+_routers = OrderedDict()
+
+def record_routing(query: str, tool_name: str, source: str, path: str = ROUTING_LOG_PATH):
+    """Registra uma decisão de roteamento (dado de treino do classificador) e atualiza o classificador em memória."""
+    with _log_lock:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"query": query, "tool_name": tool_name, "source": source}, ensure_ascii=False) + "\n")
+        if os.path.getsize(path) > ROUTING_LOG_MAX_MB * 1024 * 1024:
+            _compact_log(path, ROUTING_LOG_MAX_MB * 1024 * 1024 // 2)
+    get_intent_classifier().partial_fit(query, tool_name)
+
+def _compact_log(path: str, keep_bytes: int):
+    """Reescreve o registro só com as decisões mais recentes que cabem em `keep_bytes` (chamado com `_log_lock`)."""
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    kept, size = [], 0
+    for line in reversed(lines):
+        if size + len(line) > keep_bytes:
+            break
+        kept.append(line)
+        size += len(line)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.writelines(reversed(kept))
+    os.replace(tmp_path, path)
+
+def get_intent_classifier(path: str = ROUTING_LOG_PATH) -> NaiveBayesIntentClassifier:
+    """Classificador do processo, treinado uma vez a partir do registro de roteamentos em disco."""
+    global _classifier
+    with _log_lock:
+        if _classifier is None:
+            _classifier = NaiveBayesIntentClassifier()
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            _classifier.partial_fit(entry["query"], entry["tool_name"])
+                        except (json.JSONDecodeError, KeyError):
+                            continue
+    return _classifier
+
+def get_intent_router(columns) -> IntentRouter:
+    """Roteador compilado para um conjunto de colunas, reaproveitado entre perguntas sobre o mesmo conjunto de dados."""
+    key = tuple(map(str, columns))
+    with _log_lock:
+        router = _routers.get(key)
+        if router is not None:
+            _routers.move_to_end(key)
+            return router
+    router = IntentRouter(columns, classifier=get_intent_classifier())
+    with _log_lock:
+        _routers[key] = router
+        while len(_routers) > ROUTER_CACHE_SIZE:
+            _routers.popitem(last=False)
+    return router
@@ -1,11 +1,9 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 
-def get_sage_interpretation(llm: ChatGoogleGenerativeAI, data_context: str, user_query: str) -> str:
-    """
-    Uses an LLM to interpret raw data or analysis results in a conversational,
-    thematic way, acting as the \'Sage\' of the Jedi Council.
-    """
-    prompt = f"""
+SAGE_ERROR_PREFIX = "The Sage is having trouble interpreting the Force."
+
+def _build_sage_prompt(data_context: str, user_query: str) -> str:
+    return f"""
 Você é um Sábio Jedi. Seu papel é interpretar dados complexos para os outros,
 encontrando a história e o significado dentro dos números. Você fala de uma maneira clara, perspicaz,
 e levemente temática.
@@ -25,9 +23,38 @@ Comece sua resposta com uma abertura sábia e temática.
 Responda sempre no mesmo idioma da \'Consulta Original do Usuário\'.
 """
 
+def _chunk_text(chunk) -> str:
+    # Chat models stream AIMessageChunk objects; text LLMs (e.g. Ollama) stream plain strings.
+    return chunk if isinstance(chunk, str) else chunk.content
+
+def get_sage_interpretation(llm: ChatGoogleGenerativeAI, data_context: str, user_query: str) -> str:
+    """
+    Uses an LLM to interpret raw data or analysis results in a conversational,
+    thematic way, acting as the \'Sage\' of the Jedi Council.
+    """
+    prompt = _build_sage_prompt(data_context, user_query)
+
     try:
         response = llm.invoke(prompt)
         # The response from invoke is an AIMessage object, we need its content
         return response.content.strip()
     except Exception as e:
-        return f"The Sage is having trouble interpreting the Force. Error: {str(e)}"
+        return sage_error_message(e)
+
+def sage_error_message(error: Exception) -> str:
+    return f"{SAGE_ERROR_PREFIX} Error: {str(error)}"
+
+async def astream_sage_interpretation(llm: ChatGoogleGenerativeAI, data_context: str, user_query: str):
+    """
+    Async streaming version of `get_sage_interpretation`: yields the Sage's answer
+    token by token as the LLM produces it.
+
+    Unlike `get_sage_interpretation`, LLM errors are raised (possibly after some chunks were
+    already yielded), so callers can tell a truncated answer from a complete one.
+    """
+    prompt = _build_sage_prompt(data_context, user_query)
+
+    async for chunk in llm.astream(prompt):
+        text = _chunk_text(chunk)
+        if text:
+            yield text
@@ -4,10 +4,10 @@ os.environ['GRPC_VERBOSITY'] = 'ERROR'
 # --- Importações Essenciais ---
 import streamlit as st
 
-# Importa as funções de cada página
+# Importa as funções das páginas leves. A página de análise (LangChain, pandas, matplotlib, docx)
+# só é importada quando o usuário chega nela, para que as telas de boas-vindas e de login abram na hora.
 from views.welcome import welcome_screen
 from views.login import login_page
-from views.main_app import main_app
 
 
 
@@ -29,4 +29,5 @@ if not st.session_state.welcome_seen:
 elif not st.session_state.logged_in:
     login_page()
 else:
+    from views.main_app import main_app
     main_app()
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Modo em lote do JEDI: executa uma lista de perguntas sobre um CSV sem a interface Streamlit e gera o
+relatório .docx e um arquivo de resultados legível por máquina.
+
+O CSV é carregado (pelo cache de DataFrames por hash de conteúdo) e o perfil é calculado uma única vez para
+todas as perguntas. As perguntas rodam em paralelo, até `--concurrency` por vez; cada tarefa tem o seu pool
+de agentes (e o seu REPL no sandbox). Como não há usuário para responder, o Consultor não pede
+esclarecimentos (`clarify=False` em `arun_jedi_council`).
+
+O arquivo de perguntas tem uma pergunta por linha (linhas vazias ou iniciadas por '#' são ignoradas) ou é
+uma lista JSON de textos. No diretório de saída:
+- `relatorio.docx`: o perfil dos dados e uma seção por pergunta;
+- `resultados.jsonl`: uma linha por pergunta (resposta, erro, duração, caminhos do gráfico e da tabela,
+  tempos por etapa do trace);
+- `graficos/` e `tabelas/`: os gráficos gerados e os resultados completos das ferramentas (CSV).
+O processo sai com código 1 se alguma pergunta falhou.
+
+Uso, a partir da raiz do projeto:
+    python batch.py dados.csv perguntas.txt --output saida/ --provider Gemini --model models/gemini-2.0-flash
+    JEDI_FAKE_PROVIDER=1 python batch.py dados.csv perguntas.txt --output saida/ --provider Fake --model fake-jedi
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+
+BATCH_CONCURRENCY = int(os.getenv("JEDI_BATCH_CONCURRENCY", "4"))
+REPORT_FILE = "relatorio.docx"
+RESULTS_FILE = "resultados.jsonl"
+
+def load_questions(path: str) -> list:
+    """Perguntas de um arquivo de texto (uma por linha) ou de uma lista JSON."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".json"):
+        return [str(question).strip() for question in json.loads(text) if str(question).strip()]
+    return [line.strip() for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+
+async def arun_batch(llm, df, questions: list, concurrency: int = BATCH_CONCURRENCY, use_cache: bool = True,
+                     record_thoughts: bool = False, on_result=None) -> list:
+    """
+    Executa `questions` sobre `df` com até `concurrency` perguntas em paralelo e retorna um registro por
+    pergunta, na ordem da lista: `index`, `question`, `answer`, `error` (None se deu certo), `seconds`,
+    `cached`, `artifact_path`, `table` (DataFrame ou None), `thoughts` e `trace`.
+    `on_result(registro)`, se fornecido, recebe cada registro assim que a pergunta termina.
+    """
+    from agents.master import arun_jedi_council
+    from agents.pool import AgentPool, use_agent_pool
+
+    queue = asyncio.Queue()
+    for index, question in enumerate(questions):
+        queue.put_nowait((index, question))
+    results = [None] * len(questions)
+
+    async def lane():
+        # Cada tarefa do `gather` roda numa cópia do contexto: o pool fixado aqui vale só para ela.
+        use_agent_pool(AgentPool())
+        while not queue.empty():
+            index, question = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await arun_jedi_council(llm, df, question, record_thoughts, use_cache, clarify=False)
+            except Exception as e:
+                response = {"text_answer": "", "error": str(e)}
+            record = {
+                "index": index, "question": question, "answer": response.get("text_answer", ""), "error": response.get("error"),
+                "seconds": round(time.perf_counter() - start, 3), "cached": bool(response.get("cached")),
+                "artifact_path": response.get("artifact_path"), "table": response.get("table"),
+                "thoughts": response.get("thoughts", []), "trace": response.get("trace", []),
+            }
+            results[index] = record
+            if on_result:
+                on_result(record)
+
+    await asyncio.gather(*(lane() for _ in range(max(1, min(concurrency, len(questions))))))
+    return results
+
+def run_batch(llm, df, questions: list, concurrency: int = BATCH_CONCURRENCY, use_cache: bool = True,
+              record_thoughts: bool = False, on_result=None) -> list:
+    """Versão síncrona de `arun_batch`, para chamadores fora de um loop asyncio."""
+    return asyncio.run(arun_batch(llm, df, questions, concurrency, use_cache, record_thoughts, on_result))
+
+def write_outputs(results: list, output_dir: str, data_profile: str, user_name: str = "Modo em Lote") -> dict:
+    """
+    Grava o relatório .docx, o `resultados.jsonl`, os gráficos e as tabelas em `output_dir`.
+    Retorna os caminhos do relatório e do arquivo de resultados.
+    """
+    from core.report import generate_docx_report
+
+    plots_dir, tables_dir = os.path.join(output_dir, "graficos"), os.path.join(output_dir, "tabelas")
+    results_path, report_path = os.path.join(output_dir, RESULTS_FILE), os.path.join(output_dir, REPORT_FILE)
+    os.makedirs(output_dir, exist_ok=True)
+    report_items = []
+    with open(results_path, "w", encoding="utf-8") as f:
+        for record in results:
+            name = f"pergunta_{record['index'] + 1:03d}"
+            entry = {key: value for key, value in record.items() if key not in ("artifact_path", "table")}
+            entry["image_path"] = entry["table_path"] = None
+            # Cópias no diretório de saída: o armazém de artefatos pode apagar os originais.
+            if record["artifact_path"] and os.path.exists(record["artifact_path"]):
+                os.makedirs(plots_dir, exist_ok=True)
+                entry["image_path"] = os.path.join(plots_dir, f"{name}{os.path.splitext(record['artifact_path'])[1]}")
+                shutil.copyfile(record["artifact_path"], entry["image_path"])
+            if record["table"] is not None:
+                os.makedirs(tables_dir, exist_ok=True)
+                entry["table_path"] = os.path.join(tables_dir, f"{name}.csv")
+                record["table"].to_csv(entry["table_path"])
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            report_items.append({"id": f"batch-{record['index']}", "user_prompt": record["question"],
+                                 "content": record["answer"] or f"Falha: {record['error']}", "image": entry["image_path"]})
+    with open(report_path, "wb") as f:
+        f.write(generate_docx_report(report_items, data_profile, user_name).getvalue())
+    return {"report": report_path, "results": results_path}
+
+def main():
+    from core.llm_registry import get_providers
+    providers = sorted(get_providers())
+
+    parser = argparse.ArgumentParser(description="Executa uma lista de perguntas do JEDI sobre um CSV e gera o relatório.")
+    parser.add_argument("csv", help="Arquivo CSV com os dados.")
+    parser.add_argument("questions", help="Perguntas: uma por linha (.txt) ou lista JSON (.json).")
+    parser.add_argument("--output", default="jedi_batch", help="Diretório de saída (padrão: jedi_batch).")
+    parser.add_argument("--provider", choices=providers, default="Gemini")
+    parser.add_argument("--model", default="models/gemini-2.0-flash")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Perguntas executadas em paralelo.")
+    parser.add_argument("--no-cache", action="store_true", help="Não reutiliza nem grava respostas no cache de respostas.")
+    parser.add_argument("--thoughts", action="store_true", help="Grava o Diário de Bordo de cada pergunta nos resultados.")
+    parser.add_argument("--user-name", default="Modo em Lote", help="Nome exibido no relatório.")
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions)
+    if not questions:
+        parser.error(f"nenhuma pergunta em {args.questions}")
+    credentials = os.getenv("GOOGLE_API_KEY") if args.provider == "Gemini" else None
+    if args.provider == "Gemini" and not credentials:
+        parser.error("defina GOOGLE_API_KEY para usar o provedor Gemini")
+
+    from utils import get_data_profile
+    from core.data_cache import load_csv_path
+    from core.llm_registry import get_llm_factory
+    from core.artifacts import get_artifact_store, get_session_id
+
+    start = time.perf_counter()
+    df = load_csv_path(args.csv)
+    data_profile = get_data_profile(df)
+    print(f"{len(df):,} linhas x {df.shape[1]} colunas carregadas e perfiladas em {time.perf_counter() - start:.1f}s.", flush=True)
+
+    llm = get_llm_factory().get(args.provider, args.model, credentials)
+
+    def report_progress(record):
+        status = "falhou" if record["error"] else ("cache" if record["cached"] else "ok")
+        print(f"[{record['index'] + 1}/{len(questions)}] {status:<6} {record['seconds']:>7.1f}s  {record['question'][:80]}", flush=True)
+
+    start = time.perf_counter()
+    results = run_batch(llm, df, questions, args.concurrency, not args.no_cache, args.thoughts, report_progress)
+    paths = write_outputs(results, args.output, data_profile, args.user_name)
+    # Os gráficos já foram copiados para a saída: libera as referências desta execução no armazém.
+    get_artifact_store().release_session(get_session_id())
+
+    failures = sum(1 for record in results if record["error"])
+    print(f"\n{len(results) - failures}/{len(results)} perguntas respondidas em {time.perf_counter() - start:.1f}s.")
+    print(f"Relatório: {paths['report']}\nResultados: {paths['results']}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Benchmark offline do Conselho, sem rede e sem chave de API.
+
+Usa o modelo local e determinístico de `core.fake_llm` (respostas roteirizadas em JSON e ReAct) e conjuntos
+de dados sintéticos (`benchmarks.datasets`) para medir, em cada tamanho de dados:
+- `profile`: `get_data_profile`;
+- `fast_path`: `run_jedi_council` numa pergunta-modelo (média de uma coluna);
+- `council`: `run_jedi_council` pelo caminho completo (roteamento, Consultor, Guardião, Sábio), com o tempo
+  de cada etapa interna vindo do trace (`core.tracing`);
+- `plot`: `create_static_plot`;
+- `report`: `generate_docx_report` com os gráficos gerados.
+
+Para cada etapa são reportados a mediana e o mínimo da latência, o pico de memória alocada no processo
+(tracemalloc, numa execução à parte) e, no fim, o expoente de escala (inclinação log-log da latência em
+função do número de linhas e de colunas). O código dos agentes roda no sandbox, cujos processos não entram
+no pico de memória.
+
+Uso, a partir da raiz do projeto:
+    python -m benchmarks.council --grid default
+    python -m benchmarks.council --grid default --save-baseline main
+    python -m benchmarks.council --grid default --compare main   # sai com código 1 se houver regressão
+"""
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from benchmarks.datasets import make_dataset
+from core.fake_llm import FakeJediChatModel
+
+# Tamanhos (linhas, colunas). As curvas de escala variam um eixo mantendo o outro fixo.
+GRIDS = {
+    "smoke": [(10_000, 10), (100_000, 10), (10_000, 100)],
+    "default": [(10_000, 10), (100_000, 10), (1_000_000, 10), (10_000, 100), (10_000, 1000)],
+    "full": [(10_000, 10), (100_000, 10), (1_000_000, 10), (10_000_000, 10), (50_000_000, 10),
+             (10_000, 100), (10_000, 1000), (1_000_000, 100)],
+}
+STAGES = ["profile", "fast_path", "council", "plot", "report"]
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+# Diferenças abaixo deste valor são tratadas como ruído na comparação com a linha de base.
+NOISE_FLOOR_SECONDS = 0.005
+
+def _stage_functions(llm, df: pd.DataFrame, state: dict) -> dict:
+    # Importados aqui para que `--help` e a validação dos argumentos não carreguem o LangChain.
+    from utils import get_data_profile
+    from agents.master import run_jedi_council
+    from agents.artisan import create_static_plot
+    from core.report import generate_docx_report
+
+    column = df.columns[0]
+
+    def profile():
+        state["profile"] = get_data_profile(df)
+
+    def fast_path():
+        return run_jedi_council(llm, df, f"Qual a média de {column}?", use_cache=False, fast_path=True)
+
+    def council():
+        return run_jedi_council(llm, df, "Quais as estatísticas descritivas do conjunto de dados?", use_cache=False, fast_path=False)
+
+    def plot():
+        result = create_static_plot(llm, df, f"Histograma da coluna {column}")
+        if os.path.exists(str(result["result"])):
+            state.setdefault("plots", []).append(result["result"])
+        return result
+
+    def report():
+        pinned = [{"id": f"bench-{i}", "user_prompt": f"Histograma da coluna {column}", "content": "**Resultado** do benchmark.",
+                   "image": path} for i, path in enumerate(state.get("plots", [])[:5])]
+        return generate_docx_report(pinned, state.get("profile"), "Benchmark")
+
+    return {"profile": profile, "fast_path": fast_path, "council": council, "plot": plot, "report": report}
+
+def measure(fn, repeat: int, warmup: int) -> dict:
+    """Latência (mediana e mínimo de `repeat` execuções, após `warmup`) e pico de memória numa execução rastreada."""
+    result = None
+    for _ in range(warmup):
+        result = fn()
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    # Execução separada: o tracemalloc deixa o código Python mais lento e distorceria a latência.
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    measurement = {"median_seconds": statistics.median(samples), "min_seconds": min(samples), "peak_mb": peak / 1024 / 1024}
+    # Para o Conselho, o tempo de cada etapa interna (roteamento, Consultor, ferramenta, Sábio) da última execução.
+    if isinstance(result, dict) and result.get("trace"):
+        measurement["substages"] = {row["etapa"]: (row["duração (ms)"] or 0) / 1000 for row in result["trace"]}
+    return measurement
+
+def run_benchmark(grid, stages, repeat: int, warmup: int, latency: float, seed: int) -> dict:
+    llm = FakeJediChatModel(latency=latency, cache=False)
+    results = {}
+    for rows, columns in grid:
+        key = f"{rows}x{columns}"
+        print(f"\n== {rows:,} linhas x {columns} colunas ==", flush=True)
+        start = time.perf_counter()
+        df = make_dataset(rows, columns, seed)
+        print(f"   dados gerados em {time.perf_counter() - start:.1f}s ({df.memory_usage(deep=True).sum() / 1024 / 1024:,.0f} MB)", flush=True)
+        state = {}
+        functions = _stage_functions(llm, df, state)
+        # O relatório usa o perfil e os gráficos: as etapas das quais ele depende rodam antes, mesmo fora da seleção.
+        for stage in STAGES:
+            if stage not in stages and not (stage in ("profile", "plot") and "report" in stages):
+                continue
+            measurement = measure(functions[stage], repeat, warmup)
+            if stage in stages:
+                results.setdefault(key, {"rows": rows, "columns": columns, "stages": {}})["stages"][stage] = measurement
+                substages = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in measurement.get("substages", {}).items())
+                print(f"   {stage:<10} {measurement['median_seconds'] * 1000:>10.1f} ms  (mín {measurement['min_seconds'] * 1000:.1f})"
+                      f"  pico {measurement['peak_mb']:>8.1f} MB  {substages}", flush=True)
+        for path in state.get("plots", []):
+            if os.path.exists(path):
+                os.remove(path)
+        del df, state, functions
+        gc.collect()
+    return results
+
+def scaling_exponents(results: dict) -> dict:
+    """Inclinação log-log da latência de cada etapa ao variar as linhas (colunas fixas) e as colunas (linhas fixas)."""
+    exponents = {}
+    entries = list(results.values())
+    for stage in STAGES:
+        for axis, fixed in (("rows", "columns"), ("columns", "rows")):
+            groups = {}
+            for entry in entries:
+                if stage in entry["stages"]:
+                    groups.setdefault(entry[fixed], []).append((entry[axis], entry["stages"][stage]["median_seconds"]))
+            points = max(groups.values(), key=len, default=[])
+            if len(points) >= 2:
+                x, y = np.log([p[0] for p in points]), np.log([max(p[1], 1e-6) for p in points])
+                exponents.setdefault(stage, {})[axis] = float(np.polyfit(x, y, 1)[0])
+    return exponents
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Etapas cuja latência mediana ou pico de memória passou da linha de base em mais de `tolerance` (fração)."""
+    regressions = []
+    for key, entry in results.items():
+        for stage, measurement in entry["stages"].items():
+            reference = baseline.get("results", {}).get(key, {}).get("stages", {}).get(stage)
+            if not reference:
+                continue
+            latency, reference_latency = measurement["median_seconds"], reference["median_seconds"]
+            if latency > reference_latency * (1 + tolerance) and latency - reference_latency > NOISE_FLOOR_SECONDS:
+                regressions.append(f"{key} {stage}: latência {reference_latency * 1000:.1f}ms -> {latency * 1000:.1f}ms")
+            if measurement["peak_mb"] > reference["peak_mb"] * (1 + tolerance) and measurement["peak_mb"] - reference["peak_mb"] > 1:
+                regressions.append(f"{key} {stage}: memória {reference['peak_mb']:.1f}MB -> {measurement['peak_mb']:.1f}MB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline do Conselho com LLM local e dados sintéticos.")
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="default", help="Conjunto de tamanhos de dados.")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Etapas a medir, separadas por vírgula ({','.join(STAGES)}).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="Atraso simulado (s) por chamada do LLM local.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Grava os resultados neste arquivo JSON.")
+    parser.add_argument("--save-baseline", metavar="NOME", help="Grava os resultados como linha de base em benchmarks/baselines/NOME.json.")
+    parser.add_argument("--compare", metavar="NOME", help="Compara com benchmarks/baselines/NOME.json; sai com código 1 se houver regressão.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Piora relativa aceita na comparação (padrão: 25%%).")
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"etapas desconhecidas: {', '.join(sorted(unknown))}")
+
+    results = run_benchmark(GRIDS[args.grid], stages, args.repeat, args.warmup, args.latency, args.seed)
+    exponents = scaling_exponents(results)
+    if exponents:
+        print("\nExpoente de escala (latência ~ tamanho^k):")
+        for stage, axes in exponents.items():
+            print(f"   {stage:<10} " + "  ".join(f"{axis}: k={k:.2f}" for axis, k in axes.items()))
+
+    record = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "settings": {"grid": args.grid, "repeat": args.repeat, "warmup": args.warmup, "latency": args.latency, "seed": args.seed},
+        "results": results,
+        "scaling": exponents,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save_baseline}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2, ensure_ascii=False)
+        print(f"\nLinha de base gravada em {path}")
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json"), encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != record["machine"]:
+            print("\nAviso: a linha de base foi gravada em outra máquina; as latências podem não ser comparáveis.")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressões em relação à linha de base '{args.compare}':")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print(f"\nNenhuma regressão em relação à linha de base '{args.compare}'.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+# Conjuntos de dados sintéticos e determinísticos para os benchmarks.
+# As colunas se repetem em ciclos de quatro tipos, como num CSV real de transações:
+# `num_i` (float contínuo), `int_i` (contagens), `cat_i` (categorias de baixa cardinalidade) e `flag_i` (0/1).
+
+CATEGORIES = np.array(["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"], dtype=object)
+
+def make_dataset(rows: int, columns: int, seed: int = 0) -> pd.DataFrame:
+    """DataFrame de `rows` x `columns` com tipos mistos; a mesma semente gera sempre os mesmos dados."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        kind = i % 4
+        if kind == 0:
+            data[f"num_{i // 4}"] = rng.normal(loc=100.0, scale=25.0, size=rows)
+        elif kind == 1:
+            data[f"int_{i // 4}"] = rng.poisson(lam=5, size=rows).astype(np.int32)
+        elif kind == 2:
+            data[f"cat_{i // 4}"] = pd.Categorical.from_codes(rng.integers(0, len(CATEGORIES), size=rows), CATEGORIES).astype(str)
+        else:
+            data[f"flag_{i // 4}"] = rng.integers(0, 2, size=rows, dtype=np.int8)
+    df = pd.DataFrame(data)
+    # Impressão digital estável e barata (ver `utils.get_dataframe_fingerprint`).
+    df.attrs["content_hash"] = f"synthetic-{rows}x{columns}-seed{seed}"
+    return df
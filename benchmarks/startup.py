@@ -0,0 +1,81 @@
+"""
+Benchmark de inicialização do JEDI.
+
+Mede, sempre em processos Python novos (sem cache de módulos):
+- o tempo de importação de cada página (`views.welcome`, `views.login`, `views.main_app`) e quais módulos
+  pesados (LangChain, matplotlib, docx, ...) cada uma carrega;
+- o tempo de partida a frio: do início do processo até a tela de boas-vindas renderizada (`AppTest`).
+
+Uso: `python -m benchmarks.startup [--runs 5] [--json resultado.json]`, a partir da raiz do projeto.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+PAGES = ["views.welcome", "views.login", "views.main_app"]
+HEAVY_MODULES = [
+    "langchain", "langchain_core", "langchain_google_genai", "langchain_community", "langchain_experimental",
+    "google.generativeai", "ollama", "docx", "matplotlib", "seaborn", "pandas", "PIL",
+]
+
+IMPORT_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+COLD_START_PROBE = """
+import time, json
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=120).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "exceptions": [str(e.value) for e in app.exception]}))
+"""
+
+def _probe(code: str) -> dict:
+    env = {**os.environ, "PYTHONPATH": os.getcwd(), "GRPC_VERBOSITY": "ERROR"}
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure_page_imports(runs: int) -> dict:
+    results = {}
+    for module in PAGES:
+        samples = [_probe(IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)) for _ in range(runs)]
+        results[module] = {
+            "median_seconds": statistics.median(s["seconds"] for s in samples),
+            "heavy_modules": samples[-1]["heavy"],
+        }
+    return results
+
+def measure_cold_start(runs: int) -> dict:
+    samples = [_probe(COLD_START_PROBE) for _ in range(runs)]
+    return {"median_seconds": statistics.median(s["seconds"] for s in samples), "exceptions": samples[-1]["exceptions"]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o tempo de partida e de importação das páginas do JEDI.")
+    parser.add_argument("--runs", type=int, default=5, help="Processos novos por medição (a mediana é reportada).")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo JSON.")
+    args = parser.parse_args()
+
+    results = {"page_imports": measure_page_imports(args.runs), "cold_start": measure_cold_start(args.runs)}
+
+    print(f"{'Página':<20} {'Importação (s)':>15}  Módulos pesados carregados")
+    for module, page in results["page_imports"].items():
+        print(f"{module:<20} {page['median_seconds']:>15.3f}  {', '.join(page['heavy_modules']) or '-'}")
+    cold_start = results["cold_start"]
+    print(f"\nPartida a frio até a tela de boas-vindas: {cold_start['median_seconds']:.3f}s")
+    for error in cold_start["exceptions"]:
+        print(f"  Exceção na renderização: {error}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
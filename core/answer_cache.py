@@ -0,0 +1,113 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import unicodedata
+from contextlib import contextmanager
+import streamlit as st
+
+DEFAULT_CACHE_PATH = os.getenv("JEDI_ANSWER_CACHE_PATH", ".jedi_cache/answers.sqlite3")
+DEFAULT_TTL_SECONDS = int(os.getenv("JEDI_ANSWER_CACHE_TTL_HOURS", "168")) * 3600
+DEFAULT_MAX_MB = int(os.getenv("JEDI_ANSWER_CACHE_MB", "64"))
+
+def normalize_query(query: str) -> str:
+    """Normaliza a pergunta para a chave do cache: Unicode NFKC, minúsculas, espaços colapsados e sem pontuação final."""
+    query = unicodedata.normalize("NFKC", query).casefold()
+    query = re.sub(r"\s+", " ", query).strip()
+    return query.rstrip(" ?!.;:")
+
+class AnswerCache:
+    """
+    Cache persistente (SQLite) das respostas do Conselho, indexado por
+    (hash do conjunto de dados, modelo, pergunta normalizada).
+
+    Entradas expiram após `ttl_seconds`; quando o tamanho total das respostas passa de
+    `max_bytes`, as entradas acessadas há mais tempo são removidas.
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024, store_thoughts: bool = True):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.store_thoughts = store_thoughts
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    key TEXT PRIMARY KEY,
+                    dataset TEXT, model TEXT, query TEXT,
+                    text_answer TEXT, artifact_path TEXT, thoughts TEXT,
+                    size INTEGER, created_at REAL, last_access REAL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(dataset: str, model: str, query: str) -> str:
+        return hashlib.sha256(f"{dataset}\x00{model}\x00{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def get(self, dataset: str, model: str, query: str):
+        """Retorna a resposta em cache (dict com `text_answer`, `artifact_path`, `thoughts`, `created_at`) ou None."""
+        key = self.make_key(dataset, model, query)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT text_answer, artifact_path, thoughts, created_at FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            text_answer, artifact_path, thoughts, created_at = row
+            # Respostas expiradas, ou cujo gráfico já não existe em disco, não podem ser servidas.
+            if now - created_at > self.ttl_seconds or (artifact_path and not os.path.exists(artifact_path)):
+                conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE answers SET last_access = ? WHERE key = ?", (now, key))
+        return {
+            "text_answer": text_answer,
+            "artifact_path": artifact_path,
+            "thoughts": json.loads(thoughts) if thoughts else [],
+            "created_at": created_at,
+        }
+
+    def put(self, dataset: str, model: str, query: str, text_answer: str, artifact_path: str = None, thoughts: list = None):
+        key = self.make_key(dataset, model, query)
+        thoughts_json = json.dumps(thoughts, ensure_ascii=False) if self.store_thoughts and thoughts else None
+        size = len(text_answer.encode("utf-8")) + len(thoughts_json.encode("utf-8") if thoughts_json else b"")
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, dataset, model, normalize_query(query), text_answer, artifact_path, thoughts_json, size, now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now: float):
+        conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM answers ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM answers")
+
+@st.cache_resource
+def get_answer_cache() -> AnswerCache:
+    """Retorna o cache de respostas compartilhado pelo processo."""
+    return AnswerCache()
@@ -0,0 +1,225 @@
+import io
+import os
+import time
+import uuid
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+import streamlit as st
+from PIL import Image
+
+DEFAULT_ARTIFACT_DIR = os.getenv("JEDI_ARTIFACT_DIR", ".jedi_cache/artifacts")
+DEFAULT_MAX_MB = int(os.getenv("JEDI_ARTIFACT_MB", "512"))
+DEFAULT_MAX_AGE_SECONDS = int(os.getenv("JEDI_ARTIFACT_TTL_HOURS", "72")) * 3600
+EVICTION_INTERVAL_SECONDS = int(os.getenv("JEDI_ARTIFACT_EVICT_SECONDS", "300"))
+STAGING_MAX_AGE_SECONDS = 3600
+# Variantes geradas uma vez por artefato: largura máxima em pixels de cada uso.
+# 'report' corresponde às 5.5 polegadas do relatório a 200 dpi.
+IMAGE_VARIANTS = {"chat": 800, "report": 1100}
+
+class ArtifactStore:
+    """
+    Armazém de artefatos (gráficos) endereçado por conteúdo, compartilhado por todas as sessões.
+
+    Cada arquivo é nomeado pelo hash dos seus bytes, então gráficos idênticos são gravados uma única vez.
+    Cada sessão registra uma referência aos artefatos que exibe; `release_session` remove apenas as
+    referências da sessão, nunca os arquivos de outras. `evict` (executado em segundo plano) apaga os
+    artefatos sem referências vivas que passaram de `max_age_seconds` ou, acima de `max_bytes`, os
+    acessados há mais tempo. Referências também expiram após `max_age_seconds` sem uso, para sessões
+    encerradas sem logout.
+    """
+    def __init__(self, root: str = DEFAULT_ARTIFACT_DIR, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+                 max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.staging_dir = os.path.join(root, "staging")
+        self.variant_dir = os.path.join(root, "variants")
+        self._lock = threading.Lock()
+        self._variant_locks = {}
+        os.makedirs(self.staging_dir, exist_ok=True)
+        os.makedirs(self.variant_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    digest TEXT PRIMARY KEY, path TEXT, size INTEGER, created_at REAL, last_access REAL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS refs (
+                    session TEXT, digest TEXT, last_seen REAL, PRIMARY KEY (session, digest)
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def new_staging_path(self, extension: str = "png") -> str:
+        """Caminho temporário onde um agente grava um gráfico antes de ele entrar no armazém."""
+        return os.path.join(self.staging_dir, f"{uuid.uuid4()}.{extension}")
+
+    def is_staging_path(self, path) -> bool:
+        """Se `path` resolve (após links simbólicos e `..`) para um arquivo dentro da área de staging."""
+        if not isinstance(path, (str, os.PathLike)):
+            return False
+        return os.path.realpath(path).startswith(os.path.realpath(self.staging_dir) + os.sep)
+
+    def _digest_path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.{extension}")
+
+    @staticmethod
+    def digest_of(path: str) -> str:
+        """Hash do artefato a partir do seu caminho no armazém (o nome do arquivo)."""
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def put_bytes(self, data: bytes, session: str, extension: str = "png") -> str:
+        """Grava `data` (se ainda não existir), registra a referência da sessão e retorna o caminho no armazém."""
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        path = self._digest_path(digest, extension)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO artifacts VALUES (?, ?, ?, ?, ?) ON CONFLICT(digest) DO UPDATE SET last_access = excluded.last_access",
+                (digest, path, len(data), now, now)
+            )
+            conn.execute("INSERT OR REPLACE INTO refs VALUES (?, ?, ?)", (session, digest, now))
+        return path
+
+    def put_file(self, source_path: str, session: str) -> str:
+        """Move um gráfico recém-gerado na área de staging para o armazém (outros caminhos são recusados)."""
+        if not self.is_staging_path(source_path):
+            raise ValueError(f"Só arquivos da área de staging podem entrar no armazém: {source_path}")
+        with open(source_path, "rb") as f:
+            data = f.read()
+        path = self.put_bytes(data, session, os.path.splitext(source_path)[1].lstrip(".") or "png")
+        os.remove(source_path)
+        self.prepare_variants(path)
+        return path
+
+    def add_ref(self, path: str, session: str) -> bool:
+        """Registra que a sessão exibe um artefato já armazenado (ex: servido do cache). Retorna False se ele não existe mais."""
+        digest = self.digest_of(path)
+        now = time.time()
+        with self._connect() as conn:
+            updated = conn.execute("UPDATE artifacts SET last_access = ? WHERE digest = ?", (now, digest)).rowcount
+            if not updated or not os.path.exists(path):
+                return False
+            conn.execute("INSERT OR REPLACE INTO refs VALUES (?, ?, ?)", (session, digest, now))
+        return True
+
+    def release_session(self, session: str):
+        """Remove as referências de uma sessão (logout, reinício, novo upload). Os arquivos ficam para a limpeza."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM refs WHERE session = ?", (session,))
+
+    def variant(self, path: str, kind: str) -> str:
+        """
+        Retorna (gerando na primeira vez) a variante `kind` do artefato: reduzida para a largura de
+        `IMAGE_VARIANTS[kind]` e comprimida com paleta de 256 cores, o que em gráficos reduz bastante o PNG
+        sem perda visível. Se a variante não ficar menor que o original, o original é usado.
+        """
+        digest = self.digest_of(path)
+        variant_path = os.path.join(self.variant_dir, f"{digest}-{kind}.png")
+        if os.path.exists(variant_path):
+            return variant_path
+        with self._variant_lock(digest):
+            if not os.path.exists(variant_path):
+                width = IMAGE_VARIANTS[kind]
+                with Image.open(path) as image:
+                    if image.width > width:
+                        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS)
+                    image = image.convert("RGBA" if "A" in image.mode else "RGB")
+                    method = Image.Quantize.FASTOCTREE if image.mode == "RGBA" else Image.Quantize.MEDIANCUT
+                    optimized = image.quantize(colors=256, method=method)
+                    buffer = io.BytesIO()
+                    optimized.save(buffer, format="PNG", optimize=True)
+                data = buffer.getvalue()
+                if len(data) >= os.path.getsize(path):
+                    with open(path, "rb") as f:
+                        data = f.read()
+                temp_path = f"{variant_path}.{uuid.uuid4().hex}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, variant_path)
+        return variant_path
+
+    def _variant_lock(self, digest: str) -> threading.Lock:
+        with self._lock:
+            return self._variant_locks.setdefault(digest, threading.Lock())
+
+    def prepare_variants(self, path: str):
+        """Gera em segundo plano todas as variantes de um artefato recém-armazenado."""
+        def run():
+            for kind in IMAGE_VARIANTS:
+                try:
+                    self.variant(path, kind)
+                except Exception:
+                    continue
+        threading.Thread(target=run, daemon=True, name="jedi-artifact-variants").start()
+
+    def _delete(self, conn, digest: str, path: str):
+        conn.execute("DELETE FROM artifacts WHERE digest = ?", (digest,))
+        conn.execute("DELETE FROM refs WHERE digest = ?", (digest,))
+        self._variant_locks.pop(digest, None)
+        for file_path in [path] + [os.path.join(self.variant_dir, f"{digest}-{kind}.png") for kind in IMAGE_VARIANTS]:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def evict(self):
+        """Aplica as políticas de idade e de tamanho e limpa a área temporária."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM refs WHERE last_seen < ?", (now - self.max_age_seconds,))
+            unreferenced = conn.execute("""
+                SELECT digest, path, size, last_access FROM artifacts
+                WHERE digest NOT IN (SELECT digest FROM refs) ORDER BY last_access ASC
+            """).fetchall()
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+            for digest, path, size, last_access in unreferenced:
+                if last_access >= now - self.max_age_seconds and total <= self.max_bytes:
+                    continue
+                self._delete(conn, digest, path)
+                total -= size
+        for name in os.listdir(self.staging_dir):
+            staging_path = os.path.join(self.staging_dir, name)
+            try:
+                if now - os.path.getmtime(staging_path) > STAGING_MAX_AGE_SECONDS:
+                    os.remove(staging_path)
+            except FileNotFoundError:
+                continue
+
+    def start_background_eviction(self, interval: int = EVICTION_INTERVAL_SECONDS):
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.evict()
+                except Exception:
+                    continue
+        threading.Thread(target=loop, daemon=True, name="jedi-artifact-eviction").start()
+
+@st.cache_resource
+def get_artifact_store() -> ArtifactStore:
+    """Retorna o armazém de artefatos do processo, com a limpeza em segundo plano já iniciada."""
+    store = ArtifactStore()
+    store.start_background_eviction()
+    return store
+
+def get_session_id() -> str:
+    """Identificador estável da sessão Streamlit atual, usado nas referências do armazém de artefatos."""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
@@ -0,0 +1,36 @@
+import os
+import base64
+import streamlit as st
+
+# Arquivos estáticos lidos uma vez por processo (e de novo só se forem alterados no disco),
+# em vez de a cada renderização das telas de boas-vindas e de login.
+# Este módulo só depende do Streamlit, para não atrasar as primeiras telas.
+
+LOGO_PATH = "asset/LOGO.png"
+README_PATH = "README.md"
+
+def _mtime(path: str) -> float:
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+@st.cache_resource(show_spinner=False)
+def _logo_base64(path: str, mtime: float) -> str:
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
+
+@st.cache_resource(show_spinner=False)
+def _read_text(path: str, mtime: float) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def logo_html(width: int = 200, path: str = LOGO_PATH) -> str:
+    """Tag `<img>` centralizada com o logotipo embutido em base64, ou '' se o arquivo não existe."""
+    if not os.path.exists(path):
+        return ""
+    data = _logo_base64(path, _mtime(path))
+    return f"<div style='text-align: center'><img src='data:image/png;base64,{data}' width='{width}'></div>"
+
+def readme_text(path: str = README_PATH):
+    """Conteúdo do README, ou None se o arquivo não existe."""
+    if not os.path.exists(path):
+        return None
+    return _read_text(path, _mtime(path))
@@ -0,0 +1,161 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+import streamlit as st
+
+DEFAULT_MEMORY_BUDGET_MB = int(os.getenv("JEDI_DF_CACHE_MB", "2048"))
+DEFAULT_SPILL_DIR = os.getenv("JEDI_DF_SPILL_DIR", ".jedi_cache/frames")
+DEFAULT_SPILL_MAX_MB = int(os.getenv("JEDI_DF_SPILL_MB", "4096"))
+DEFAULT_SPILL_MAX_AGE_SECONDS = int(os.getenv("JEDI_DF_SPILL_TTL_HOURS", "168")) * 3600
+
+def hash_upload(uploaded_file) -> str:
+    """
+    Calcula o hash do conteúdo de um arquivo enviado. O resultado é memorizado por `file_id`
+    na sessão, então as reexecuções do Streamlit não voltam a ler os bytes do arquivo.
+    """
+    file_id = getattr(uploaded_file, "file_id", None)
+    memo = st.session_state.setdefault("upload_hashes", {}) if file_id else {}
+    if file_id in memo:
+        return memo[file_id]
+    with uploaded_file.getbuffer() as buffer:
+        content_hash = hashlib.blake2b(buffer, digest_size=20).hexdigest()
+    if file_id:
+        memo[file_id] = content_hash
+    return content_hash
+
+class DataFrameCache:
+    """
+    Cache LRU de DataFrames já processados, indexado pelo hash do conteúdo do arquivo original.
+
+    A memória total é limitada por `memory_budget_mb`; ao ultrapassá-la, os itens menos usados
+    são descartados. Se `spill_dir` for definido, cada DataFrame também é gravado uma única vez
+    em formato Feather, para que um novo upload do mesmo arquivo seja carregado do disco em vez
+    de reprocessar o CSV. Os arquivos do spill sem uso há mais de `spill_max_age_seconds` são apagados,
+    assim como os usados há mais tempo quando o diretório passa de `spill_max_mb`.
+    """
+    def __init__(self, memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB, spill_dir: str = DEFAULT_SPILL_DIR,
+                 spill_max_mb: int = DEFAULT_SPILL_MAX_MB, spill_max_age_seconds: int = DEFAULT_SPILL_MAX_AGE_SECONDS):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_mb * 1024 * 1024
+        self.spill_max_age_seconds = spill_max_age_seconds
+        self._frames = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def memory_usage(self) -> int:
+        return sum(self._sizes.values())
+
+    def _spill_path(self, content_hash: str) -> str:
+        return os.path.join(self.spill_dir, f"{content_hash}.feather")
+
+    def get(self, content_hash: str):
+        with self._lock:
+            df = self._frames.get(content_hash)
+            if df is not None:
+                self._frames.move_to_end(content_hash)
+                return df
+        if self.spill_dir and os.path.exists(self._spill_path(content_hash)):
+            try:
+                df = pd.read_feather(self._spill_path(content_hash))
+                # O mtime marca o último uso, usado na ordem de descarte do spill.
+                os.utime(self._spill_path(content_hash))
+            except Exception as e:
+                print(f"DataFrame cache spill read failed: {e}")
+                return None
+            df.attrs["content_hash"] = content_hash
+            self._store(content_hash, df)
+            return df
+        return None
+
+    def put(self, content_hash: str, df: pd.DataFrame):
+        df.attrs["content_hash"] = content_hash
+        self._store(content_hash, df)
+        if self.spill_dir and not os.path.exists(self._spill_path(content_hash)):
+            try:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                tmp_path = self._spill_path(content_hash) + ".tmp"
+                df.to_feather(tmp_path)
+                os.replace(tmp_path, self._spill_path(content_hash))
+                self._evict_spill(keep=self._spill_path(content_hash))
+            except Exception as e:
+                # O spill é apenas uma otimização; falhas não devem impedir a análise.
+                print(f"DataFrame cache spill write failed: {e}")
+
+    def _evict_spill(self, keep: str):
+        """Aplica as políticas de idade e de tamanho ao spill, nunca apagando `keep` (o arquivo recém-gravado)."""
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.spill_dir):
+            if entry.name.endswith(".feather"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in sorted(files):
+            if path == keep or (mtime >= now - self.spill_max_age_seconds and total <= self.spill_max_bytes):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _store(self, content_hash: str, df: pd.DataFrame):
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            self._frames[content_hash] = df
+            self._sizes[content_hash] = size
+            self._frames.move_to_end(content_hash)
+            # Sempre mantém ao menos o item mais recente, mesmo que sozinho exceda o orçamento.
+            while len(self._frames) > 1 and self.memory_usage > self.memory_budget:
+                evicted, _ = self._frames.popitem(last=False)
+                self._sizes.pop(evicted, None)
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._sizes.clear()
+
+@st.cache_resource
+def get_dataframe_cache() -> DataFrameCache:
+    """Retorna o cache de DataFrames compartilhado por todas as sessões do processo."""
+    return DataFrameCache()
+
+def hash_file(path: str, chunk_bytes: int = 8 * 1024 * 1024) -> str:
+    """Hash do conteúdo de um arquivo em disco, lido em blocos (mesmo algoritmo de `hash_upload`)."""
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_bytes):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def load_csv_path(path: str) -> pd.DataFrame:
+    """Versão de `load_csv_cached` para um CSV em disco (ex: o modo em lote), com o mesmo cache por hash de conteúdo."""
+    content_hash = hash_file(path)
+    cache = get_dataframe_cache()
+    df = cache.get(content_hash)
+    if df is None:
+        df = pd.read_csv(path)
+        cache.put(content_hash, df)
+    return df.copy(deep=False)
+
+def load_csv_cached(uploaded_file) -> pd.DataFrame:
+    """
+    Carrega um CSV enviado usando o cache por hash de conteúdo.
+    Retorna uma cópia rasa: com Copy-on-Write, alterações feitas por uma sessão não afetam as demais.
+    """
+    content_hash = hash_upload(uploaded_file)
+    cache = get_dataframe_cache()
+    df = cache.get(content_hash)
+    if df is None:
+        uploaded_file.seek(0)
+        df = pd.read_csv(uploaded_file)
+        cache.put(content_hash, df)
+    return df.copy(deep=False)
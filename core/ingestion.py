@@ -0,0 +1,301 @@
+import os
+import io
+import json
+import glob
+import time
+import shutil
+import threading
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from core.data_cache import hash_upload
+from core.profiling import ProfileAccumulator
+
+OUT_OF_CORE_THRESHOLD_MB = int(os.getenv("JEDI_OUT_OF_CORE_MB", "512"))
+DEFAULT_STORE_DIR = os.getenv("JEDI_STORE_DIR", ".jedi_cache/stores")
+DEFAULT_STORE_MAX_MB = int(os.getenv("JEDI_STORE_MB", "16384"))
+DEFAULT_STORE_MAX_AGE_SECONDS = int(os.getenv("JEDI_STORE_TTL_HOURS", "168")) * 3600
+DEFAULT_CHUNK_ROWS = 250_000
+
+# --- Esquema Estável entre Blocos ---
+def merge_schemas(current: pa.Schema, new: pa.Schema) -> pa.Schema:
+    """
+    Une o esquema acumulado com o de um novo bloco. Tipos compatíveis são promovidos
+    (ex: nulo -> int64 -> double); colunas com tipos incompatíveis passam a ser texto.
+    """
+    if current is None:
+        return new
+    fields = []
+    for field in current:
+        other = new.field(field.name)
+        if field.type == other.type:
+            fields.append(field)
+            continue
+        try:
+            fields.append(pa.unify_schemas([pa.schema([field]), pa.schema([other])], promote_options="permissive").field(0))
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            fields.append(pa.field(field.name, pa.large_string()))
+    return pa.schema(fields)
+
+# --- Armazenamento Colunar em Disco ---
+class ColumnarStore:
+    """
+    Conjunto de segmentos Arrow IPC (um por bloco do CSV) gravados em disco.
+
+    Os segmentos são abertos por memory-map, então o DataFrame resultante é sustentado pelo
+    cache de páginas do sistema operacional e não pelo heap do processo. O store pode ser lido
+    enquanto a ingestão ainda está em andamento, expondo apenas os segmentos já concluídos.
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, "manifest.json")
+
+    def segments(self) -> list:
+        return sorted(glob.glob(os.path.join(self.path, "segment-*.arrow")))
+
+    def is_complete(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def manifest(self) -> dict:
+        if not self.is_complete():
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_segment(self, index: int, table: pa.Table):
+        segment_path = os.path.join(self.path, f"segment-{index:05d}.arrow")
+        tmp_path = segment_path + ".tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        # A renomeação atômica garante que leitores concorrentes só vejam segmentos completos.
+        os.replace(tmp_path, segment_path)
+
+    def write_manifest(self, rows: int, schema: pa.Schema):
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"rows": rows, "segments": len(self.segments()), "columns": schema.names}, f)
+
+    def read_table(self) -> pa.Table:
+        tables = []
+        for segment_path in self.segments():
+            source = pa.memory_map(segment_path, "r")
+            tables.append(pa.ipc.open_file(source).read_all())
+        if not tables:
+            return None
+        schema = tables[0].schema
+        for table in tables[1:]:
+            schema = merge_schemas(schema, table.schema)
+        # Apenas segmentos com esquema mais estreito são convertidos (e, portanto, copiados).
+        tables = [t if t.schema == schema else t.cast(schema) for t in tables]
+        return pa.concat_tables(tables)
+
+    def to_dataframe(self, content_hash: str = None) -> pd.DataFrame:
+        """Retorna um DataFrame com colunas `ArrowDtype` apoiadas nos segmentos mapeados em memória."""
+        table = self.read_table()
+        if table is None:
+            return None
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        if content_hash:
+            complete = self.is_complete()
+            # Instantâneos parciais recebem uma impressão digital própria para não contaminar caches e pools.
+            df.attrs["content_hash"] = content_hash if complete else f"{content_hash}:partial-{table.num_rows}"
+            df.attrs["partial"] = not complete
+        return df
+
+def ingest_csv(source, store: ColumnarStore, chunk_rows: int = DEFAULT_CHUNK_ROWS, progress_callback=None, chunk_callback=None) -> int:
+    """
+    Lê um CSV em blocos e grava cada bloco como um segmento do `store`.
+    `progress_callback(bytes_lidos, linhas)` é chamado após cada bloco e `chunk_callback(bloco)`
+    recebe cada bloco lido (ex: para acumular o perfil dos dados). Retorna o total de linhas.
+    """
+    os.makedirs(store.path, exist_ok=True)
+    # Descarta segmentos de uma ingestão anterior interrompida.
+    for stale_segment in store.segments():
+        os.remove(stale_segment)
+    schema = None
+    rows = 0
+    reader = pd.read_csv(source, chunksize=chunk_rows, dtype_backend="pyarrow")
+    for index, chunk in enumerate(reader):
+        table = pa.Table.from_pandas(chunk, preserve_index=False).replace_schema_metadata(None)
+        schema = merge_schemas(schema, table.schema)
+        if table.schema != schema:
+            table = table.cast(schema)
+        store.write_segment(index, table)
+        rows += table.num_rows
+        if chunk_callback:
+            chunk_callback(chunk)
+        if progress_callback:
+            progress_callback(source.tell() if hasattr(source, "tell") else 0, rows)
+    store.write_manifest(rows, schema if schema is not None else pa.schema([]))
+    return rows
+
+# --- Ingestão em Segundo Plano ---
+class BufferReader(io.RawIOBase):
+    """
+    Leitura sequencial sobre um buffer sem copiá-lo (ex: o `getbuffer()` de um upload), com posição própria:
+    a ingestão não disputa a posição de leitura do arquivo com a sessão.
+    """
+    def __init__(self, buffer):
+        self._buffer = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._buffer)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def readinto(self, target) -> int:
+        size = max(0, min(len(target), len(self._buffer) - self._position))
+        target[:size] = self._buffer[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._buffer.release()
+        super().close()
+
+class IngestionJob:
+    """Ingestão de um upload em uma thread de segundo plano, com progresso consultável pela interface."""
+    def __init__(self, content_hash: str, total_bytes: int, store: ColumnarStore):
+        self.content_hash = content_hash
+        self.total_bytes = max(total_bytes, 1)
+        self.store = store
+        self.bytes_read = 0
+        self.rows = 0
+        self.error = None
+        self.profile_accumulator = ProfileAccumulator()
+        self._thread = None
+        # Último DataFrame montado e o estado do store que o gerou: (segmentos, completo).
+        self._frame = None
+        self._frame_state = None
+        self._frame_lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.store.is_complete() or self.error is not None
+
+    @property
+    def progress(self) -> float:
+        if self.store.is_complete():
+            return 1.0
+        return min(self.bytes_read / self.total_bytes, 0.99)
+
+    def _on_progress(self, bytes_read, rows):
+        self.bytes_read = bytes_read
+        self.rows = rows
+
+    def _run(self, source):
+        try:
+            self.rows = ingest_csv(source, self.store, progress_callback=self._on_progress, chunk_callback=self.profile_accumulator.update)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            source.close()
+
+    def start(self, source):
+        self._thread = threading.Thread(target=self._run, args=(source,), daemon=True)
+        self._thread.start()
+
+    def dataframe(self) -> pd.DataFrame:
+        """
+        DataFrame dos segmentos já gravados. Ele só é remontado quando surge um segmento novo ou a ingestão
+        termina; as reexecuções do Streamlit entre um bloco e outro recebem uma cópia rasa do mesmo frame.
+        """
+        with self._frame_lock:
+            state = (self.store.is_complete(), len(self.store.segments()))
+            if state != self._frame_state:
+                self._frame = self.store.to_dataframe(self.content_hash)
+                self._frame_state = state
+            return self._frame.copy(deep=False) if self._frame is not None else None
+
+    def profile(self):
+        """Perfil aproximado acumulado durante a ingestão (None se o store foi reaproveitado do disco)."""
+        if self.profile_accumulator.rows == 0:
+            return None
+        return self.profile_accumulator.profile()
+
+@st.cache_resource
+def get_ingestion_jobs() -> dict:
+    """Registro de ingestões do processo, indexado pelo hash do conteúdo (compartilhado entre sessões)."""
+    return {"lock": threading.Lock(), "jobs": {}}
+
+def is_out_of_core(uploaded_file) -> bool:
+    return uploaded_file.size > OUT_OF_CORE_THRESHOLD_MB * 1024 * 1024
+
+def _store_usage(path: str) -> tuple:
+    """(último uso, bytes) de um store: o mtime mais recente entre o diretório e os seus arquivos."""
+    last_used, size = os.path.getmtime(path), 0
+    for entry in os.scandir(path):
+        stat = entry.stat()
+        last_used, size = max(last_used, stat.st_mtime), size + stat.st_size
+    return last_used, size
+
+def evict_stores(registry: dict, store_dir: str = DEFAULT_STORE_DIR, keep: str = None,
+                 max_bytes: int = DEFAULT_STORE_MAX_MB * 1024 * 1024, max_age_seconds: int = DEFAULT_STORE_MAX_AGE_SECONDS):
+    """
+    Apaga os stores sem uso há mais de `max_age_seconds` e, enquanto o total passar de `max_bytes`, os usados
+    há mais tempo. Nunca apaga `keep` nem um store com ingestão em andamento. Chamado com `registry["lock"]`.
+    """
+    now = time.time()
+    stores = []
+    for entry in os.scandir(store_dir):
+        if not entry.is_dir():
+            continue
+        try:
+            stores.append((*_store_usage(entry.path), entry.name, entry.path))
+        except FileNotFoundError:
+            continue
+    total = sum(size for _, size, _, _ in stores)
+    for last_used, size, content_hash, path in sorted(stores):
+        job = registry["jobs"].get(content_hash)
+        if content_hash == keep or (job is not None and not job.done):
+            continue
+        if last_used >= now - max_age_seconds and total <= max_bytes:
+            continue
+        try:
+            # Em POSIX, DataFrames já mapeados continuam válidos depois que os segmentos são apagados.
+            shutil.rmtree(path)
+        except OSError:
+            continue
+        registry["jobs"].pop(content_hash, None)
+        total -= size
+
+def start_ingestion(uploaded_file, store_dir: str = DEFAULT_STORE_DIR) -> IngestionJob:
+    """
+    Inicia (ou reaproveita) a ingestão fora do heap de um upload. Uploads cujo store já está
+    completo em disco não são reprocessados. Cada novo job aplica `evict_stores` aos demais stores.
+    """
+    content_hash = hash_upload(uploaded_file)
+    registry = get_ingestion_jobs()
+    with registry["lock"]:
+        job = registry["jobs"].get(content_hash)
+        if job is not None and job.error is None:
+            # O mtime do diretório marca o último uso do store, usado na ordem de descarte.
+            if os.path.isdir(job.store.path):
+                os.utime(job.store.path)
+            return job
+        store = ColumnarStore(os.path.join(store_dir, content_hash))
+        job = IngestionJob(content_hash, uploaded_file.size, store)
+        registry["jobs"][content_hash] = job
+        if store.is_complete():
+            os.utime(store.path)
+        else:
+            # Lê os bytes do upload no lugar, sem uma segunda cópia em memória, com a sua própria posição de leitura.
+            job.start(io.BufferedReader(BufferReader(uploaded_file.getbuffer())))
+        if os.path.isdir(store_dir):
+            evict_stores(registry, store_dir, keep=content_hash)
+    return job
@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import contextvars
+from contextlib import contextmanager
+import streamlit as st
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from core.tracing import record_cache_hit
+
+DEFAULT_CACHE_PATH = os.getenv("JEDI_LLM_CACHE_PATH", ".jedi_cache/llm_calls.sqlite3")
+DEFAULT_MAX_ENTRIES = int(os.getenv("JEDI_LLM_CACHE_MAX_ENTRIES", "20000"))
+
+_bypass = contextvars.ContextVar("jedi_llm_cache_bypass", default=False)
+
+@contextmanager
+def bypass_llm_cache():
+    """Desativa o cache de LLM para as chamadas feitas dentro do bloco (ex: `with bypass_llm_cache(): llm.invoke(...)`)."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+class PersistentLLMCache(BaseCache):
+    """
+    Cache de chamadas de LLM endereçado por conteúdo, plugado no parâmetro `cache` dos modelos LangChain.
+
+    A chave é o hash de (configuração do modelo, prompt), então qualquer agente que envie o mesmo prompt
+    ao mesmo modelo reaproveita a resposta. As entradas ficam em SQLite e as menos usadas recentemente são
+    removidas acima de `max_entries`. `hits` e `misses` contam os acessos desde o início do processo.
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_calls (
+                    key TEXT PRIMARY KEY, generations TEXT, last_access REAL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str):
+        if _bypass.get():
+            return None
+        key = self.make_key(prompt, llm_string)
+        with self._connect() as conn:
+            row = conn.execute("SELECT generations FROM llm_calls WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE llm_calls SET last_access = ? WHERE key = ?", (time.time(), key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        record_cache_hit()
+        return [loads(generation, allowed_objects="core") for generation in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val):
+        if _bypass.get():
+            return
+        key = self.make_key(prompt, llm_string)
+        generations = json.dumps([dumps(generation) for generation in return_val])
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO llm_calls VALUES (?, ?, ?)", (key, generations, time.time()))
+            count = conn.execute("SELECT COUNT(*) FROM llm_calls").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM llm_calls WHERE key IN (SELECT key FROM llm_calls ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def clear(self, **kwargs):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_calls")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+@st.cache_resource
+def get_llm_cache() -> PersistentLLMCache:
+    """Retorna o cache de chamadas de LLM compartilhado por todos os agentes e sessões do processo."""
+    return PersistentLLMCache()
@@ -0,0 +1,225 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import streamlit as st
+
+from core.llm_cache import get_llm_cache
+
+MODEL_REGISTRY_TTL_SECONDS = int(os.getenv("JEDI_MODEL_REGISTRY_TTL", "300"))
+OLLAMA_KEEP_ALIVE = os.getenv("JEDI_OLLAMA_KEEP_ALIVE", "30m")
+# Intervalo mínimo entre dois aquecimentos do mesmo cliente (o keep-alive do Ollama o mantém carregado nesse meio tempo).
+WARM_UP_INTERVAL_SECONDS = int(os.getenv("JEDI_LLM_WARM_UP_SECONDS", "600"))
+MAX_CLIENTS = int(os.getenv("JEDI_LLM_MAX_CLIENTS", "32"))
+FAKE_PROVIDER_ENABLED = os.getenv("JEDI_FAKE_PROVIDER", "0") == "1"
+FAKE_PROVIDER_LATENCY = float(os.getenv("JEDI_FAKE_PROVIDER_LATENCY", "0"))
+
+def credential_key(credentials) -> str:
+    """Hash curto das credenciais, usado nas chaves dos caches (a chave de API nunca é guardada em claro)."""
+    if not credentials:
+        return ""
+    return hashlib.sha256(credentials.encode("utf-8")).hexdigest()[:16]
+
+# --- Provedores ---
+class GeminiProvider:
+    name = "Gemini"
+    # `genai.configure` altera um estado global do módulo; as listagens com chaves diferentes são serializadas.
+    _configure_lock = threading.Lock()
+
+    def list_models(self, credentials=None) -> list:
+        import google.generativeai as genai
+        with self._configure_lock:
+            genai.configure(api_key=credentials or os.getenv("GOOGLE_API_KEY"))
+            return [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+
+    def create_client(self, model: str, credentials=None, cache=None):
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=model.replace('models/', ''), temperature=0, google_api_key=credentials, cache=cache)
+
+    def warm_up(self, client):
+        # Modelos hospedados não têm o que carregar; o cliente já reaproveita a conexão.
+        pass
+
+class OllamaProvider:
+    name = "Ollama"
+
+    def __init__(self, keep_alive: str = OLLAMA_KEEP_ALIVE):
+        self.keep_alive = keep_alive
+
+    def list_models(self, credentials=None) -> list:
+        import ollama
+        response = ollama.list()
+        return [model['model'] for model in response['models']]
+
+    def create_client(self, model: str, credentials=None, cache=None):
+        from langchain_community.llms import Ollama
+        return Ollama(model=model, temperature=0, keep_alive=self.keep_alive, cache=cache)
+
+    def warm_up(self, client):
+        """Carrega o modelo na memória do daemon (prompt vazio) e o mantém carregado por `keep_alive`."""
+        import ollama
+        ollama.generate(model=client.model, prompt="", keep_alive=self.keep_alive)
+
+class FakeProvider:
+    """Provedor local e determinístico (ver `core.fake_llm`), para testes e benchmarks sem rede."""
+    name = "Fake"
+
+    def __init__(self, latency: float = FAKE_PROVIDER_LATENCY):
+        self.latency = latency
+        self.list_calls = 0
+        self.warm_ups = 0
+
+    def list_models(self, credentials=None) -> list:
+        self.list_calls += 1
+        return ["fake-jedi"]
+
+    def create_client(self, model: str, credentials=None, cache=None):
+        from core.fake_llm import FakeJediChatModel
+        return FakeJediChatModel(model=model, latency=self.latency, cache=cache)
+
+    def warm_up(self, client):
+        self.warm_ups += 1
+
+def default_providers() -> dict:
+    providers = {"Ollama": OllamaProvider(), "Gemini": GeminiProvider()}
+    if FAKE_PROVIDER_ENABLED:
+        providers["Fake"] = FakeProvider()
+    return providers
+
+# --- Registro de Modelos ---
+class ModelRegistry:
+    """
+    Lista de modelos de cada provedor, em cache por (provedor, credenciais) durante `ttl_seconds`.
+
+    Depois de expirada, a lista antiga continua sendo servida enquanto uma thread a atualiza em segundo
+    plano, então nenhuma renderização espera pela API do Gemini ou pelo daemon do Ollama após a primeira.
+    Uma falha na atualização mantém a lista anterior; uma falha na primeira listagem propaga o erro e
+    deixa uma lista vazia em cache até a próxima atualização.
+    """
+    def __init__(self, providers: dict, ttl_seconds: int = MODEL_REGISTRY_TTL_SECONDS):
+        self.providers = providers
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._refreshing = set()
+
+    def _fetch(self, provider: str, credentials) -> list:
+        models = self.providers[provider].list_models(credentials)
+        with self._lock:
+            self._entries[(provider, credential_key(credentials))] = (models, time.time())
+        return models
+
+    def _refresh_in_background(self, provider: str, credentials):
+        key = (provider, credential_key(credentials))
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._fetch(provider, credentials)
+            except Exception as e:
+                print(f"Model registry refresh failed for {provider}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+        threading.Thread(target=run, daemon=True, name="jedi-model-registry").start()
+
+    def list_models(self, provider: str, credentials=None) -> list:
+        """Modelos disponíveis no provedor; só bloqueia na primeira listagem de cada (provedor, credenciais)."""
+        with self._lock:
+            entry = self._entries.get((provider, credential_key(credentials)))
+        if entry is None:
+            try:
+                return self._fetch(provider, credentials)
+            except Exception:
+                # Guarda a lista vazia até o fim do TTL: um provedor fora do ar não é consultado a cada renderização.
+                with self._lock:
+                    self._entries.setdefault((provider, credential_key(credentials)), ([], time.time()))
+                raise
+        models, fetched_at = entry
+        if time.time() - fetched_at > self.ttl_seconds:
+            self._refresh_in_background(provider, credentials)
+        return models
+
+    def validate(self, provider: str, credentials) -> list:
+        """Valida as credenciais listando os modelos (sempre consulta o provedor); a lista obtida já fica em cache."""
+        return self._fetch(provider, credentials)
+
+    def invalidate(self, provider: str = None):
+        with self._lock:
+            for key in [key for key in self._entries if provider is None or key[0] == provider]:
+                del self._entries[key]
+
+# --- Fábrica de Clientes ---
+class LLMClientFactory:
+    """
+    Clientes de LLM reaproveitados entre renderizações e sessões, um por (provedor, modelo, credenciais).
+
+    Os clientes guardam conexões HTTP abertas e são caros de criar; os menos usados são descartados
+    acima de `max_clients`. Todos usam o cache de chamadas de LLM compartilhado. `warm_up` prepara o
+    modelo em segundo plano (no Ollama, carrega-o e o mantém vivo por `keep_alive`) no início da sessão.
+    """
+    def __init__(self, providers: dict, max_clients: int = MAX_CLIENTS, warm_up_interval: int = WARM_UP_INTERVAL_SECONDS):
+        self.providers = providers
+        self.max_clients = max_clients
+        self.warm_up_interval = warm_up_interval
+        self._lock = threading.Lock()
+        self._clients = OrderedDict()
+        self._warmed_at = {}
+
+    def get(self, provider: str, model: str, credentials=None):
+        key = (provider, model, credential_key(credentials))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+        client = self.providers[provider].create_client(model, credentials, cache=get_llm_cache())
+        with self._lock:
+            client = self._clients.setdefault(key, client)
+            while len(self._clients) > self.max_clients:
+                evicted, _ = self._clients.popitem(last=False)
+                self._warmed_at.pop(evicted, None)
+        return client
+
+    def warm_up(self, provider: str, model: str, credentials=None):
+        """Aquece o modelo em segundo plano, no máximo uma vez a cada `warm_up_interval` segundos."""
+        key = (provider, model, credential_key(credentials))
+        now = time.time()
+        with self._lock:
+            if now - self._warmed_at.get(key, 0) < self.warm_up_interval:
+                return
+            self._warmed_at[key] = now
+        client = self.get(provider, model, credentials)
+
+        def run():
+            try:
+                self.providers[provider].warm_up(client)
+            except Exception as e:
+                print(f"LLM warm-up failed for {provider}/{model}: {e}")
+                with self._lock:
+                    self._warmed_at.pop(key, None)
+        threading.Thread(target=run, daemon=True, name="jedi-llm-warm-up").start()
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._warmed_at.clear()
+
+@st.cache_resource
+def get_providers() -> dict:
+    """Provedores de LLM do processo (inclui 'Fake' quando JEDI_FAKE_PROVIDER=1)."""
+    return default_providers()
+
+@st.cache_resource
+def get_model_registry() -> ModelRegistry:
+    """Retorna o registro de modelos compartilhado por todas as sessões do processo."""
+    return ModelRegistry(get_providers())
+
+@st.cache_resource
+def get_llm_factory() -> LLMClientFactory:
+    """Retorna a fábrica de clientes de LLM compartilhada por todas as sessões do processo."""
+    return LLMClientFactory(get_providers())
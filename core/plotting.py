@@ -0,0 +1,106 @@
+import os
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+
+# Renderização por agregação para conjuntos de dados grandes: o custo do desenho depende do número de
+# bins (e de uma amostra de tamanho fixo), não do número de linhas. Os dados são lidos em blocos.
+
+LARGE_PLOT_ROWS = int(os.getenv("JEDI_LARGE_PLOT_ROWS", "200000"))
+PLOT_SAMPLE_ROWS = 50_000
+OVERLAY_POINTS = 2_000
+CHUNK_ROWS = 1_000_000
+
+def is_large(df: pd.DataFrame) -> bool:
+    """Indica se o DataFrame deve ser plotado com renderização agregada."""
+    return len(df) > LARGE_PLOT_ROWS
+
+def sample_rows(df: pd.DataFrame, n: int = PLOT_SAMPLE_ROWS, seed: int = 0) -> pd.DataFrame:
+    """Amostra uniforme (reprodutível) de até `n` linhas, para gráficos que precisam de pontos individuais."""
+    if len(df) <= n:
+        return df
+    return df.sample(n=n, random_state=seed)
+
+def _float_chunks(series: pd.Series, chunk_rows: int = CHUNK_ROWS):
+    """Percorre a coluna em blocos de floats sem nulos (também para colunas Arrow mapeadas em memória)."""
+    for start in range(0, len(series), chunk_rows):
+        values = series.iloc[start:start + chunk_rows].to_numpy(dtype=np.float64, na_value=np.nan)
+        yield values[np.isfinite(values)]
+
+def _bin_edges(series: pd.Series, bins: int) -> np.ndarray:
+    low, high = float(series.min()), float(series.max())
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+def binned_counts(series: pd.Series, bins: int = 100):
+    """Histograma exato (contagens, bordas) calculado bloco a bloco."""
+    edges = _bin_edges(series, bins)
+    counts = np.zeros(bins, dtype=np.int64)
+    for values in _float_chunks(series):
+        counts += np.histogram(values, bins=edges)[0]
+    return counts, edges
+
+def binned_counts_2d(x: pd.Series, y: pd.Series, bins: int = 200):
+    """Histograma 2D exato (contagens, bordas x, bordas y) calculado bloco a bloco sobre os pares sem nulos."""
+    x_edges, y_edges = _bin_edges(x, bins), _bin_edges(y, bins)
+    counts = np.zeros((bins, bins), dtype=np.int64)
+    for start in range(0, len(x), CHUNK_ROWS):
+        xs = x.iloc[start:start + CHUNK_ROWS].to_numpy(dtype=np.float64, na_value=np.nan)
+        ys = y.iloc[start:start + CHUNK_ROWS].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(xs) & np.isfinite(ys)
+        counts += np.histogram2d(xs[valid], ys[valid], bins=[x_edges, y_edges])[0].astype(np.int64)
+    return counts, x_edges, y_edges
+
+def _smoothed_counts(counts: np.ndarray) -> np.ndarray:
+    """Curva de densidade (equivalente a um KDE, na escala das contagens) obtida suavizando as contagens com um núcleo gaussiano."""
+    kernel = np.exp(-0.5 * (np.arange(-6, 7) / 2.0) ** 2)
+    return np.convolve(counts, kernel / kernel.sum(), mode="same")
+
+def histogram(df: pd.DataFrame, column, ax=None, bins: int = 100, density_curve: bool = True):
+    """Histograma a partir de contagens pré-calculadas, com curva de densidade opcional (substitui `sns.histplot`/`sns.kdeplot`)."""
+    ax = ax or plt.gca()
+    counts, edges = binned_counts(df[column], bins)
+    ax.stairs(counts, edges, fill=True, alpha=0.6)
+    if density_curve:
+        centers = (edges[:-1] + edges[1:]) / 2
+        ax.plot(centers, _smoothed_counts(counts), linewidth=2)
+    ax.set_xlabel(str(column))
+    ax.set_ylabel("Contagem")
+    return ax
+
+def density_scatter(df: pd.DataFrame, x, y, ax=None, bins: int = 200, overlay_points: int = OVERLAY_POINTS):
+    """Dispersão como raster de densidade 2D (escala log) com uma amostra de pontos sobreposta (substitui `sns.scatterplot`)."""
+    ax = ax or plt.gca()
+    counts, x_edges, y_edges = binned_counts_2d(df[x], df[y], bins)
+    masked = np.ma.masked_equal(counts.T, 0)
+    mesh = ax.pcolormesh(x_edges, y_edges, masked, norm=LogNorm(vmin=1, vmax=max(int(counts.max()), 2)), cmap="viridis")
+    ax.figure.colorbar(mesh, ax=ax, label="Contagem")
+    if overlay_points:
+        sample = sample_rows(df[[x, y]].dropna(), overlay_points)
+        ax.scatter(sample[x], sample[y], s=2, c="black", alpha=0.3, linewidths=0)
+    ax.set_xlabel(str(x))
+    ax.set_ylabel(str(y))
+    return ax
+
+def boxplot(df: pd.DataFrame, column, ax=None, max_fliers: int = 1_000):
+    """Boxplot a partir de estatísticas pré-calculadas (quartis, bigodes e uma amostra dos outliers) (substitui `sns.boxplot`)."""
+    ax = ax or plt.gca()
+    series = df[column].dropna()
+    q1, median, q3 = (float(v) for v in series.quantile([0.25, 0.5, 0.75]))
+    iqr = q3 - q1
+    inside = series[(series >= q1 - 1.5 * iqr) & (series <= q3 + 1.5 * iqr)]
+    fliers = series[(series < q1 - 1.5 * iqr) | (series > q3 + 1.5 * iqr)]
+    if len(fliers) > max_fliers:
+        fliers = fliers.sample(n=max_fliers, random_state=0)
+    stats = {"med": median, "q1": q1, "q3": q3, "whislo": float(inside.min()), "whishi": float(inside.max()),
+             "fliers": fliers.to_numpy(dtype=np.float64), "label": str(column)}
+    ax.bxp([stats], orientation="horizontal", showfliers=True)
+    return ax
+
+def plotting_namespace() -> dict:
+    """Funções expostas ao REPL do Artesão quando o conjunto de dados é grande."""
+    return {"histogram": histogram, "density_scatter": density_scatter, "boxplot": boxplot, "sample_rows": sample_rows}
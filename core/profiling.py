@@ -0,0 +1,233 @@
+import os
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+
+from core.sketches import HyperLogLog, TDigest, HeavyHitters, hash_values
+
+APPROXIMATE_THRESHOLD_ROWS = int(os.getenv("JEDI_PROFILE_APPROX_ROWS", "5000000"))
+PROFILE_CHUNK_ROWS = 250_000
+FEW_UNIQUE_VALUES = 15 # Mostra os valores comuns apenas se forem poucos
+TOP_VALUES = 5
+QUANTILES = (0.25, 0.5, 0.75)
+
+# --- Perfil Estruturado ---
+@dataclass
+class ColumnProfile:
+    name: str
+    dtype: str
+    missing: int
+    is_numeric: bool
+    mean: float = None
+    std: float = None
+    min: float = None
+    max: float = None
+    quantiles: dict = field(default_factory=dict)
+    unique: int = None
+    top_values: list = field(default_factory=list)
+
+@dataclass
+class DataProfile:
+    rows: int
+    columns: list
+    approximate: bool = False
+
+    def to_markdown(self) -> str:
+        """Renderiza o perfil no formato markdown usado nos prompts dos agentes e no relatório."""
+        profile = []
+        profile.append(f"O DataFrame tem {self.rows} linhas e {len(self.columns)} colunas.")
+
+        profile.append("\n### Resumo das Colunas:")
+        for col in self.columns:
+            missing_percentage = (col.missing / self.rows) * 100 if self.rows else 0.0
+
+            col_summary = [f"- **Coluna '{col.name}'**:"]
+            col_summary.append(f"  - Tipo de Dado: `{col.dtype}`")
+            col_summary.append(f"  - Valores Ausentes: {col.missing} ({missing_percentage:.2f}%)")
+
+            if col.is_numeric:
+                col_summary.append(f"  - Média: {col.mean:.2f}")
+                col_summary.append(f"  - Desvio Padrão: {col.std:.2f}")
+                col_summary.append(f"  - Mínimo: {col.min:.2f}")
+                col_summary.append(f"  - Máximo: {col.max:.2f}")
+                if col.quantiles:
+                    estimated = " (estimados)" if self.approximate else ""
+                    col_summary.append(f"  - Quartis (25% / 50% / 75%){estimated}: " + " / ".join(f"{col.quantiles[q]:.2f}" for q in QUANTILES))
+            else:
+                estimated = " (estimado)" if self.approximate else ""
+                col_summary.append(f"  - Valores Únicos: {col.unique}{estimated}")
+                if col.top_values:
+                    col_summary.append("  - Valores Comuns:")
+                    for val, count in col.top_values:
+                        col_summary.append(f"    - '{val}': {count} vezes")
+
+            profile.append("\n".join(col_summary))
+
+        return "\n".join(profile)
+
+    def to_compact_markdown(self, max_tokens: int) -> str:
+        """Versão resumida (uma linha por coluna) que para de listar colunas ao atingir `max_tokens`."""
+        lines = []
+        for col in self.columns:
+            missing_percentage = (col.missing / self.rows) * 100 if self.rows else 0.0
+            details = [f"`{col.dtype}`", f"{missing_percentage:.1f}% ausentes"]
+            if col.is_numeric:
+                details.append(f"média {col.mean:.2f}, min {col.min:.2f}, max {col.max:.2f}")
+            else:
+                details.append(f"{col.unique} únicos")
+                if col.top_values:
+                    details.append("ex: " + ", ".join(f"'{val}'" for val, _ in col.top_values[:3]))
+            lines.append(f"- {col.name}: " + "; ".join(details))
+        header = f"O DataFrame tem {self.rows} linhas e {len(self.columns)} colunas."
+        return fit_lines_to_budget(header, lines, max_tokens)
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa simples de tokens (~4 caracteres por token), suficiente para orçamentos de prompt."""
+    return len(text) // 4 + 1
+
+def fit_lines_to_budget(header: str, lines: list, max_tokens: int) -> str:
+    """Junta `header` e tantas `lines` quanto couberem em `max_tokens`, indicando quantas foram omitidas."""
+    kept = [header]
+    used = estimate_tokens(header)
+    for i, line in enumerate(lines):
+        cost = estimate_tokens(line)
+        if used + cost > max_tokens:
+            kept.append(f"- ... e mais {len(lines) - i} colunas omitidas.")
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+def schema_summary(df: pd.DataFrame, max_tokens: int) -> str:
+    """Resumo apenas do esquema (nomes e tipos), calculado sem varrer os dados."""
+    header = f"O DataFrame tem {df.shape[0]} linhas e {df.shape[1]} colunas."
+    lines = [f"- {col}: `{dtype}`" for col, dtype in df.dtypes.items()]
+    return fit_lines_to_budget(header, lines, max_tokens)
+
+def _is_numeric(series_or_dtype) -> bool:
+    return pd.api.types.is_numeric_dtype(series_or_dtype) and not pd.api.types.is_bool_dtype(series_or_dtype)
+
+def _as_float(value) -> float:
+    return float("nan") if pd.isna(value) else float(value)
+
+# --- Modo Exato (reduções vetorizadas) ---
+def _exact_profile(df: pd.DataFrame) -> DataProfile:
+    # Cada estatística é uma redução vetorizada sobre todas as colunas de uma vez (sem laço Python por coluna);
+    # só a contagem de valores comuns é feita coluna a coluna, e apenas para as categóricas com poucos valores.
+    numeric_cols = [col for col in df.columns if _is_numeric(df[col].dtype)]
+    numeric_set = set(numeric_cols)
+    other_cols = [col for col in df.columns if col not in numeric_set]
+
+    missing = df.isna().sum()
+    if numeric_cols:
+        numeric = df[numeric_cols]
+        stats = numeric.agg(["mean", "std", "min", "max"])
+        quantiles = numeric.quantile(list(QUANTILES))
+    uniques = df[other_cols].nunique() if other_cols else pd.Series(dtype="int64")
+
+    columns = []
+    for col in df.columns:
+        col_profile = ColumnProfile(name=col, dtype=str(df[col].dtype), missing=int(missing[col]), is_numeric=col in numeric_set)
+        if col_profile.is_numeric:
+            col_profile.mean = _as_float(stats.at["mean", col])
+            col_profile.std = _as_float(stats.at["std", col])
+            col_profile.min = _as_float(stats.at["min", col])
+            col_profile.max = _as_float(stats.at["max", col])
+            col_profile.quantiles = {q: _as_float(quantiles.at[q, col]) for q in QUANTILES}
+        else:
+            col_profile.unique = int(uniques[col])
+            if col_profile.unique < FEW_UNIQUE_VALUES:
+                col_profile.top_values = list(df[col].value_counts().head(TOP_VALUES).items())
+        columns.append(col_profile)
+    return DataProfile(rows=len(df), columns=columns)
+
+# --- Modo Aproximado (esboços mescláveis, em blocos) ---
+class ProfileAccumulator:
+    """
+    Acumula o perfil de dados bloco a bloco, para conjuntos muito grandes ou transmitidos em fluxo.
+    Contagens, médias, desvios, mínimos e máximos são exatos; valores distintos (HyperLogLog),
+    quantis (t-digest) e valores comuns (Misra-Gries) são aproximados.
+    """
+    def __init__(self):
+        self.rows = 0
+        self.dtypes = {}
+        self.missing = {}
+        self.numeric = {}
+        self.digests = {}
+        self.distinct = {}
+        self.heavy_hitters = {}
+
+    def update(self, chunk: pd.DataFrame):
+        self.rows += len(chunk)
+        for col, count in chunk.isna().sum().items():
+            self.missing[col] = self.missing.get(col, 0) + int(count)
+            self.dtypes.setdefault(col, str(chunk[col].dtype))
+
+        numeric_cols = [col for col in chunk.columns if _is_numeric(chunk[col].dtype)]
+        if numeric_cols:
+            stats = chunk[numeric_cols].agg(["count", "mean", "var", "min", "max"])
+            for col in numeric_cols:
+                self._merge_moments(col, stats[col])
+                self.digests.setdefault(col, TDigest()).update(chunk[col].to_numpy(dtype=np.float64, na_value=np.nan))
+
+        for col in chunk.columns:
+            if col in numeric_cols:
+                continue
+            values = chunk[col].dropna()
+            self.distinct.setdefault(col, HyperLogLog()).update(hash_values(values))
+            self.heavy_hitters.setdefault(col, HeavyHitters()).update(values)
+
+    def _merge_moments(self, col, stats):
+        count = int(stats["count"])
+        if count == 0:
+            self.numeric.setdefault(col, {"count": 0, "mean": 0.0, "m2": 0.0, "min": np.inf, "max": -np.inf})
+            return
+        mean = float(stats["mean"])
+        m2 = float(stats["var"]) * (count - 1) if count > 1 else 0.0
+        current = self.numeric.get(col)
+        if current is None or current["count"] == 0:
+            self.numeric[col] = {"count": count, "mean": mean, "m2": m2, "min": float(stats["min"]), "max": float(stats["max"])}
+            return
+        # Combinação de momentos de Chan et al.: numericamente estável entre blocos.
+        total = current["count"] + count
+        delta = mean - current["mean"]
+        current["mean"] += delta * count / total
+        current["m2"] += m2 + delta ** 2 * current["count"] * count / total
+        current["count"] = total
+        current["min"] = min(current["min"], float(stats["min"]))
+        current["max"] = max(current["max"], float(stats["max"]))
+
+    def profile(self) -> DataProfile:
+        columns = []
+        for col, dtype in self.dtypes.items():
+            col_profile = ColumnProfile(name=col, dtype=dtype, missing=self.missing[col], is_numeric=col in self.numeric)
+            if col_profile.is_numeric:
+                moments = self.numeric[col]
+                count = moments["count"]
+                col_profile.mean = moments["mean"] if count else float("nan")
+                col_profile.std = (moments["m2"] / (count - 1)) ** 0.5 if count > 1 else float("nan")
+                col_profile.min = moments["min"] if count else float("nan")
+                col_profile.max = moments["max"] if count else float("nan")
+                col_profile.quantiles = {q: self.digests[col].quantile(q) for q in QUANTILES}
+            else:
+                col_profile.unique = self.distinct[col].count()
+                if col_profile.unique < FEW_UNIQUE_VALUES:
+                    col_profile.top_values = list(self.heavy_hitters[col].top(TOP_VALUES).items())
+            columns.append(col_profile)
+        return DataProfile(rows=self.rows, columns=columns, approximate=True)
+
+def build_data_profile(df: pd.DataFrame, approximate: bool = None) -> DataProfile:
+    """
+    Calcula o perfil estruturado de um DataFrame. Por padrão, usa o modo aproximado apenas
+    acima de `APPROXIMATE_THRESHOLD_ROWS` linhas.
+    """
+    if approximate is None:
+        approximate = len(df) > APPROXIMATE_THRESHOLD_ROWS
+    if not approximate:
+        return _exact_profile(df)
+    accumulator = ProfileAccumulator()
+    for start in range(0, len(df), PROFILE_CHUNK_ROWS):
+        accumulator.update(df.iloc[start:start + PROFILE_CHUNK_ROWS])
+    if len(df) == 0:
+        accumulator.update(df)
+    return accumulator.profile()
@@ -0,0 +1,174 @@
+import os
+import io
+import re
+import datetime
+import threading
+import docx
+from docx.shared import Inches, Pt
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+def clean_markdown(text):
+    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
+    text = re.sub(r'\*(.*?)\*', r'\1', text)
+    text = re.sub(r'^#+\s', '', text, flags=re.MULTILINE)
+    return text
+
+class ReportBuilder:
+    """
+    Relatório `.docx` dos itens pinados, montado de forma incremental.
+
+    O cabeçalho, o sumário e o perfil dos dados são montados uma vez; cada item pinado depois disso
+    só acrescenta a sua seção (e a sua linha no sumário). O documento só é refeito do zero quando um
+    item é removido ou reordenado, ou quando o perfil dos dados ou o usuário mudam. A data do cabeçalho é
+    atualizada a cada `build`. Os bytes gerados ficam em cache até a próxima mudança. `image_variant`, se fornecido, troca o caminho de cada gráfico
+    pela versão em resolução de relatório antes de incorporá-lo.
+    """
+    def __init__(self, image_variant=None):
+        self.image_variant = image_variant
+        self._lock = threading.Lock()
+        self._doc = None
+        self._base_key = None
+        self._item_ids = []
+        self._summary_anchor = None
+        self._date_run = None
+        self._bytes = None
+
+    def _stamp_date(self):
+        """Escreve a data atual no cabeçalho; o documento só precisa ser serializado de novo se ela mudou."""
+        date_text = f"Data: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')} "
+        if self._date_run.text != date_text:
+            self._date_run.text = date_text
+            self._bytes = None
+
+    def _start(self, data_profile, user_name):
+        doc = docx.Document()
+
+        # Adiciona e centraliza o logotipo no início
+        logo_path = "asset/LOGO.png"
+        if os.path.exists(logo_path):
+            p_logo = doc.add_paragraph()
+            p_logo.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            run_logo = p_logo.add_run()
+            run_logo.add_picture(logo_path, width=Inches(1.5))
+
+        # Estilo e título principal
+        style = doc.styles['Normal']
+        font = style.font
+        font.name = 'Calibri'
+        font.size = Pt(12)
+        title = doc.add_heading('Relatório de Análise de Dados - JEDI', 0)
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        # Metadados
+        p_meta = doc.add_paragraph()
+        p_meta.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        p_meta.add_run(f"Gerado por: {user_name}\n").italic = True
+        self._date_run = p_meta.add_run()
+        self._date_run.italic = True
+        self._stamp_date()
+        doc.add_paragraph("---")
+
+        # --- Seção do Sumário Estático ---
+        # As linhas de cada interação são inseridas antes da quebra de página (`_summary_anchor`).
+        doc.add_heading('Sumário', level=1)
+        doc.add_paragraph("Perfil Inicial dos Dados", style='List Bullet')
+        self._summary_anchor = doc.add_page_break()
+
+        # --- Seção do Perfil dos Dados ---
+        if data_profile:
+            doc.add_heading('Perfil Inicial dos Dados', level=1)
+
+            def parse_and_add_profile(profile_string):
+                lines = profile_string.strip().split('\n')
+                for line in lines:
+                    line = line.strip()
+                    if not line:
+                        continue
+
+                    if line.startswith('###'):
+                        doc.add_heading(line.replace('###', '').strip(), level=2)
+                    elif line.startswith('- **'):
+                        clean_line = line.replace('- **', '').replace('**', '').strip()
+                        p = doc.add_paragraph()
+                        p.add_run(clean_line).bold = True
+                    elif line.startswith('  - '):
+                        clean_line = line.replace('`', '').strip()[2:] # Remove o marcador e os backticks
+                        doc.add_paragraph(clean_line, style='List Bullet 2')
+                    else:
+                        doc.add_paragraph(line)
+
+            parse_and_add_profile(data_profile)
+            doc.add_page_break()
+
+        self._doc = doc
+        self._base_key = (data_profile, user_name)
+        self._item_ids = []
+        self._bytes = None
+
+    def _add_item(self, item):
+        doc = self._doc
+        i = len(self._item_ids)
+
+        resumo_pergunta = item['user_prompt'][:60] + '...' if len(item['user_prompt']) > 60 else item['user_prompt']
+        self._summary_anchor.insert_paragraph_before(f"Interação {i+1}: {resumo_pergunta}", style='List Bullet')
+
+        # --- Conteúdo Principal do Relatório ---
+        heading_interaction = doc.add_heading(f"Interação {i+1}: Pergunta do Usuário", level=1)
+        if i > 0:
+            heading_interaction.paragraph_format.space_before = Pt(24)
+
+        p_question = doc.add_paragraph()
+        p_question.add_run(item['user_prompt']).italic = True
+
+        heading_answer = doc.add_heading("Resposta do Agente", level=2)
+        heading_answer.paragraph_format.space_before = Pt(18)
+
+        content = clean_markdown(item['content'])
+        p_answer = doc.add_paragraph(content)
+        p_answer.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+
+        if item.get("image") and os.path.exists(item["image"]):
+            p_image = doc.add_paragraph()
+            p_image.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            p_image.paragraph_format.space_before = Pt(12)
+            run = p_image.add_run()
+            try:
+                image_path = self.image_variant(item["image"]) if self.image_variant else item["image"]
+                run.add_picture(image_path, width=Inches(5.5))
+            except Exception as e:
+                doc.add_paragraph(f"(Erro ao adicionar imagem: {e})")
+            p_caption = doc.add_paragraph()
+            p_caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            p_caption.add_run(f"Figura {i+1}: Gráfico gerado pela análise.").italic = True
+
+        self._item_ids.append(item["id"])
+        self._bytes = None
+
+    def update(self, pinned_items, data_profile, user_name):
+        """Sincroniza o documento com os itens pinados, acrescentando apenas as seções novas quando possível."""
+        item_ids = [item["id"] for item in pinned_items]
+        with self._lock:
+            if self._doc is None or self._base_key != (data_profile, user_name) or item_ids[:len(self._item_ids)] != self._item_ids:
+                self._start(data_profile, user_name)
+            for item in pinned_items[len(self._item_ids):]:
+                self._add_item(item)
+
+    def to_bytes(self) -> bytes:
+        """Bytes do `.docx`, serializados apenas se o documento mudou desde a última chamada."""
+        with self._lock:
+            if self._bytes is None:
+                bio = io.BytesIO()
+                self._doc.save(bio)
+                self._bytes = bio.getvalue()
+            return self._bytes
+
+    def build(self, pinned_items, data_profile, user_name) -> bytes:
+        self.update(pinned_items, data_profile, user_name)
+        with self._lock:
+            self._stamp_date()
+        return self.to_bytes()
+
+def generate_docx_report(pinned_items, data_profile, user_name):
+    bio = io.BytesIO(ReportBuilder().build(pinned_items, data_profile, user_name))
+    bio.seek(0)
+    return bio
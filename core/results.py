@@ -0,0 +1,114 @@
+import os
+import numpy as np
+import pandas as pd
+
+from core.profiling import estimate_tokens
+
+# Orçamento de tokens do resultado de uma ferramenta dentro do prompt do Sábio.
+SAGE_RESULT_TOKENS = int(os.getenv("JEDI_SAGE_RESULT_TOKENS", "1500"))
+# Colunas exibidas no resumo de DataFrames largos (as demais só entram na lista de nomes, se couberem).
+SUMMARY_MAX_COLUMNS = 20
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Corta um texto para caber em `max_tokens`, mantendo o início e o fim."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max(max_tokens * 4 - 80, 40)
+    head, tail = text[:max_chars * 3 // 4], text[-(max_chars // 4):]
+    return f"{head}\n… [{len(text) - len(head) - len(tail)} caracteres omitidos] …\n{tail}"
+
+def _fit_rows(render, rows: int, max_tokens: int) -> str:
+    """Maior `render(n)` (n <= rows, reduzido pela metade a cada tentativa) que cabe em `max_tokens`."""
+    n = max(rows, 1)
+    text = render(n)
+    while n > 2 and estimate_tokens(text) > max_tokens:
+        n //= 2
+        text = render(n)
+    return truncate_text(text, max_tokens)
+
+class ToolResult:
+    """
+    Resultado tipado de uma ferramenta do Conselho: "scalar", "series", "dataframe", "figure" ou "text".
+
+    O objeto real fica no servidor (para a tabela interativa da interface, via `to_frame`); o Sábio recebe
+    apenas `summary(max_tokens)`: o texto original, se couber no orçamento, ou um resumo com formato,
+    estatísticas agregadas e as primeiras/últimas linhas.
+    """
+    def __init__(self, kind: str, value=None, text: str = ""):
+        self.kind = kind
+        self.value = value
+        self.text = text if text is not None else ""
+
+    @classmethod
+    def from_value(cls, value, text: str = ""):
+        """Classifica o valor da última expressão executada pelo agente (None: apenas a saída em texto)."""
+        if isinstance(value, pd.DataFrame):
+            return cls("dataframe", value, text)
+        if isinstance(value, pd.Series):
+            return cls("series", value, text)
+        if isinstance(value, dict) and "figure_axes" in value:
+            return cls("figure", value, text)
+        if isinstance(value, (np.generic, int, float, bool, complex)):
+            return cls("scalar", value, text)
+        return cls("text", None, text)
+
+    @property
+    def total_rows(self) -> int:
+        """Linhas do resultado completo (o sandbox pode ter enviado só o início de um resultado muito grande)."""
+        return self.value.attrs.get("total_rows", len(self.value)) if self.kind in ("series", "dataframe") else 0
+
+    def to_frame(self):
+        """O resultado como DataFrame, para exibição interativa (None para escalares, textos e figuras)."""
+        if self.kind == "dataframe":
+            return self.value
+        if self.kind == "series":
+            return self.value.to_frame(name=self.value.name if self.value.name is not None else "valor")
+        return None
+
+    def summary(self, max_tokens: int = SAGE_RESULT_TOKENS) -> str:
+        # O texto de Series e DataFrames só serve se mostra todas as linhas (o repr do pandas corta as do meio).
+        complete = self.kind not in ("series", "dataframe") or self.total_rows == len(self.value) <= pd.get_option("display.max_rows")
+        if self.text and complete and estimate_tokens(self.text) <= max_tokens:
+            return self.text
+        if self.kind == "dataframe":
+            return self._dataframe_summary(max_tokens)
+        if self.kind == "series":
+            return self._series_summary(max_tokens)
+        if self.kind == "figure":
+            titles = [title for title in self.value.get("titles", []) if title]
+            return truncate_text(f"Figura matplotlib com {self.value['figure_axes']} eixo(s)" + (f": {', '.join(titles)}." if titles else "."), max_tokens)
+        return truncate_text(self.text or str(self.value), max_tokens)
+
+    def _dataframe_summary(self, max_tokens: int) -> str:
+        df = self.value
+        header = f"DataFrame com {self.total_rows} linhas e {df.shape[1]} colunas."
+        if df.shape[1] > SUMMARY_MAX_COLUMNS:
+            header += "\nColunas: " + truncate_text(", ".join(map(str, df.columns)), max_tokens // 5)
+        parts = [header]
+        # Estatísticas agregadas das colunas numéricas, se o resultado não couber inteiro.
+        numeric = df.select_dtypes("number")
+        if len(df) > 10 and not numeric.empty:
+            stats = numeric.iloc[:, :SUMMARY_MAX_COLUMNS].agg(["mean", "std", "min", "max"]).T
+            parts.append("Estatísticas das colunas numéricas:\n" + truncate_text(stats.to_string(), max_tokens // 3))
+        used = sum(estimate_tokens(part) for part in parts)
+        rows = _fit_rows(lambda n: df.to_string(max_rows=n, max_cols=SUMMARY_MAX_COLUMNS), min(len(df), 60), max(max_tokens - used, 50))
+        parts.append(f"Primeiras e últimas linhas:\n{rows}")
+        return "\n\n".join(parts)
+
+    def _series_summary(self, max_tokens: int) -> str:
+        series = self.value
+        name = f" '{series.name}'" if series.name is not None else ""
+        parts = [f"Série{name} com {self.total_rows} valores (tipo {series.dtype})."]
+        if len(series) > 10:
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                # Ex: `value_counts()`: o índice são as categorias e os valores, as contagens.
+                parts.append(f"Soma: {series.sum()}; média: {series.mean()}; mínimo: {series.min()}; máximo: {series.max()}.")
+            else:
+                parts.append(f"Valores distintos: {series.nunique()}.")
+        used = sum(estimate_tokens(part) for part in parts)
+        rows = _fit_rows(lambda n: series.to_string(max_rows=n), min(len(series), 60), max(max_tokens - used, 50))
+        parts.append(f"Primeiros e últimos valores:\n{rows}")
+        return "\n".join(parts)
+
+    def __str__(self) -> str:
+        return self.summary()
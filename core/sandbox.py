@@ -0,0 +1,219 @@
+import os
+import zlib
+import hashlib
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from collections import namedtuple
+import pandas as pd
+import streamlit as st
+
+from core import sandbox_worker
+
+SANDBOX_ENABLED = os.getenv("JEDI_SANDBOX", "1") == "1"
+SANDBOX_WORKERS = int(os.getenv("JEDI_SANDBOX_WORKERS", "4"))
+SANDBOX_TIMEOUT_SECONDS = float(os.getenv("JEDI_SANDBOX_TIMEOUT", "120"))
+SANDBOX_CPU_SECONDS = int(os.getenv("JEDI_SANDBOX_CPU_SECONDS", "120"))
+SANDBOX_MEMORY_MB = int(os.getenv("JEDI_SANDBOX_MEMORY_MB", "4096"))
+DEFAULT_FRAME_DIR = os.getenv("JEDI_SANDBOX_FRAME_DIR", ".jedi_cache/sandbox_frames")
+# Espaço máximo em disco dos frames exportados; acima dele, os usados há mais tempo (e sem sessão) são apagados.
+SANDBOX_FRAMES_MB = int(os.getenv("JEDI_SANDBOX_FRAMES_MB", "8192"))
+
+# Reserva quando o sandbox está desativado: serializa o uso do `pyplot` global do servidor.
+inprocess_render_lock = threading.Lock()
+
+# `value`: o valor da última expressão do código (DataFrame, Series, escalar, descrição de figura ou None).
+SandboxResult = namedtuple("SandboxResult", ["output", "value", "images"])
+
+# Único caminho de imagem que o código em execução pode gravar (o PNG de staging do Artesão), se houver.
+_expected_image = ContextVar("jedi_expected_image", default=None)
+
+@contextmanager
+def expect_image(path: str):
+    """Durante o bloco, o código executado no sandbox pode gravar apenas `path` (ver `save_images`)."""
+    token = _expected_image.set(path)
+    try:
+        yield
+    finally:
+        _expected_image.reset(token)
+
+def expected_image_path() -> str:
+    return _expected_image.get()
+
+class SandboxTimeout(Exception):
+    """O código excedeu o tempo limite e o processo do sandbox foi reiniciado."""
+
+class SandboxCrashed(Exception):
+    """O processo do sandbox morreu durante o trabalho (limite de CPU, falta de memória) e foi reiniciado."""
+
+class SandboxPool:
+    """
+    Processos pré-aquecidos e com recursos limitados que executam o código gerado pelos agentes.
+
+    - Em Unix, cada processo tem limite de memória (RLIMIT_DATA) e de CPU por trabalho (RLIMIT_CPU), além do
+      tempo limite de parede; um trabalho descontrolado derruba só o seu processo, que é reiniciado.
+    - O DataFrame é exportado uma vez por impressão digital para um arquivo Arrow sem compressão, que os
+      processos leem com mapeamento de memória e sem cópia; criar ou reutilizar um processo nunca copia o frame.
+    - Cada sessão de agente é fixada em um processo (pelo hash da chave), que mantém o namespace do REPL
+      entre os passos; apenas código, variáveis pequenas, a saída e os bytes dos PNGs trafegam.
+    - Cada trabalho começa com uma figura nova, então sessões simultâneas não compartilham o `pyplot`.
+    - Cada sessão da interface indica o frame que está usando (`use_frame`); um frame sem sessões é apagado
+      quando a última o troca (novo upload, instantâneo parcial mais recente) ou é liberada (`release_session`).
+      Os demais ficam limitados a `frames_mb` em disco, apagando os usados há mais tempo. Processos que já
+      mapearam um arquivo apagado continuam lendo-o normalmente.
+    """
+    def __init__(self, workers: int = SANDBOX_WORKERS, timeout: float = SANDBOX_TIMEOUT_SECONDS, frame_dir: str = DEFAULT_FRAME_DIR,
+                 cpu_seconds: int = SANDBOX_CPU_SECONDS, memory_mb: int = SANDBOX_MEMORY_MB, frames_mb: int = SANDBOX_FRAMES_MB):
+        self.timeout = timeout
+        self.frame_dir = frame_dir
+        self.frames_bytes = frames_mb * 1024 * 1024
+        # Frame atual de cada sessão da interface: {sessão: impressão digital}.
+        self._session_frames = {}
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        os.makedirs(frame_dir, exist_ok=True)
+        self._slots = [self._start_slot() for _ in range(workers)]
+
+    def _start_slot(self) -> ProcessPoolExecutor:
+        # 'spawn': nunca bifurcar o servidor Streamlit (com suas threads) para criar os processos.
+        executor = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+            initializer=sandbox_worker.warm_up, initargs=(self.memory_bytes, self.cpu_seconds)
+        )
+        executor.submit(sandbox_worker.ping)
+        return executor
+
+    def _restart_slot(self, index: int, executor: ProcessPoolExecutor):
+        """Encerra à força o processo de um slot (ex: trabalho travado) e sobe um novo no lugar."""
+        with self._lock:
+            if self._slots[index] is not executor:
+                return
+            # ProcessPoolExecutor não tem API pública para matar um trabalho em execução.
+            for process in list(getattr(executor, "_processes", {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._slots[index] = self._start_slot()
+
+    def _frame_path(self, fingerprint: str) -> str:
+        return os.path.join(self.frame_dir, f"{hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()}.arrow")
+
+    def export_frame(self, df: pd.DataFrame, fingerprint: str) -> str:
+        """Grava (uma vez) o DataFrame em Arrow sem compressão, para leitura mapeada em memória pelos processos."""
+        path = self._frame_path(fingerprint)
+        if os.path.exists(path):
+            # A data de modificação é a do último uso (ordem da limpeza por tamanho).
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+        if not os.path.exists(path):
+            # Feather exige índice padrão e nomes de coluna em texto; com Copy-on-Write isto não copia os dados.
+            frame = df.reset_index(drop=True)
+            frame.columns = [str(col) for col in frame.columns]
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            frame.to_feather(temp_path, compression="uncompressed")
+            os.replace(temp_path, path)
+            self._evict_frames(keep=path)
+        return path
+
+    def use_frame(self, session: str, fingerprint: str):
+        """Registra o frame atual da sessão; o anterior é apagado se nenhuma outra sessão o usa."""
+        with self._lock:
+            previous = self._session_frames.get(session)
+            self._session_frames[session] = fingerprint
+            orphaned = previous if previous != fingerprint and previous not in self._session_frames.values() else None
+        if orphaned:
+            self._remove_frame(self._frame_path(orphaned))
+
+    def release_session(self, session: str):
+        """Esquece o frame da sessão (logout, reinício) e o apaga se nenhuma outra sessão o usa."""
+        with self._lock:
+            previous = self._session_frames.pop(session, None)
+            orphaned = previous if previous and previous not in self._session_frames.values() else None
+        if orphaned:
+            self._remove_frame(self._frame_path(orphaned))
+
+    @staticmethod
+    def _remove_frame(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict_frames(self, keep: str):
+        """Apaga os frames usados há mais tempo (exceto `keep` e os das sessões ativas) até caber em `frames_bytes`."""
+        with self._lock:
+            in_use = {self._frame_path(fingerprint) for fingerprint in self._session_frames.values()} | {keep}
+        frames = []
+        for entry in os.scandir(self.frame_dir):
+            if entry.name.endswith(".arrow"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                frames.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in frames)
+        for _, size, path in sorted(frames):
+            if total <= self.frames_bytes:
+                break
+            if path not in in_use:
+                self._remove_frame(path)
+                total -= size
+
+    def run(self, code: str, df: pd.DataFrame, fingerprint: str, session_key: str = None, namespace: dict = None,
+            timeout: float = None, image_path: str = None) -> SandboxResult:
+        """
+        Executa `code` (com `df`, `plt`, `sns` e os auxiliares de `core.plotting`) no sandbox.
+        Com `session_key`, o trabalho roda sempre no mesmo processo e reaproveita o namespace dos passos anteriores.
+        Apenas um `savefig` em `image_path` volta em `images`; gravações em outros caminhos são descartadas.
+        """
+        frame_path = self.export_frame(df, fingerprint)
+        index = zlib.crc32((session_key or code).encode("utf-8")) % len(self._slots)
+        with self._lock:
+            executor = self._slots[index]
+            future = executor.submit(sandbox_worker.run_job, code, frame_path, session_key, namespace or {}, image_path)
+        try:
+            result = future.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError:
+            self._restart_slot(index, executor)
+            raise SandboxTimeout(f"A execução excedeu {timeout or self.timeout:.0f}s e foi interrompida.")
+        except BrokenProcessPool:
+            self._restart_slot(index, executor)
+            raise SandboxCrashed("O processo do sandbox foi encerrado (limite de CPU ou de memória excedido).")
+        return SandboxResult(result["output"], result["value"], result["images"])
+
+    def drop_namespace(self, session_key: str):
+        """Descarta (sem esperar) o namespace mantido no processo para `session_key`."""
+        index = zlib.crc32(session_key.encode("utf-8")) % len(self._slots)
+        with self._lock:
+            try:
+                self._slots[index].submit(sandbox_worker.drop_namespace, session_key)
+            except RuntimeError:
+                # Slot quebrado ou encerrado: o processo novo não tem o namespace.
+                pass
+
+    def shutdown(self):
+        with self._lock:
+            for executor in self._slots:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+def save_images(images: dict, image_path: str):
+    """
+    Grava no servidor o PNG devolvido por um trabalho do sandbox, apenas se for o `image_path` esperado e
+    ele estiver dentro da área de staging do armazém de artefatos. Qualquer outro caminho é ignorado.
+    """
+    from core.artifacts import get_artifact_store
+    if not image_path or image_path not in images or not get_artifact_store().is_staging_path(image_path):
+        return
+    os.makedirs(os.path.dirname(image_path), exist_ok=True)
+    with open(image_path, "wb") as f:
+        f.write(images[image_path])
+
+@st.cache_resource
+def get_sandbox_pool() -> SandboxPool:
+    """Retorna o sandbox compartilhado por todas as sessões do processo."""
+    return SandboxPool()
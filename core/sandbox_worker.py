@@ -0,0 +1,215 @@
+import io
+import os
+import ast
+import pickle
+import types
+try:
+    import resource
+except ImportError:
+    # Windows: sem RLIMIT; os trabalhos continuam isolados em processos e limitados pelo tempo (ver `core.sandbox`).
+    resource = None
+from collections import OrderedDict
+from contextlib import redirect_stdout
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+import seaborn as sns
+
+from core.plotting import plotting_namespace
+
+# Código executado dentro dos processos do sandbox (ver `core.sandbox`).
+# Este módulo não importa Streamlit nem LangChain, para que os processos subam rápido.
+
+FRAME_CACHE_SIZE = 4
+NAMESPACE_CACHE_SIZE = 16
+MAX_NAMESPACE_VALUE_BYTES = 1_000_000
+# Tamanho máximo do valor da última expressão devolvido ao servidor (resultados maiores voltam cortados).
+MAX_RESULT_BYTES = int(os.getenv("JEDI_RESULT_MAX_MB", "64")) * 1024 * 1024
+
+_frames = OrderedDict()
+_namespaces = OrderedDict()
+_cpu_seconds_per_job = None
+_captured = None
+_allowed_image = None
+_original_savefig = Figure.savefig
+
+def _capturing_savefig(self, fname, *args, **kwargs):
+    """
+    Durante um trabalho, `savefig` nunca grava no disco: os bytes voltam ao servidor apenas se `fname` é o
+    caminho de imagem esperado pelo trabalho; qualquer outro caminho é descartado.
+    """
+    if _captured is None or not isinstance(fname, (str, os.PathLike)):
+        return _original_savefig(self, fname, *args, **kwargs)
+    if _allowed_image is None or os.path.realpath(fname) != _allowed_image:
+        return None
+    buffer = io.BytesIO()
+    kwargs.setdefault("format", os.path.splitext(str(fname))[1].lstrip(".") or "png")
+    _original_savefig(self, buffer, *args, **kwargs)
+    _captured[str(fname)] = buffer.getvalue()
+
+def warm_up(memory_limit_bytes: int = 0, cpu_seconds_per_job: int = 0):
+    """
+    Inicializador dos processos: aplica os limites de recursos e importa e exercita matplotlib/seaborn
+    (cache de fontes, backend) uma vez.
+
+    A memória é limitada por RLIMIT_DATA, que conta as alocações do processo mas não os arquivos
+    mapeados em memória (os DataFrames compartilhados), ao contrário de RLIMIT_AS.
+    """
+    global _cpu_seconds_per_job
+    if memory_limit_bytes and resource is not None:
+        resource.setrlimit(resource.RLIMIT_DATA, (memory_limit_bytes, memory_limit_bytes))
+    _cpu_seconds_per_job = cpu_seconds_per_job or None
+    Figure.savefig = _capturing_savefig
+    fig, ax = plt.subplots()
+    sns.histplot(x=np.arange(10), ax=ax)
+    fig.savefig(io.BytesIO(), format="png")
+    plt.close("all")
+
+def ping() -> int:
+    return os.getpid()
+
+def _limit_cpu_for_job():
+    """RLIMIT_CPU é cumulativo por processo: o limite flexível é movido para o tempo já gasto + a cota do trabalho."""
+    if not _cpu_seconds_per_job or resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (used + _cpu_seconds_per_job, hard))
+
+def _load_frame(frame_path: str) -> pd.DataFrame:
+    """
+    Lê o DataFrame compartilhado com mapeamento de memória. Com `split_blocks`, colunas numéricas sem
+    nulos viram arrays numpy que apontam direto para o arquivo mapeado (sem cópia), e as páginas são
+    compartilhadas entre todos os processos pelo cache do sistema operacional.
+    """
+    df = _frames.get(frame_path)
+    if df is None:
+        df = feather.read_table(frame_path, memory_map=True).to_pandas(split_blocks=True)
+        _frames[frame_path] = df
+        while len(_frames) > FRAME_CACHE_SIZE:
+            _frames.popitem(last=False)
+    else:
+        _frames.move_to_end(frame_path)
+    return df
+
+def picklable_items(namespace: dict, exclude=()) -> dict:
+    """Valores pequenos e serializáveis de um namespace (variáveis criadas pelo código do agente)."""
+    items = {}
+    for name, value in namespace.items():
+        if name.startswith("__") or name in exclude or callable(value) or isinstance(value, types.ModuleType):
+            continue
+        try:
+            if len(pickle.dumps(value)) <= MAX_NAMESPACE_VALUE_BYTES:
+                items[name] = value
+        except Exception:
+            continue
+    return items
+
+def execute_with_value(code: str, namespace: dict):
+    """
+    Executa código como o REPL do agente: as instruções e, se a última for uma expressão, seu valor.
+    Retorna `(saída em texto, valor da última expressão ou None)`.
+    """
+    tree = ast.parse(code)
+    exec(ast.unparse(ast.Module(tree.body[:-1], type_ignores=[])), namespace)
+    last = ast.unparse(ast.Module(tree.body[-1:], type_ignores=[]))
+    stdout = io.StringIO()
+    with redirect_stdout(stdout):
+        try:
+            value = eval(last, namespace)
+        except SyntaxError:
+            exec(last, namespace)
+            value = None
+    return (stdout.getvalue() if value is None else str(value)), value
+
+def execute(code: str, namespace: dict) -> str:
+    """Como `execute_with_value`, devolvendo apenas a saída em texto."""
+    return execute_with_value(code, namespace)[0]
+
+def transportable(value):
+    """
+    Versão do valor da última expressão que pode voltar ao servidor: DataFrames, Series e escalares
+    seguem como estão (cortados nas primeiras linhas acima de `MAX_RESULT_BYTES`, com o total em
+    `attrs["total_rows"]`); figuras e eixos do matplotlib viram uma descrição; o resto é descartado.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = int(value.memory_usage(deep=False).sum()) if isinstance(value, pd.DataFrame) else int(value.memory_usage(deep=False))
+        if size > MAX_RESULT_BYTES and len(value):
+            total_rows = len(value)
+            value = value.head(max(int(total_rows * MAX_RESULT_BYTES / size), 1)).copy()
+            value.attrs["total_rows"] = total_rows
+        return value
+    if isinstance(value, (np.generic, int, float, bool, complex)):
+        return value
+    # Ex: `ax`, `fig`, `plt.subplots(2, 2)[1]` (array de eixos) ou a lista devolvida por `plt.plot`.
+    items = value.ravel() if isinstance(value, np.ndarray) else value if isinstance(value, (list, tuple)) else [value]
+    axes = [item for item in items if isinstance(item, (Figure, plt.Axes))]
+    if axes:
+        titles = [item.get_title() if isinstance(item, plt.Axes) else (item.get_suptitle() or "") for item in axes]
+        return {"figure_axes": len(axes), "titles": titles}
+    return None
+
+def _session_namespace(session_key: str, frame_path: str, initial: dict) -> dict:
+    """
+    Namespace do REPL de um agente, mantido no processo entre os passos (variáveis intermediárias
+    grandes não precisam voltar ao servidor). O `df` é uma cópia rasa: com Copy-on-Write, alterações
+    feitas pelo código do agente nunca atingem o DataFrame compartilhado.
+    """
+    key = (session_key, frame_path)
+    scope = _namespaces.get(key)
+    if scope is None:
+        scope = {**initial, "df": _load_frame(frame_path).copy(deep=False), "plt": plt, "sns": sns, "pd": pd, "np": np, **plotting_namespace()}
+        _namespaces[key] = scope
+        while len(_namespaces) > NAMESPACE_CACHE_SIZE:
+            _namespaces.popitem(last=False)
+    else:
+        _namespaces.move_to_end(key)
+    return scope
+
+def drop_namespace(session_key: str):
+    """Esquece os namespaces de `session_key` (o REPL do agente recomeçou com outra chave)."""
+    for key in [key for key in _namespaces if key[0] == session_key]:
+        del _namespaces[key]
+
+def run_job(code: str, frame_path: str, session_key: str = None, namespace: dict = None, image_path: str = None) -> dict:
+    """
+    Executa um passo de código do agente. Sem `session_key`, o trabalho usa um namespace descartável.
+    Cada trabalho começa com uma figura nova; retorna a saída do código, o valor da última expressão
+    (ver `transportable`) e os PNGs salvos (`{caminho: bytes}`), que só podem ser o `image_path` do trabalho.
+    """
+    global _captured, _allowed_image
+    if session_key:
+        scope = _session_namespace(session_key, frame_path, namespace or {})
+    else:
+        scope = {**(namespace or {}), "df": _load_frame(frame_path).copy(deep=False), "plt": plt, "sns": sns, "pd": pd, "np": np, **plotting_namespace()}
+    _limit_cpu_for_job()
+    _captured = {}
+    _allowed_image = os.path.realpath(image_path) if image_path else None
+    plt.close("all")
+    try:
+        with plt.rc_context():
+            sns.set_theme(style="whitegrid")
+            value = None
+            try:
+                output, value = execute_with_value(code, scope)
+                value = transportable(value)
+            except MemoryError:
+                output = "MemoryError: o código excedeu o limite de memória do sandbox."
+            except Exception as e:
+                output = "{}: {}".format(type(e).__name__, str(e))
+            if not _captured and plt.get_fignums():
+                # O código desenhou mas não salvou: devolve a figura atual sem caminho.
+                buffer = io.BytesIO()
+                _original_savefig(plt.gcf(), buffer, format="png")
+                _captured[""] = buffer.getvalue()
+        images = _captured
+    finally:
+        _captured = None
+        _allowed_image = None
+        plt.close("all")
+    return {"output": output, "value": value, "images": images}
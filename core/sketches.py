@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+# Esboços (sketches) probabilísticos mescláveis usados pelo perfil aproximado de dados.
+# Todos recebem blocos de valores já vetorizados (arrays numpy / Series pandas).
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """Retorna hashes uint64 dos valores não nulos de uma Series."""
+    return pd.util.hash_pandas_object(values.dropna(), index=False).to_numpy(dtype=np.uint64)
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Número de bits significativos de cada uint64 (exato, via duas metades de 32 bits)."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp é exato para inteiros de até 53 bits e retorna o expoente == bit_length.
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+class HyperLogLog:
+    """Contagem aproximada de valores distintos (erro padrão ~1.04/sqrt(2**p))."""
+    def __init__(self, p: int = 14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        remainder = hashes << np.uint64(self.p)
+        rank = np.minimum(64 - _bit_length(remainder) + 1, 64 - self.p + 1).astype(np.uint8)
+        ranks = pd.Series(rank).groupby(index).max()
+        positions = ranks.index.to_numpy()
+        self.registers[positions] = np.maximum(self.registers[positions], ranks.to_numpy())
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros > 0:
+            estimate = self.m * np.log(self.m / zeros)
+        return int(round(estimate))
+
+class TDigest:
+    """
+    Esboço de quantis no estilo t-digest com mesclagem vetorizada: os centróides são agrupados
+    pela função de escala k1, o que mantém centróides pequenos nas caudas e grandes no centro.
+    """
+    def __init__(self, compression: int = 200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray, weights: np.ndarray = None):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        if weights is None:
+            weights = np.ones(len(values))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+
+    def merge(self, other: "TDigest"):
+        if len(other.means) == 0:
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        scale = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        buckets = np.floor(scale - scale.min()).astype(np.int64)
+        grouped_weights = np.bincount(buckets, weights=weights)
+        grouped_sums = np.bincount(buckets, weights=means * weights)
+        non_empty = grouped_weights > 0
+        self.weights = grouped_weights[non_empty]
+        self.means = grouped_sums[non_empty] / self.weights
+
+    def quantile(self, q: float) -> float:
+        if len(self.means) == 0:
+            return float("nan")
+        total = self.weights.sum()
+        positions = (np.cumsum(self.weights) - self.weights / 2) / total
+        xs = np.concatenate([[0.0], positions, [1.0]])
+        ys = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q, xs, ys))
+
+class HeavyHitters:
+    """Resumo Misra-Gries mesclável dos valores mais frequentes (exato quando há até `capacity` valores distintos)."""
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64")
+
+    def update(self, values: pd.Series):
+        self._merge_counts(values.value_counts())
+
+    def merge(self, other: "HeavyHitters"):
+        self._merge_counts(other.counts)
+
+    def _merge_counts(self, counts: pd.Series):
+        if counts.empty:
+            return
+        combined = self.counts.add(counts, fill_value=0) if not self.counts.empty else counts
+        combined = combined.astype("int64").sort_values(ascending=False)
+        if len(combined) > self.capacity:
+            combined = combined - combined.iloc[self.capacity]
+            combined = combined[combined > 0]
+        self.counts = combined
+
+    def top(self, n: int = 5) -> pd.Series:
+        return self.counts.head(n)
@@ -0,0 +1,309 @@
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import streamlit as st
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+TRACING_ENABLED = os.getenv("JEDI_TRACING", "1") == "1"
+DEFAULT_TRACE_PATH = os.getenv("JEDI_TRACE_PATH", ".jedi_cache/traces.jsonl")
+# Acima deste tamanho o arquivo de traces é rotacionado para `<path>.1` (só uma geração anterior é mantida).
+DEFAULT_TRACE_MAX_MB = int(os.getenv("JEDI_TRACE_MB", "64"))
+METRICS_PORT = int(os.getenv("JEDI_METRICS_PORT", "0"))
+# Janela deslizante de durações por etapa usada no cálculo dos quantis.
+METRICS_WINDOW = int(os.getenv("JEDI_METRICS_WINDOW", "2048"))
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current_trace = contextvars.ContextVar("jedi_trace", default=None)
+_current_span = contextvars.ContextVar("jedi_span", default=None)
+_open_llm_span = contextvars.ContextVar("jedi_llm_span", default=None)
+# Enquanto um trace está ativo, o LangChain inclui este handler em toda chamada de LLM e de agente
+# feita no mesmo contexto (inclusive em tarefas asyncio e threads criadas a partir dele).
+_trace_handler = contextvars.ContextVar("jedi_trace_handler", default=None)
+register_configure_hook(_trace_handler, inheritable=True)
+
+class Span:
+    """Intervalo medido de uma etapa do Conselho ("stage") ou de uma chamada de LLM ("llm")."""
+    def __init__(self, name: str, kind: str, parent=None, **attributes):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.kind = kind
+        self.parent_id = parent.id if parent is not None else None
+        self.stage = name if kind == "stage" else (parent.stage if parent is not None else "council")
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.duration = None
+        self.attributes = attributes
+
+    def end(self, **attributes):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._start_perf
+        self.attributes.update(attributes)
+
+    def elapsed_ms(self) -> float:
+        """Milissegundos desde o início do span (ex: tempo até o primeiro token), mesmo antes de `end`."""
+        return round((time.perf_counter() - self._start_perf) * 1000, 1)
+
+    def increment(self, attribute: str, amount: int = 1):
+        self.attributes[attribute] = self.attributes.get(attribute, 0) + amount
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "parent_id": self.parent_id, "name": self.name, "kind": self.kind, "stage": self.stage,
+                "start": self.start, "duration": self.duration, **self.attributes}
+
+class Trace:
+    """Todos os spans de uma pergunta ao Conselho. O span raiz ("council") cobre o atendimento inteiro."""
+    def __init__(self, name: str, **attributes):
+        self.id = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self.root = Span(name, "stage", **attributes)
+        self.spans = [self.root]
+        self._llm_spans = {}
+
+    def add(self, span: Span) -> Span:
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def start_llm(self, run_id, parent: Span, **attributes) -> Span:
+        span = self.add(Span("llm", "llm", parent, **attributes))
+        with self._lock:
+            self._llm_spans[run_id] = span
+        return span
+
+    def end_llm(self, run_id, prompt_tokens: int = 0, completion_tokens: int = 0, **attributes):
+        with self._lock:
+            span = self._llm_spans.pop(run_id, None)
+        if span is None:
+            return
+        # Respostas do cache não consomem tokens do provedor.
+        if not span.attributes.get("cache_hit"):
+            attributes.update(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        span.end(**attributes)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        return {"trace_id": self.id, "spans": spans}
+
+    def summary(self) -> list:
+        """
+        Uma linha por etapa (na ordem em que começaram) com duração, chamadas de LLM, tokens, acertos de
+        cache e iterações do agente, para a auditoria na interface.
+        """
+        rows = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            row = rows.setdefault(span.stage, {"etapa": span.stage, "duração (ms)": None, "chamadas LLM": 0, "tokens prompt": 0,
+                                               "tokens resposta": 0, "cache": 0, "iterações": 0})
+            if span.kind == "stage":
+                if span.duration is not None:
+                    row["duração (ms)"] = round(span.duration * 1000, 1)
+                row["iterações"] += span.attributes.get("iterations", 0)
+            else:
+                row["chamadas LLM"] += 1
+                row["tokens prompt"] += span.attributes.get("prompt_tokens", 0)
+                row["tokens resposta"] += span.attributes.get("completion_tokens", 0)
+                row["cache"] += 1 if span.attributes.get("cache_hit") else 0
+        return list(rows.values())
+
+def _token_usage(response) -> tuple:
+    """(tokens do prompt, tokens da resposta) de um LLMResult: metadados de uso (chat), `token_usage` ou contagens do Ollama."""
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            info = generation.generation_info or {}
+            prompt_tokens += usage.get("input_tokens") or info.get("prompt_eval_count") or 0
+            completion_tokens += usage.get("output_tokens") or info.get("eval_count") or 0
+    if not (prompt_tokens or completion_tokens):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+class _TraceCallbackHandler(BaseCallbackHandler):
+    """Abre um span por chamada de LLM (sob a etapa corrente) e conta as iterações dos agentes ReAct."""
+    # Executado na mesma thread e contexto da chamada, para enxergar a etapa corrente.
+    run_inline = True
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+
+    def _start(self, run_id, serialized, kwargs):
+        parent = _current_span.get() or self.trace.root
+        model = (kwargs.get("invocation_params") or {}).get("model") or (kwargs.get("invocation_params") or {}).get("model_name")
+        span = self.trace.start_llm(run_id, parent, model=model or (serialized or {}).get("name"))
+        _open_llm_span.set(span)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, serialized, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, serialized, kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        prompt_tokens, completion_tokens = _token_usage(response)
+        self.trace.end_llm(run_id, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self.trace.end_llm(run_id, error=str(error))
+
+    def on_agent_action(self, action, *, run_id, **kwargs):
+        span = _current_span.get()
+        if span is not None:
+            span.increment("iterations")
+
+def record_cache_hit():
+    """Chamado pelo cache de LLM a cada acerto: marca a chamada corrente (ou registra uma, se o LLM não abriu span)."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    span = _open_llm_span.get()
+    if span is not None and span.duration is None:
+        span.attributes["cache_hit"] = True
+        return
+    # LLMs de texto (ex: Ollama) não disparam callbacks quando todos os prompts estão em cache.
+    trace.add(Span("llm", "llm", _current_span.get() or trace.root, cache_hit=True)).end()
+
+@contextmanager
+def start_trace(name: str = "council", **attributes):
+    """Abre um trace para uma pergunta; ao sair, ele é exportado (JSONL e métricas). Sem tracing, entrega None."""
+    if not TRACING_ENABLED:
+        yield None
+        return
+    trace = Trace(name, **attributes)
+    tokens = (_current_trace.set(trace), _current_span.set(trace.root), _trace_handler.set(_TraceCallbackHandler(trace)),
+              _open_llm_span.set(None))
+    try:
+        yield trace
+    finally:
+        for var, token in zip((_current_trace, _current_span, _trace_handler, _open_llm_span), tokens):
+            var.reset(token)
+        trace.root.end()
+        try:
+            get_trace_exporter().export(trace)
+        except Exception as e:
+            print(f"Trace export failed: {e}")
+
+@contextmanager
+def span(name: str, **attributes):
+    """Mede uma etapa do Conselho dentro do trace corrente (sem trace ativo, não faz nada)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    stage = trace.add(Span(name, "stage", _current_span.get() or trace.root, **attributes))
+    token = _current_span.set(stage)
+    try:
+        yield stage
+    except BaseException as e:
+        stage.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        stage.end()
+
+# --- Exportação ---
+class TraceExporter:
+    """
+    Destino dos traces concluídos: uma linha JSON por trace em `path` e métricas agregadas por etapa,
+    expostas no formato texto do Prometheus (`render_prometheus`, ou HTTP em `/metrics` com `serve`).
+    Os quantis (p50/p95/p99) de duração são calculados sobre as últimas `window` execuções de cada etapa.
+    Quando o arquivo passa de `max_bytes`, ele vira `<path>.1` (substituindo a geração anterior).
+    """
+    def __init__(self, path: str = DEFAULT_TRACE_PATH, window: int = METRICS_WINDOW, max_bytes: int = DEFAULT_TRACE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._durations = defaultdict(lambda: deque(maxlen=window))
+        self._counters = defaultdict(float)
+        self._server = None
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def export(self, trace: Trace):
+        record = trace.to_dict()
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                rotate = f.tell() > self.max_bytes
+            if rotate:
+                os.replace(self.path, self.path + ".1")
+            for span in record["spans"]:
+                stage = span["stage"]
+                if span["kind"] == "stage" and span["duration"] is not None:
+                    self._durations[stage].append(span["duration"])
+                    self._counters[("jedi_stage_duration_seconds_sum", stage)] += span["duration"]
+                    self._counters[("jedi_stage_duration_seconds_count", stage)] += 1
+                    self._counters[("jedi_agent_iterations_total", stage)] += span.get("iterations", 0)
+                elif span["kind"] == "llm":
+                    self._counters[("jedi_llm_calls_total", stage)] += 1
+                    self._counters[("jedi_llm_prompt_tokens_total", stage)] += span.get("prompt_tokens", 0)
+                    self._counters[("jedi_llm_completion_tokens_total", stage)] += span.get("completion_tokens", 0)
+                    self._counters[("jedi_llm_cache_hits_total", stage)] += 1 if span.get("cache_hit") else 0
+
+    def quantiles(self, stage: str) -> dict:
+        with self._lock:
+            durations = sorted(self._durations.get(stage, ()))
+        if not durations:
+            return {}
+        return {q: durations[min(len(durations) - 1, int(q * len(durations)))] for q in QUANTILES}
+
+    def render_prometheus(self) -> str:
+        lines = ["# HELP jedi_stage_duration_seconds Duração de cada etapa do Conselho.", "# TYPE jedi_stage_duration_seconds summary"]
+        with self._lock:
+            stages = sorted(self._durations)
+            counters = dict(self._counters)
+        for stage in stages:
+            for q, value in self.quantiles(stage).items():
+                lines.append(f'jedi_stage_duration_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'jedi_stage_duration_seconds_sum{{stage="{stage}"}} {counters[("jedi_stage_duration_seconds_sum", stage)]:.6f}')
+            lines.append(f'jedi_stage_duration_seconds_count{{stage="{stage}"}} {counters[("jedi_stage_duration_seconds_count", stage)]:.0f}')
+        for metric in ("jedi_llm_calls_total", "jedi_llm_prompt_tokens_total", "jedi_llm_completion_tokens_total",
+                       "jedi_llm_cache_hits_total", "jedi_agent_iterations_total"):
+            lines.append(f"# TYPE {metric} counter")
+            for (name, stage), value in sorted(counters.items()):
+                if name == metric:
+                    lines.append(f'{metric}{{stage="{stage}"}} {value:.0f}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int):
+        """Expõe `render_prometheus` em http://0.0.0.0:<port>/metrics, numa thread em segundo plano."""
+        if self._server is not None:
+            return
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="jedi-metrics").start()
+
+@st.cache_resource
+def get_trace_exporter() -> TraceExporter:
+    """Retorna o exportador de traces do processo (com o endpoint `/metrics` se JEDI_METRICS_PORT estiver definido)."""
+    exporter = TraceExporter()
+    if METRICS_PORT:
+        exporter.serve(METRICS_PORT)
+    return exporter
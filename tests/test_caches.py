@@ -0,0 +1,92 @@
+import pytest
+from langchain_core.outputs import Generation
+
+import core.answer_cache
+import core.llm_cache
+from core.answer_cache import AnswerCache
+from core.llm_cache import PersistentLLMCache, bypass_llm_cache
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(core.answer_cache.time, "time", clock)
+    return clock
+
+# --- Cache de respostas ---
+def test_answer_cache_roundtrip_with_normalized_query(tmp_path, clock):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"))
+    cache.put("dataset", "model", "Qual a média de Amount?", "42", thoughts=["passo"])
+    cached = cache.get("dataset", "model", "  qual a MÉDIA de amount ")
+    assert cached["text_answer"] == "42" and cached["thoughts"] == ["passo"]
+    assert cache.get("outro dataset", "model", "Qual a média de Amount?") is None
+
+def test_answer_cache_expires_after_ttl(tmp_path, clock):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"), ttl_seconds=60)
+    cache.put("dataset", "model", "pergunta", "resposta")
+    clock.advance(59)
+    assert cache.get("dataset", "model", "pergunta") is not None
+    clock.advance(2)
+    assert cache.get("dataset", "model", "pergunta") is None
+
+def test_answer_cache_evicts_least_recently_used_above_max_bytes(tmp_path, clock):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"), max_bytes=250)
+    for name in ("a", "b"):
+        cache.put("dataset", "model", name, "x" * 100)
+        clock.advance(1)
+    # "a" passa a ser a mais recente; a próxima gravação estoura o limite e descarta "b".
+    assert cache.get("dataset", "model", "a") is not None
+    clock.advance(1)
+    cache.put("dataset", "model", "c", "x" * 100)
+    assert cache.get("dataset", "model", "b") is None
+    assert cache.get("dataset", "model", "a") is not None
+    assert cache.get("dataset", "model", "c") is not None
+
+def test_answer_cache_drops_answers_whose_plot_is_gone(tmp_path, clock):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"))
+    plot = tmp_path / "plot.png"
+    plot.write_bytes(b"png")
+    cache.put("dataset", "model", "gráfico", "resposta", artifact_path=str(plot))
+    assert cache.get("dataset", "model", "gráfico")["artifact_path"] == str(plot)
+    plot.unlink()
+    assert cache.get("dataset", "model", "gráfico") is None
+
+# --- Cache de chamadas de LLM ---
+def test_llm_cache_roundtrip_and_stats(tmp_path):
+    cache = PersistentLLMCache(str(tmp_path / "llm.sqlite3"))
+    assert cache.lookup("prompt", "modelo") is None
+    cache.update("prompt", "modelo", [Generation(text="resposta")])
+    assert [generation.text for generation in cache.lookup("prompt", "modelo")] == ["resposta"]
+    assert cache.lookup("prompt", "outro modelo") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+def test_llm_cache_evicts_least_recently_used_above_max_entries(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(core.llm_cache.time, "time", clock)
+    cache = PersistentLLMCache(str(tmp_path / "llm.sqlite3"), max_entries=2)
+    for prompt in ("a", "b"):
+        cache.update(prompt, "modelo", [Generation(text=prompt)])
+        clock.advance(1)
+    cache.lookup("a", "modelo")
+    clock.advance(1)
+    cache.update("c", "modelo", [Generation(text="c")])
+    assert cache.lookup("b", "modelo") is None
+    assert cache.lookup("a", "modelo") is not None
+    assert cache.lookup("c", "modelo") is not None
+
+def test_llm_cache_bypass(tmp_path):
+    cache = PersistentLLMCache(str(tmp_path / "llm.sqlite3"))
+    cache.update("prompt", "modelo", [Generation(text="resposta")])
+    with bypass_llm_cache():
+        assert cache.lookup("prompt", "modelo") is None
+        cache.update("outro", "modelo", [Generation(text="x")])
+    assert cache.lookup("outro", "modelo") is None
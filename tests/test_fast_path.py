@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from agents.fast_path import match_template
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "Time": [0.0, 1.0, 2.0], "Amount": [10.0, 20.0, 30.0], "V1": [0.1, 0.2, 0.3],
+        "Class": [0, 1, 0], "Merchant": ["a", "b", "a"], "frequencia cardiaca": [60.0, 70.0, 80.0],
+    })
+
+@pytest.mark.parametrize("query, intent, columns", [
+    ("Qual a média de Amount?", "mean", ["Amount"]),
+    ("Qual é a média da coluna 'Amount'?", "mean", ["Amount"]),
+    ("mean of Amount", "mean", ["Amount"]),
+    ("Calcule a mediana de Time", "median", ["Time"]),
+    ("Quantos registros tem Amount?", "count", ["Amount"]),
+    ("contagem de valores de Class", "value_counts", ["Class"]),
+    ("frequência de Merchant", "value_counts", ["Merchant"]),
+    ("Mostre um histograma de Amount, por favor", "histogram", ["Amount"]),
+    ("boxplot de Time", "boxplot", ["Time"]),
+    ("Qual a correlação entre V1 e Amount?", "correlation", ["V1", "Amount"]),
+    # O nome da coluna contém uma palavra de intenção ("frequencia").
+    ("Qual a média da coluna frequencia cardiaca?", "mean", ["frequencia cardiaca"]),
+])
+def test_simple_questions_match(df, query, intent, columns):
+    match = match_template(query, df)
+    assert match is not None
+    assert (match.intent, match.columns) == (intent, columns)
+
+@pytest.mark.parametrize("query", [
+    # Filtros e subconjuntos: a estatística da coluna inteira seria uma resposta errada.
+    "média de Amount em 2020",
+    "média de Amount nos últimos dias",
+    "média de Amount excluindo outliers",
+    "média de Amount sem outliers",
+    "média de Amount na classe 1",
+    "média de Amount das fraudes",
+    "média de Amount quando Class = 1",
+    "média de Amount para Class > 0",
+    "média de Amount por Class",
+    # Ambíguas ou fora dos modelos.
+    "média e mediana de Amount",
+    "média de Merchant",
+    "média de Amount e Time",
+    "quais colunas existem?",
+])
+def test_complex_questions_fall_through(df, query):
+    assert match_template(query, df) is None
+
+def test_skip_sage_request(df):
+    match = match_template("média de Amount, apenas o valor", df)
+    assert match is not None and match.skip_sage
+    assert not match_template("média de Amount", df).skip_sage
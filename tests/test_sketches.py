@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.sketches import HyperLogLog, TDigest, HeavyHitters, hash_values
+
+def test_hyperloglog_estimates_distinct_count():
+    hll = HyperLogLog()
+    hll.update(hash_values(pd.Series(np.arange(100_000))))
+    assert hll.count() == pytest.approx(100_000, rel=0.03)
+
+def test_hyperloglog_ignores_duplicates_and_nulls():
+    hll = HyperLogLog()
+    values = pd.Series(np.tile(np.arange(500, dtype=float), 40))
+    values[::7] = np.nan
+    hll.update(hash_values(values))
+    assert hll.count() == pytest.approx(500, rel=0.03)
+
+def test_hyperloglog_merge_is_union():
+    left, right, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.update(hash_values(pd.Series(np.arange(0, 60_000))))
+    right.update(hash_values(pd.Series(np.arange(40_000, 100_000))))
+    both.update(hash_values(pd.Series(np.arange(0, 100_000))))
+    left.merge(right)
+    assert left.count() == both.count()
+
+def test_tdigest_quantiles():
+    values = np.random.default_rng(0).normal(size=200_000)
+    digest = TDigest()
+    for chunk in np.array_split(values, 8):
+        digest.update(chunk)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        assert digest.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.02)
+    assert digest.quantile(0) == values.min()
+    assert digest.quantile(1) == values.max()
+
+def test_tdigest_merge_and_nulls():
+    values = np.random.default_rng(1).uniform(0, 100, size=50_000)
+    left, right = TDigest(), TDigest()
+    left.update(np.concatenate([values[:25_000], [np.nan] * 10]))
+    right.update(values[25_000:])
+    left.merge(right)
+    assert left.quantile(0.5) == pytest.approx(np.median(values), abs=0.5)
+    assert len(left.means) <= left.compression
+
+def test_tdigest_empty():
+    assert np.isnan(TDigest().quantile(0.5))
+
+def test_heavy_hitters_exact_below_capacity():
+    values = pd.Series(["a"] * 50 + ["b"] * 30 + ["c"] * 20)
+    hitters = HeavyHitters(capacity=8)
+    hitters.update(values)
+    assert hitters.top(2).to_dict() == {"a": 50, "b": 30}
+
+def test_heavy_hitters_keep_frequent_values_above_capacity():
+    rng = np.random.default_rng(2)
+    noise = pd.Series(rng.integers(1_000, 100_000, size=20_000).astype(str))
+    hitters = HeavyHitters(capacity=16)
+    for chunk in range(4):
+        hitters.update(pd.concat([pd.Series(["frequente"] * 2_000 + ["comum"] * 1_000), noise[chunk::4]]))
+    assert list(hitters.top(2).index) == ["frequente", "comum"]
+    assert len(hitters.counts) <= 16
+
+def test_heavy_hitters_merge():
+    left, right = HeavyHitters(), HeavyHitters()
+    left.update(pd.Series(["x"] * 5 + ["y"]))
+    right.update(pd.Series(["y"] * 7))
+    left.merge(right)
+    assert left.top(2).to_dict() == {"y": 8, "x": 5}
@@ -1,75 +1,101 @@
 # --- Importações Essenciais ---
 import streamlit as st
 import pandas as pd
-import re
-import ollama
-import google.generativeai as genai
-from google.api_core import exceptions
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from core.profiling import build_data_profile, schema_summary
+from core.llm_registry import get_model_registry
+
+ROUTING_PROFILE_MAX_TOKENS = int(os.getenv("JEDI_ROUTING_PROFILE_TOKENS", "400"))
+_COMPACT_PROFILE_CACHE_SIZE = 32
+_compact_profile_cache = OrderedDict()
+# Lido e gravado pela thread do script e pelas threads do Conselho (`asyncio.to_thread`, executores).
+_compact_profile_lock = threading.Lock()
 
 # --- Funções de Profiling de Dados ---
-def get_data_profile(df):
+def get_data_profile(df, approximate=None):
     """
     Gera um perfil detalhado de um DataFrame para ser usado no prompt do agente.
+    O cálculo é feito pelo motor de profiling em `core.profiling` (uma passada vetorizada, ou
+    esboços aproximados para conjuntos muito grandes); aqui apenas renderizamos o markdown.
+    """
+    return build_data_profile(df, approximate=approximate).to_markdown()
+
+def get_compact_profile(df, max_tokens=ROUTING_PROFILE_MAX_TOKENS, schema_only=False):
     """
-    profile = []
-    profile.append(f"O DataFrame tem {df.shape[0]} linhas e {df.shape[1]} colunas.")
-    
-    profile.append("\n### Resumo das Colunas:")
-    for col in df.columns:
-        dtype = str(df[col].dtype)
-        missing_values = df[col].isnull().sum()
-        missing_percentage = (missing_values / df.shape[0]) * 100
-        
-        col_summary = [f"- **Coluna '{col}'**:"]
-        col_summary.append(f"  - Tipo de Dado: `{dtype}`")
-        col_summary.append(f"  - Valores Ausentes: {missing_values} ({missing_percentage:.2f}%)")
-        
-        if pd.api.types.is_numeric_dtype(df[col]):
-            desc = df[col].describe()
-            col_summary.append(f"  - Média: {desc['mean']:.2f}")
-            col_summary.append(f"  - Desvio Padrão: {desc['std']:.2f}")
-            col_summary.append(f"  - Mínimo: {desc['min']:.2f}")
-            col_summary.append(f"  - Máximo: {desc['max']:.2f}")
-        else:
-            unique_values = df[col].nunique()
-            col_summary.append(f"  - Valores Únicos: {unique_values}")
-            if unique_values < 15: # Mostra os valores se forem poucos
-                top_values = df[col].value_counts().head(5)
-                col_summary.append("  - Valores Comuns:")
-                for val, count in top_values.items():
-                    col_summary.append(f"    - '{val}': {count} vezes")
+    Retorna um perfil compacto do DataFrame limitado a `max_tokens`, calculado uma vez por conjunto de dados.
+    A variante `schema_only` (nomes e tipos das colunas) não varre os dados e é a usada no roteamento do Mestre.
+    """
+    key = (get_dataframe_fingerprint(df), max_tokens, schema_only)
+    with _compact_profile_lock:
+        compact_profile = _compact_profile_cache.get(key)
+        if compact_profile is not None:
+            _compact_profile_cache.move_to_end(key)
+            return compact_profile
+    # O perfil é calculado fora do lock, para não bloquear as demais threads durante a varredura.
+    if schema_only:
+        compact_profile = schema_summary(df, max_tokens)
+    else:
+        compact_profile = build_data_profile(df).to_compact_markdown(max_tokens)
+    with _compact_profile_lock:
+        _compact_profile_cache[key] = compact_profile
+        while len(_compact_profile_cache) > _COMPACT_PROFILE_CACHE_SIZE:
+            _compact_profile_cache.popitem(last=False)
+    return compact_profile
 
-        profile.append("\n".join(col_summary))
-        
-    return "\n".join(profile)
+def get_dataframe_fingerprint(df, sample_rows=100):
+    """
+    Gera uma impressão digital barata de um DataFrame (formato, colunas, tipos e uma amostra das linhas).
+    Se o DataFrame carregar o hash do conteúdo original em `df.attrs['content_hash']`, ele é usado diretamente.
+    """
+    content_hash = df.attrs.get("content_hash")
+    if content_hash:
+        return content_hash
+    hasher = hashlib.sha256()
+    hasher.update(repr(df.shape).encode())
+    hasher.update(repr(list(zip(map(str, df.columns), map(str, df.dtypes)))).encode())
+    if len(df) > 0:
+        step = max(len(df) // sample_rows, 1)
+        sample = pd.concat([df.head(sample_rows), df.iloc[::step], df.tail(sample_rows)])
+        hasher.update(pd.util.hash_pandas_object(sample, index=True).values.tobytes())
+    return hasher.hexdigest()
 
 # --- Funções de Formatação de Pensamentos do Agente ---
-def parse_agent_thoughts(thought_string):
-    """Analisa a string de saída do agente e a transforma em uma lista estruturada."""
-    ansi_escape = re.compile(r'\x1B(?:[@\-Z\\\-_]|(?:\[[0-?]*[ -/]*[@-~]))')
-    thought_string = ansi_escape.sub('', thought_string)
-    if '> Finished chain.' in thought_string:
-        thought_string = thought_string.split('> Finished chain.')[0]
-    pattern = re.compile(r"(Thought|Action|Action Input|Observation):(.+?)(?=(Thought|Action|Action Input|Observation):|> Entering new AgentExecutor chain.|$)", re.DOTALL)
-    matches = pattern.findall(thought_string)
-    parsed_steps = []
-    for match in matches:
-        step_type = match[0].strip()
-        content = match[1].strip()
-        parsed_steps.append({"type": step_type, "content": content})
-    return parsed_steps
+_AGENT_EVENT_LABELS = {
+    "thought": "🧠 **Pensamento do agente:**",
+    "action": "⚙️ **Código executado:**",
+    "observation": "🔍 **Saída do código:**",
+    "final_answer": "✅ **Resposta do agente:**",
+    "error": "⚠️ **Erro do agente:**",
+}
+
+def format_thought_entry(entry) -> str:
+    """Markdown de uma entrada do Diário de Bordo: um texto do Mestre ou um registro de passo de agente (ver `agents.events`)."""
+    if not isinstance(entry, dict):
+        return entry
+    label = _AGENT_EVENT_LABELS.get(entry.get("type"), f"**{entry.get('type')}:**")
+    note = "\n\n_(conteúdo truncado)_" if entry.get("truncated") else ""
+    if entry.get("type") == "action":
+        return f"{label}\n```python\n{entry['content']}\n```{note}"
+    if entry.get("type") == "observation":
+        return f"{label}\n```\n{entry['content']}\n```{note}"
+    return f"{label} {entry['content']}{note}"
 
 def display_formatted_thoughts(log_entries: list):
     """Exibe um log de pensamentos/eventos de forma formatada."""
     for entry in log_entries:
-        st.markdown(entry)
+        st.markdown(format_thought_entry(entry))
         st.markdown("---")
 
 # --- Funções de Validação e Obtenção de Modelos ---
+# As listagens passam pelo registro de modelos (`core.llm_registry`), que as mantém em cache com atualização em segundo plano.
 def validate_gemini_api_key(api_key):
+    from google.api_core import exceptions
     try:
-        genai.configure(api_key=api_key)
-        genai.list_models()
+        get_model_registry().validate("Gemini", api_key)
         return True
     except exceptions.PermissionDenied:
         st.error("Chave de API do Gemini inválida ou sem permissão.")
@@ -80,17 +106,16 @@ def validate_gemini_api_key(api_key):
 
 def get_ollama_models():
     try:
-        response = ollama.list()
-        return [model['model'] for model in response['models']]
+        return get_model_registry().list_models("Ollama")
     except Exception as e:
         # Ollama não está disponível, retorna uma lista vazia silenciosamente.
         # O erro é impresso no console para depuração local.
         print(f"Ollama check failed: {e}")
         return []
 
-def get_gemini_models():
+def get_gemini_models(api_key=None):
     try:
-        return [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+        return get_model_registry().list_models("Gemini", api_key or os.getenv("GOOGLE_API_KEY"))
     except Exception as e:
         st.warning(f"Não foi possível buscar modelos Gemini. Verifique a API Key. Erro: {e}")
         return []
@@ -1,25 +1,25 @@
 # --- Importações Essenciais ---
 import streamlit as st
 import os
-import base64
-from utils import validate_gemini_api_key
+
+from core.assets import logo_html
 
 def login_page():
     st.set_page_config(page_title="Login - JEDI", layout="centered")
     """Exibe a página de login em um layout centralizado."""
     _, col, _ = st.columns([1, 2, 1])
     with col:
-        logo_path = "asset/LOGO.png"
-        if os.path.exists(logo_path):
-            with open(logo_path, "rb") as f:
-                data = base64.b64encode(f.read()).decode("utf-8")
-            st.markdown(f"<div style='text-align: center'><img src='data:image/png;base64,{data}' width='200'></div>", unsafe_allow_html=True)
-                
+        logo = logo_html(width=200)
+        if logo:
+            st.markdown(logo, unsafe_allow_html=True)
+
         name = st.text_input("Seu Nome", key="login_name")
         password = st.text_input("Insira sua API Key do Gemini", type="password", key="login_password")
         
         if st.button("Login", use_container_width=True, type="primary"):
             if name and password:
+                # Importado só no clique: `utils` carrega pandas e o LangChain, que a tela de login não precisa.
+                from utils import validate_gemini_api_key
                 if validate_gemini_api_key(password):
                     st.session_state["logged_in"] = True
                     st.session_state["user_name"] = name
@@ -3,143 +3,53 @@ import streamlit as st
 import pandas as pd
 import os
 import uuid
-import shutil
-import io
-import io
 import datetime
-import docx
-import re
-import matplotlib.pyplot as plt
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from contextlib import redirect_stdout
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_community.llms import Ollama
+from functools import partial
 from utils import (
     get_ollama_models,
     get_gemini_models,
-    parse_agent_thoughts,
     display_formatted_thoughts,
-    get_data_profile
+    format_thought_entry,
+    get_data_profile,
+    get_dataframe_fingerprint
 )
+from core.data_cache import load_csv_cached
+from core.ingestion import is_out_of_core, start_ingestion
+from core.llm_cache import get_llm_cache
+from core.llm_registry import get_llm_factory, get_model_registry, FAKE_PROVIDER_ENABLED
+from core.sandbox import get_sandbox_pool, SANDBOX_ENABLED
+from core.artifacts import get_artifact_store, get_session_id
+from core.report import ReportBuilder
 
-def clean_markdown(text):
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-    text = re.sub(r'\*(.*?)\*', r'\1', text)
-    text = re.sub(r'^#+\s', '', text, flags=re.MULTILINE)
-    return text
+# Mensagens do histórico renderizadas por página; as anteriores são carregadas sob demanda.
+CHAT_PAGE_SIZE = int(os.getenv("JEDI_CHAT_PAGE_SIZE", "20"))
+# Mensagens mais recentes cujos gráficos são exibidos direto; nas demais, o gráfico fica num expansor sob demanda.
+CHAT_EAGER_MEDIA = int(os.getenv("JEDI_CHAT_EAGER_MEDIA", "4"))
 
-def generate_docx_report(pinned_items, data_profile, user_name):
-    doc = docx.Document()
+def _message_id(message) -> str:
+    return message.get("id") or f"message-{message['timestamp']}-{hash(message['content'])}"
 
-    # Adiciona e centraliza o logotipo no início
-    logo_path = "asset/LOGO.png"
-    if os.path.exists(logo_path):
-        p_logo = doc.add_paragraph()
-        p_logo.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        run_logo = p_logo.add_run()
-        run_logo.add_picture(logo_path, width=Inches(1.5))
+def _pinned_ids() -> set:
+    """Índice dos ids pinados (reconstruído se `pinned_items` foi substituído, ex: ao limpar o relatório)."""
+    ids = st.session_state.get("pinned_ids")
+    if ids is None or len(ids) != len(st.session_state.pinned_items):
+        ids = st.session_state.pinned_ids = {item["id"] for item in st.session_state.pinned_items}
+    return ids
 
-    # Estilo e título principal
-    style = doc.styles['Normal']
-    font = style.font
-    font.name = 'Calibri'
-    font.size = Pt(12)
-    title = doc.add_heading('Relatório de Análise de Dados - JEDI', 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Metadados
-    p_meta = doc.add_paragraph()
-    p_meta.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    p_meta.add_run(f"Gerado por: {user_name}\n").italic = True
-    p_meta.add_run(f"Data: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')} ").italic = True
-    doc.add_paragraph("---")
-
-    # --- Seção do Sumário Estático ---
-    doc.add_heading('Sumário', level=1)
-    doc.add_paragraph("Perfil Inicial dos Dados", style='List Bullet')
-    for i, item in enumerate(pinned_items):
-        resumo_pergunta = item['user_prompt'][:60] + '...' if len(item['user_prompt']) > 60 else item['user_prompt']
-        doc.add_paragraph(f"Interação {i+1}: {resumo_pergunta}", style='List Bullet')
-    
-    doc.add_page_break()
-
-    # --- Seção do Perfil dos Dados ---
-    if data_profile:
-        doc.add_heading('Perfil Inicial dos Dados', level=1)
-        
-        def parse_and_add_profile(profile_string):
-            lines = profile_string.strip().split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                if line.startswith('###'):
-                    doc.add_heading(line.replace('###', '').strip(), level=2)
-                elif line.startswith('- **'):
-                    clean_line = line.replace('- **', '').replace('**', '').strip()
-                    p = doc.add_paragraph()
-                    p.add_run(clean_line).bold = True
-                elif line.startswith('  - '):
-                    clean_line = line.replace('`', '').strip()[2:] # Remove o marcador e os backticks
-                    doc.add_paragraph(clean_line, style='List Bullet 2')
-                else:
-                    doc.add_paragraph(line)
-        
-        parse_and_add_profile(data_profile)
-        doc.add_page_break()
-
-    # --- Conteúdo Principal do Relatório ---
-    for i, item in enumerate(pinned_items):
-        heading_interaction = doc.add_heading(f"Interação {i+1}: Pergunta do Usuário", level=1)
-        if i > 0:
-            heading_interaction.paragraph_format.space_before = Pt(24)
-
-        p_question = doc.add_paragraph()
-        p_question.add_run(item['user_prompt']).italic = True
-        
-        heading_answer = doc.add_heading("Resposta do Agente", level=2)
-        heading_answer.paragraph_format.space_before = Pt(18)
-
-        content = clean_markdown(item['content'])
-        p_answer = doc.add_paragraph(content)
-        p_answer.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-
-        if item.get("image") and os.path.exists(item["image"]):
-            p_image = doc.add_paragraph()
-            p_image.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            p_image.paragraph_format.space_before = Pt(12)
-            run = p_image.add_run()
-            try:
-                run.add_picture(item["image"], width=Inches(5.5))
-            except Exception as e:
-                doc.add_paragraph(f"(Erro ao adicionar imagem: {e})")
-            p_caption = doc.add_paragraph()
-            p_caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            p_caption.add_run(f"Figura {i+1}: Gráfico gerado pela análise.").italic = True
-
-        if item.get("thoughts"):
-            # O código para exibir os pensamentos permanece o mesmo
-            pass
-
-    bio = io.BytesIO()
-    doc.save(bio)
-    bio.seek(0)
-    return bio
 def main_app():
     st.set_page_config(page_title="JEDI EDA", layout="wide")
-    plots_dir = "temp_plots"
 
-    def _pin_item(message):
-        item_id = f"message-{message['timestamp']}-{hash(message['content'])}"
-        for i, pinned_item in enumerate(st.session_state.pinned_items):
-            if pinned_item.get("id") == item_id:
-                st.session_state.pinned_items.pop(i)
-                st.toast("Item despinado do relatório!", icon="📌")
-                return
+    def _pin_item(index, message):
+        item_id = _message_id(message)
+        pinned_ids = _pinned_ids()
+        if item_id in pinned_ids:
+            st.session_state.pinned_items = [item for item in st.session_state.pinned_items if item.get("id") != item_id]
+            pinned_ids.discard(item_id)
+            st.toast("Item despinado do relatório!", icon="📌")
+            return
+        # A pergunta que originou esta resposta (a mensagem do usuário imediatamente anterior).
         user_prompt = ""
-        for msg in reversed(st.session_state.messages):
+        for msg in reversed(st.session_state.messages[:index]):
             if msg['role'] == 'user':
                 user_prompt = msg['content']
                 break
@@ -149,13 +59,69 @@ def main_app():
             "thoughts": message.get("thoughts"), "user_prompt": user_prompt
         }
         st.session_state.pinned_items.append(pinned_data)
+        pinned_ids.add(item_id)
         st.toast("Item pinado para o relatório!", icon="✅")
 
-    @st.cache_data
-    def load_models():
-        return get_ollama_models(), get_gemini_models()
-    
-    ollama_models, gemini_models = load_models()
+    def _render_message(index, message, show_thoughts, is_pinned, eager_media):
+        """
+        Renderiza uma mensagem do histórico. Diário de Bordo, tabela de resultado e tempos ficam em expansores
+        sob demanda (só executados quando abertos); o gráfico também, exceto nas mensagens mais recentes.
+        """
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+            if message["role"] != "assistant":
+                return
+            if message.get("cached"):
+                cached_at = datetime.datetime.fromtimestamp(message["cached_at"]).strftime('%d/%m/%Y %H:%M')
+                st.caption(f"💾 Resposta servida do cache (gerada originalmente em {cached_at}).")
+
+            # Display plot if it exists
+            image_path = message.get("image")
+            if image_path and image_path.endswith(".png"):
+                if eager_media:
+                    if os.path.exists(image_path):
+                        st.image(get_artifact_store().variant(image_path, "chat"))
+                else:
+                    with st.expander("Ver Gráfico 📈", key=f"image_{index}", on_change="rerun") as image_expander:
+                        if image_expander.open and os.path.exists(image_path):
+                            st.image(get_artifact_store().variant(image_path, "chat"))
+
+            # Resultado completo da ferramenta (o Sábio recebeu apenas um resumo, ver `core.results`)
+            if message.get("table") is not None:
+                table = message["table"]
+                total_rows = table.attrs.get("total_rows", len(table))
+                with st.expander(f"Ver Resultado Completo ({total_rows} linhas) 📊", key=f"table_{index}", on_change="rerun") as table_expander:
+                    if table_expander.open:
+                        if total_rows > len(table):
+                            st.caption(f"Exibindo as primeiras {len(table)} de {total_rows} linhas.")
+                        st.dataframe(table, use_container_width=True)
+
+            # Display thoughts if they exist
+            if message.get("thoughts"):
+                with st.expander("Ver Diário de Bordo do Conselho Jedi 🧠", key=f"thoughts_{index}", on_change="rerun") as thoughts_expander:
+                    if thoughts_expander.open:
+                        display_formatted_thoughts(message["thoughts"])
+
+            # Tempo, chamadas de LLM, tokens, cache e iterações de cada etapa (ver `core.tracing`)
+            if show_thoughts and message.get("trace"):
+                with st.expander("Ver Tempos do Conselho por Etapa ⏱️", key=f"trace_{index}", on_change="rerun") as trace_expander:
+                    if trace_expander.open:
+                        st.dataframe(pd.DataFrame(message["trace"]), hide_index=True, use_container_width=True)
+
+            # Pining button
+            pin_label = "📌 Pinado" if is_pinned else "🧷 Pinar"
+            if st.button(pin_label, key=f"pin_message_{index}"):
+                _pin_item(index, message)
+                st.rerun()
+
+    # O registro de modelos mantém as listas em cache e as atualiza em segundo plano (ver `core.llm_registry`).
+    ollama_models, gemini_models = get_ollama_models(), get_gemini_models()
+
+    @st.fragment(run_every=1)
+    def _ingestion_progress(job):
+        st.progress(job.progress, text=f"Ingerindo o arquivo em blocos... {job.rows} linhas já disponíveis para consulta.")
+        if job.done:
+            st.rerun(scope="app")
 
     with st.sidebar:
         logo_path = "asset/LOGO.png"
@@ -163,8 +129,8 @@ def main_app():
             st.image(logo_path, width=100)
         st.header(f"Bem-vindo, {st.session_state.get('user_name', 'Usuário')}!")
         if st.button("Logout", use_container_width=True):
-            if os.path.exists(plots_dir):
-                shutil.rmtree(plots_dir)
+            get_artifact_store().release_session(get_session_id())
+            if SANDBOX_ENABLED: get_sandbox_pool().release_session(get_session_id())
             st.session_state.clear()
             if "GOOGLE_API_KEY" in os.environ:
                 del os.environ["GOOGLE_API_KEY"]
@@ -173,21 +139,22 @@ def main_app():
         if st.button("Reiniciar Conversa", use_container_width=True):
             st.session_state.messages = []
             st.session_state.pinned_items = []
+            st.session_state.chat_history_limit = CHAT_PAGE_SIZE
 
             # Deletar a chave do arquivo atual força o bloco de recarregamento a ser executado
             if "current_file" in st.session_state:
                 del st.session_state.current_file
 
-            # Limpa os plots temporários
-            if os.path.exists(plots_dir):
-                shutil.rmtree(plots_dir)
-            os.makedirs(plots_dir, exist_ok=True)
+            # Libera os gráficos e o frame do sandbox desta sessão (os de outras sessões não são afetados)
+            get_artifact_store().release_session(get_session_id())
+            if SANDBOX_ENABLED: get_sandbox_pool().release_session(get_session_id())
             
             st.toast("A conversa foi reiniciada. O arquivo precisa ser recarregado.", icon="🔄")
             st.rerun()
         st.divider()
         st.header("⚙️ Configurações")
-        llm_provider = st.selectbox("Escolha o Provedor de LLM:", ["Ollama", "Gemini"], index=1)
+        llm_providers = ["Ollama", "Gemini"] + (["Fake"] if FAKE_PROVIDER_ENABLED else [])
+        llm_provider = st.selectbox("Escolha o Provedor de LLM:", llm_providers, index=1)
         selected_model = None
         if llm_provider == "Ollama":
             if ollama_models:
@@ -205,17 +172,31 @@ def main_app():
                 selected_model = st.selectbox("Escolha o Modelo Gemini:", filtered_gemini_models, index=default_index)
             else:
                 st.warning("Nenhum modelo Gemini encontrado.")
+        elif llm_provider == "Fake":
+            selected_model = st.selectbox("Escolha o Modelo Fake:", get_model_registry().list_models("Fake"))
+        llm_credentials = os.getenv("GOOGLE_API_KEY") if llm_provider == "Gemini" else None
+        if selected_model and (llm_provider != "Gemini" or llm_credentials):
+            # Carrega o modelo (Ollama) em segundo plano antes da primeira pergunta.
+            get_llm_factory().warm_up(llm_provider, selected_model, llm_credentials)
         uploaded_file = st.file_uploader("Faça upload do seu arquivo CSV", type=["csv"])
         st.divider()
         st.header("Auditoria do Conselho")
         show_thoughts = st.toggle("Mostrar Diário de Bordo do Conselho", value=True, key="show_thoughts_toggle")
+        use_answer_cache = st.toggle("Reutilizar respostas já dadas (cache)", value=True, key="use_answer_cache_toggle")
+        speculative_execution = st.toggle("Execução especulativa dos especialistas", value=True, key="speculative_execution_toggle",
+                                          help="Inicia o especialista enquanto o Mestre avalia se a pergunta é clara. Reduz a latência, mas pode gastar chamadas de LLM descartadas.")
+        llm_cache_stats = get_llm_cache().stats()
+        st.caption(f"Cache de LLM: {llm_cache_stats['hits']} acertos, {llm_cache_stats['misses']} falhas ({llm_cache_stats['hit_rate']:.0%}).")
         st.divider()
         st.header("📌 Relatório Gerado")
         if not st.session_state.pinned_items:
             st.info("Nenhum item foi adicionado ao relatório ainda.")
         else:
             for item in st.session_state.pinned_items:
-                with st.expander(f"Interação de {item['timestamp']}"):
+                # Expansor sob demanda: o conteúdo (e o gráfico) só é renderizado quando aberto.
+                with st.expander(f"Interação de {item['timestamp']}", key=f"pinned_{item['id']}", on_change="rerun") as pinned_expander:
+                    if not pinned_expander.open:
+                        continue
                     with st.chat_message("user"):
                         st.markdown(item['user_prompt'])
                     with st.chat_message("assistant"):
@@ -227,15 +208,19 @@ def main_app():
                                     html_content = f.read()
                                 st.components.v1.html(html_content, height=400, scrolling=True)
                             elif image_path.endswith(('.png', '.jpg', '.jpeg')):
-                                st.image(image_path)
+                                st.image(get_artifact_store().variant(image_path, "chat"))
             if st.button("Limpar Itens Pinados", use_container_width=True):
                 st.session_state.pinned_items = []
                 st.toast("Itens pinados limpos!", icon="🧹")
                 st.rerun()
-            docx_data = generate_docx_report(st.session_state.pinned_items, st.session_state.data_profile, st.session_state.get('user_name', 'Usuário'))
+            # O relatório só é montado quando o botão é clicado, e de forma incremental (ver `ReportBuilder`).
+            if "report_builder" not in st.session_state:
+                st.session_state.report_builder = ReportBuilder(image_variant=partial(get_artifact_store().variant, kind="report"))
+            report_builder = st.session_state.report_builder
+            report_args = (list(st.session_state.pinned_items), st.session_state.data_profile, st.session_state.get('user_name', 'Usuário'))
             st.download_button(
                 label="Download Relatório (.docx)",
-                data=docx_data,
+                data=lambda: report_builder.build(*report_args),
                 file_name=f"relatorio_jedi_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.docx",
                 mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                 use_container_width=True
@@ -245,56 +230,69 @@ def main_app():
     st.write("Converse com um Conselho de agentes Jedi para explorar seus dados, gerar insights e obter respostas inteligentes.")
     
     if uploaded_file is not None:
+        # Sobe os processos do sandbox em segundo plano antes da primeira pergunta.
+        if SANDBOX_ENABLED: get_sandbox_pool()
         if st.session_state.get("current_file") != uploaded_file.name:
-            if os.path.exists(plots_dir): shutil.rmtree(plots_dir)
-            os.makedirs(plots_dir, exist_ok=True)
+            # Os gráficos das mensagens anteriores são liberados; os pinados no relatório continuam referenciados.
+            get_artifact_store().release_session(get_session_id())
+            for pinned_item in st.session_state.get("pinned_items", []):
+                if pinned_item.get("image"): get_artifact_store().add_ref(pinned_item["image"], get_session_id())
             st.session_state.messages = []
+            st.session_state.chat_history_limit = CHAT_PAGE_SIZE
             st.session_state.current_file = uploaded_file.name
             st.session_state.data_profile = None
+            if "agent_pool" in st.session_state: st.session_state.agent_pool.clear()
 
         try:
-            df = pd.read_csv(uploaded_file)
-            st.success("Arquivo CSV carregado com sucesso!")
+            # Arquivos grandes são ingeridos em blocos para um store colunar em disco (fora do heap).
+            ingestion_job = None
+            if is_out_of_core(uploaded_file):
+                ingestion_job = start_ingestion(uploaded_file)
+                if ingestion_job.error:
+                    raise RuntimeError(ingestion_job.error)
+                df = ingestion_job.dataframe()
+                if not ingestion_job.done:
+                    _ingestion_progress(ingestion_job)
+                    if df is None:
+                        st.stop()
+            else:
+                df = load_csv_cached(uploaded_file)
+            is_partial = df.attrs.get("partial", False)
+            # O frame exportado para o sandbox do conjunto anterior (ou do instantâneo parcial anterior) é liberado.
+            if SANDBOX_ENABLED: get_sandbox_pool().use_frame(get_session_id(), get_dataframe_fingerprint(df))
+            if is_partial:
+                st.info(f"Ingestão em andamento: as perguntas serão respondidas sobre as primeiras {len(df)} linhas já carregadas.")
+            else:
+                st.success("Arquivo CSV carregado com sucesso!")
             st.dataframe(df.head())
 
-            if st.session_state.data_profile is None:
+            if st.session_state.data_profile is None and not is_partial:
                 with st.spinner("Analisando o perfil dos dados..."):
-                    st.session_state.data_profile = get_data_profile(df)
-            
-            with st.expander("Ver Perfil Detalhado dos Dados"):
-                st.markdown(st.session_state.data_profile)
+                    streamed_profile = ingestion_job.profile() if ingestion_job else None
+                    st.session_state.data_profile = streamed_profile.to_markdown() if streamed_profile else get_data_profile(df)
 
+            if st.session_state.data_profile:
+                with st.expander("Ver Perfil Detalhado dos Dados"):
+                    st.markdown(st.session_state.data_profile)
+
+            # Os clientes são reaproveitados entre renderizações e sessões, por (provedor, modelo, credenciais).
             llm = None
-            if llm_provider == "Ollama":
-                if selected_model: llm = Ollama(model=selected_model, temperature=0)
-            elif llm_provider == "Gemini":
-                if selected_model and os.getenv("GOOGLE_API_KEY"):
-                    llm = ChatGoogleGenerativeAI(model=selected_model.replace('models/', ''), temperature=0)
+            if selected_model and (llm_provider != "Gemini" or llm_credentials):
+                llm = get_llm_factory().get(llm_provider, selected_model, llm_credentials)
 
             if "messages" not in st.session_state: st.session_state.messages = []
 
-            for i, message in enumerate(st.session_state.messages):
-                with st.chat_message(message["role"]):
-                    st.markdown(message["content"])
-                    if message["role"] == "assistant":
-                        # Display plot if it exists
-                        if "image" in message and os.path.exists(message["image"]):
-                            image_path = message["image"]
-                            if image_path.endswith(".png"):
-                                st.image(image_path)
-                        
-                        # Display thoughts if they exist
-                        if "thoughts" in message and message["thoughts"]:
-                            with st.expander("Ver Diário de Bordo do Conselho Jedi 🧠"):
-                                display_formatted_thoughts(message["thoughts"])
-                        
-                        # Pining button
-                        item_id = f"message-{message['timestamp']}-{hash(message['content'])}"
-                        is_pinned = any(item.get("id") == item_id for item in st.session_state.pinned_items)
-                        pin_label = "📌 Pinado" if is_pinned else "🧷 Pinar"
-                        if st.button(pin_label, key=f"pin_message_{i}"):
-                            _pin_item(message)
-                            st.rerun()
+            # Histórico em janela: só as últimas `chat_history_limit` mensagens são renderizadas a cada rerun.
+            messages = st.session_state.messages
+            history_limit = st.session_state.setdefault("chat_history_limit", CHAT_PAGE_SIZE)
+            first_visible = max(len(messages) - history_limit, 0)
+            if first_visible:
+                if st.button(f"⬆️ Carregar mensagens anteriores ({first_visible} ocultas)", use_container_width=True):
+                    st.session_state.chat_history_limit = history_limit + CHAT_PAGE_SIZE
+                    st.rerun()
+            pinned_ids = _pinned_ids()
+            for i in range(first_visible, len(messages)):
+                _render_message(i, messages[i], show_thoughts, _message_id(messages[i]) in pinned_ids, eager_media=i >= len(messages) - CHAT_EAGER_MEDIA)
 
             if prompt := st.chat_input(f"{st.session_state.get('user_name', 'Usuário')}: Pergunte ao JEDI sobre os dados..."):
                 st.session_state.messages.append({"role": "user", "content": prompt, "timestamp": datetime.datetime.now().isoformat()})
@@ -308,24 +306,45 @@ def main_app():
                     st.rerun()
                 
                 elif llm:
-                    with st.spinner("O Conselho Jedi está deliberando..."):
+                    with st.chat_message("assistant"):
+                        # O Diário de Bordo e a resposta do Sábio são exibidos ao vivo, à medida que o Conselho trabalha.
+                        council_status = st.status("O Conselho Jedi está deliberando...", expanded=show_thoughts)
+                        answer_placeholder = st.empty()
+                        streamed_answer = []
+
+                        def _on_council_event(kind, content):
+                            if kind == "log":
+                                council_status.markdown(format_thought_entry(content))
+                            elif kind == "token":
+                                streamed_answer.append(content)
+                                answer_placeholder.markdown("".join(streamed_answer) + "▌")
+
                         try:
                             from agents.master import run_jedi_council
 
-                            council_response = run_jedi_council(llm, df, prompt, record_thoughts=show_thoughts)
-                            
+                            council_response = run_jedi_council(llm, df, prompt, record_thoughts=show_thoughts, use_cache=use_answer_cache,
+                                                                speculative=speculative_execution, on_event=_on_council_event)
+                            council_status.update(label="O Conselho Jedi concluiu a deliberação.", state="complete", expanded=False)
+
                             response_text = council_response.get("text_answer", "Ocorreu um erro ao processar a resposta.")
                             image_path = council_response.get("artifact_path")
                             thoughts = council_response.get("thoughts", [])
 
                             assistant_message = {
+                                "id": f"message-{uuid.uuid4().hex}",
                                 "role": "assistant", 
                                 "content": response_text, 
                                 "timestamp": datetime.datetime.now().isoformat(),
-                                "thoughts": thoughts
+                                "thoughts": thoughts,
+                                "trace": council_response.get("trace", [])
                             }
                             if image_path:
                                 assistant_message["image"] = image_path
+                            if council_response.get("table") is not None:
+                                assistant_message["table"] = council_response["table"]
+                            if council_response.get("cached"):
+                                assistant_message["cached"] = True
+                                assistant_message["cached_at"] = council_response["cached_at"]
                             
                             st.session_state.messages.append(assistant_message)
                             st.rerun()
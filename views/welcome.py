@@ -1,18 +1,16 @@
 # --- Importações Essenciais ---
 import streamlit as st
-import base64
-import os
+
+from core.assets import logo_html, readme_text
 
 def welcome_screen():
     st.set_page_config(page_title="Bem-vindo ao JEDI", layout="centered")
     """Exibe a tela de boas-vindas e instruções."""
     
     # Adiciona a logo centralizada
-    logo_path = "asset/LOGO.png"
-    if os.path.exists(logo_path):
-        with open(logo_path, "rb") as f:
-            data = base64.b64encode(f.read()).decode("utf-8")
-        st.markdown(f"<div style='text-align: center'><img src='data:image/png;base64,{data}' width='200'></div>", unsafe_allow_html=True)
+    logo = logo_html(width=200)
+    if logo:
+        st.markdown(logo, unsafe_allow_html=True)
 
     st.markdown("<h1 style='text-align: center;'>Bem-vindo ao JEDI: João's Exploratory Data Insight!</h1>", unsafe_allow_html=True)
 
@@ -52,11 +50,8 @@ def welcome_screen():
     # Nova seção para o README.md
     st.markdown(" ") # Espaçamento
     with st.expander("📚 Documentação Completa (README)"):
-        readme_path = "README.md"
-        if os.path.exists(readme_path):
-            with open(readme_path, "r", encoding="utf-8") as f:
-                readme_content = f.read()
-            
+        readme_content = readme_text()
+        if readme_content is not None:
             # Skip the main title of the README
             readme_lines = readme_content.split('\n')
             display_content = '\n'.join(readme_lines[1:])